@@ -0,0 +1,170 @@
+"""
+A standalone benchmark runner.
+
+Usage::
+
+    $ python -m benchmarks.runner -o results.json
+    $ python -m benchmarks.runner -o new.json --compare results.json
+    $ python -m benchmarks.runner --replay traffic.json.gz schedule score
+    $ python -m benchmarks.runner --compiled -o compiled.json --compare results.json
+
+Each scenario is warmed up, timed for a number of rounds, and run once more under :mod:`tracemalloc` to count
+allocations. Results are printed, and optionally saved as JSON to be compared with results of another release.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import pysjtu
+from pysjtu.compiled import use_compiled_loaders
+from .scenarios import SCENARIOS, make_transport
+
+RESULTS_VERSION = 1
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """ Get a percentile of samples by linear interpolation. """
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def measure_allocations(op: Callable[[], object]) -> Dict[str, int]:
+    """ Count memory allocated by a single run of an operation. """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    return {"allocated_bytes": sum(max(d.size_diff, 0) for d in diff),
+            "allocated_blocks": sum(max(d.count_diff, 0) for d in diff),
+            "peak_bytes": peak}
+
+
+def run_scenario(op: Callable[[], object], rounds: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        op()
+    samples = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        t = time.perf_counter()
+        op()
+        samples.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    return {
+        "rounds": rounds,
+        "throughput": rounds / total,
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if rounds > 1 else 0,
+        "min": min(samples),
+        "max": max(samples),
+        "p50": percentile(samples, 50),
+        "p90": percentile(samples, 90),
+        "p99": percentile(samples, 99),
+        **measure_allocations(op),
+    }
+
+
+def run(names: List[str], rounds: int = 50, warmup: int = 3, replay: Optional[str] = None) -> dict:
+    """
+    Run benchmark scenarios.
+
+    :param names: names of scenarios in :data:`benchmarks.scenarios.SCENARIOS`.
+    :param rounds: (optional) timed runs of each scenario.
+    :param warmup: (optional) untimed runs of each scenario before timing.
+    :param replay: (optional) path of a recorded archive to run against, instead of the mock server.
+    :return: results keyed by scenario names, with the environment the benchmarks ran in.
+    """
+    results = {}
+    for name in names:
+        try:
+            op = SCENARIOS[name](make_transport(replay))
+        except ImportError as e:
+            print(f"{name}: skipped ({e})", file=sys.stderr)
+            continue
+        results[name] = run_scenario(op, rounds, warmup)
+    return {
+        "version": RESULTS_VERSION,
+        "pysjtu": pysjtu.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "transport": replay or "mock_server",
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    :return: names of scenarios whose median latency regressed by more than `threshold` (e.g. 0.1 for 10%).
+    """
+    regressions = []
+    print(f"\n{'scenario':<26}{'baseline p50':>14}{'p50':>14}{'change':>10}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = result["p50"] / base["p50"] - 1
+        print(f"{name:<26}{base['p50'] * 1000:>12.3f}ms{result['p50'] * 1000:>12.3f}ms{change:>+10.1%}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def report(current: dict):
+    print(f"{'scenario':<26}{'ops/s':>10}{'p50':>12}{'p90':>12}{'p99':>12}{'alloc':>12}{'blocks':>10}")
+    for name, r in current["results"].items():
+        print(f"{name:<26}{r['throughput']:>10.1f}{r['p50'] * 1000:>10.3f}ms{r['p90'] * 1000:>10.3f}ms"
+              f"{r['p99'] * 1000:>10.3f}ms{r['allocated_bytes'] / 1024:>10.1f}KB{r['allocated_blocks']:>10}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pysjtu client operations offline.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"scenarios to run, from {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("-n", "--rounds", type=int, default=50, help="timed runs of each scenario")
+    parser.add_argument("-w", "--warmup", type=int, default=3, help="untimed runs of each scenario")
+    parser.add_argument("-o", "--output", help="save results as JSON to this file")
+    parser.add_argument("--replay", help="run against a recorded archive instead of the mock server")
+    parser.add_argument("--compiled", action="store_true", help="load models with compiled loaders")
+    parser.add_argument("--compare", help="compare with results saved by a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative p50 regression failing the comparison (default: 0.1)")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    use_compiled_loaders(args.compiled)
+    current = run(args.scenarios or list(SCENARIOS), args.rounds, args.warmup, args.replay)
+    current["compiled"] = args.compiled
+    report(current)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
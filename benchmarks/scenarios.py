@@ -0,0 +1,102 @@
+"""
+Benchmark scenarios shared by the standalone runner and the pytest-benchmark suite.
+
+Scenarios run against the mock server in `tests/mock_server.py`, or against an archive recorded by
+:class:`pysjtu.replay.RecordingTransport`, so that they never touch iSJTU.
+"""
+import os
+from os import path
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from pysjtu.client import Client
+from pysjtu.ocr import Recognizer
+from pysjtu.replay import ReplayTransport
+from pysjtu.session import Session
+
+CAPTCHA_DIR = path.join(path.dirname(path.dirname(path.abspath(__file__))), "tests", "resources", "captcha")
+
+USERNAME = "FeiLin"
+PASSWORD = "WHISPERS"
+
+
+class FixedRecognizer(Recognizer):
+    """ A recognizer answering the captcha of the mock server, so that logins measure HTTP round trips only. """
+
+    def recognize(self, img: bytes):
+        return "ipsum"
+
+
+def make_transport(replay: Optional[str] = None) -> httpx.BaseTransport:
+    """
+    Create the transport scenarios run against.
+
+    :param replay: (optional) Path of a recorded archive. Defaults to the mock server.
+    """
+    if replay:
+        return ReplayTransport(replay)
+    from tests.mock_server import app
+    return httpx.WSGITransport(app=app)
+
+
+def make_session(transport: httpx.BaseTransport) -> Session:
+    return Session(ocr=FixedRecognizer(), transport=transport, retry=[0], mounts={"all://": None})
+
+
+def make_client(transport: httpx.BaseTransport) -> Client:
+    """ Create a logged in client. """
+    sess = make_session(transport)
+    sess.login(USERNAME, PASSWORD)
+    sess.get("/test_selection", validate_session=False)  # open course selection on the mock server
+    return Client(sess)
+
+
+def login(transport: httpx.BaseTransport) -> Callable[[], object]:
+    sess = make_session(transport)
+    return lambda: sess.login(USERNAME, PASSWORD)
+
+
+def schedule(transport: httpx.BaseTransport) -> Callable[[], object]:
+    client = make_client(transport)
+    return lambda: client.schedule(2019, 0)
+
+
+def score(transport: httpx.BaseTransport) -> Callable[[], object]:
+    client = make_client(transport)
+    return lambda: client.score(2019, 0)
+
+
+def exam(transport: httpx.BaseTransport) -> Callable[[], object]:
+    client = make_client(transport)
+    return lambda: client.exam(2019, 0)
+
+
+def query_courses(transport: httpx.BaseTransport) -> Callable[[], object]:
+    client = make_client(transport)
+    return lambda: list(client.query_courses(2019, 0, name="高等数学", page_size=40))
+
+
+def course_selection_sectors(transport: httpx.BaseTransport) -> Callable[[], object]:
+    client = make_client(transport)
+    return lambda: client.course_selection_sectors
+
+
+def ocr(_transport: httpx.BaseTransport) -> Callable[[], object]:
+    from pysjtu.ocr import NNRecognizer
+    recognizer = NNRecognizer()
+    images = [Path(CAPTCHA_DIR, f).read_bytes() for f in sorted(os.listdir(CAPTCHA_DIR))]
+    return lambda: [recognizer.recognize(img) for img in images]
+
+
+# Scenario factories keyed by name. A factory prepares its state, and returns the operation to be measured.
+SCENARIOS: Dict[str, Callable[[httpx.BaseTransport], Callable[[], object]]] = {
+    "login": login,
+    "schedule": schedule,
+    "score": score,
+    "exam": exam,
+    "query_courses": query_courses,
+    "course_selection_sectors": course_selection_sectors,
+    "ocr": ocr,
+}
@@ -0,0 +1,24 @@
+"""
+Benchmarks of client operations, to be run with pytest-benchmark::
+
+    $ pytest benchmarks --benchmark-autosave
+    $ pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:10%
+
+Allocations of each operation are attached to results as `extra_info`.
+"""
+import pytest
+
+from .runner import measure_allocations
+from .scenarios import SCENARIOS, make_transport
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_scenario(benchmark, name):
+    if name == "ocr":
+        pytest.importorskip("onnxruntime")
+    op = SCENARIOS[name](make_transport())
+    benchmark.group = name
+    benchmark.extra_info.update(measure_allocations(op))
+    benchmark(op)
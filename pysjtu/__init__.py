@@ -1,6 +1,14 @@
 from pysjtu.ocr import LegacyRecognizer, NNRecognizer, JCSSRecognizer
-from .client import Client, create_client
+from .cache import ResponseCache
+from .circuit import CircuitBreaker
+from .client import AsyncClient, Client, create_client
+from .metrics import Metrics
 from .models import CourseRange, LogicEnum, Ranking
-from .session import Session
+from .pool import AsyncSessionPool, SessionPool
+from .ratelimit import RateLimiter
+from .replay import RecordingTransport, ReplayTransport
+from .retry import RetryPolicy
+from .session import AsyncSession, Session
+from .transport import AsyncSharedTransport, SharedTransport
 
 __version__ = "0.4.2"
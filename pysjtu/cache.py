@@ -0,0 +1,143 @@
+import json
+import sqlite3
+import threading
+import time
+from os import PathLike
+from typing import Dict, Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import consts
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+# Headers which don't apply to the decoded content stored in cache.
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class ResponseCache:
+    """
+    A persistent HTTP response cache backed by SQLite, to be used by :class:`pysjtu.session.Session`.
+
+    Responses are keyed by request fingerprints (see :func:`pysjtu.fingerprint.request_fingerprint`).
+    Only successful responses from endpoints with a TTL are cached. The default TTLs are taken from
+    :data:`pysjtu.consts.CACHE_TTLS`. When the size of cached content exceeds `max_size`, least recently used responses
+    are evicted.
+
+    The database is opened in WAL mode, so a cache file can be shared by multiple threads and processes.
+
+    Usage::
+
+        >>> cache = ResponseCache("pysjtu_cache.db", max_size=64 * 1024 * 1024)
+        >>> client = pysjtu.create_client("user@sjtu.edu.cn", "something_secret", cache=cache)
+
+    :param path: path of the database file.
+    :param ttls: (optional) Time to live (in seconds) of responses, keyed by endpoint URLs.
+    :param max_size: (optional) Maximum size (in bytes) of cached content.
+    :param timeout: (optional) How long to wait for a database lock held by other processes.
+    """
+
+    def __init__(self, path: Union[str, PathLike], ttls: Optional[Dict[str, float]] = None,
+                 max_size: Optional[int] = None, timeout: float = 30):
+        self._path = str(path)
+        self._timeout = timeout
+        self._ttls = {urlsplit(url).path: ttl for url, ttl in (consts.CACHE_TTLS if ttls is None else ttls).items()}
+        self.max_size = max_size
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._conn.execute(_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=self._timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ttl(self, request: httpx.Request) -> float:
+        """ Get the time to live of the response of a request, which is 0 if it shouldn't be cached. """
+        return self._ttls.get(request.url.path, 0)
+
+    def get(self, key: str, request: httpx.Request) -> Optional[httpx.Response]:
+        """
+        Get a cached response.
+
+        :param key: the fingerprint of the request.
+        :param request: the request, which is attached to the returned response.
+        :return: the cached response, or None if there's no valid one.
+        """
+        now = time.time()
+        row = self._conn.execute("SELECT status, headers, content FROM responses WHERE key = ? AND expires > ?",
+                                 (key, now)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        status, headers, content = row
+        return httpx.Response(status, headers=json.loads(headers), content=content, request=request)
+
+    def set(self, key: str, response: httpx.Response, ttl: float):
+        """
+        Store a response.
+
+        :param key: the fingerprint of the request.
+        :param response: the response to be stored. It must have been read.
+        :param ttl: time to live of the response in seconds.
+        """
+        now = time.time()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS]
+        content = response.content
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (key, str(response.url), response.status_code, json.dumps(headers), content, len(content),
+                          now + ttl, now))
+            conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            if self.max_size is not None:
+                self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def clear(self):
+        """ Drop all cached responses. """
+        self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """ Close the database connection of the current thread. """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class _Circuit:
+    """ State of the circuit to a single host. """
+
+    def __init__(self):
+        self.state = CircuitBreaker.CLOSED
+        self.outcomes: Deque[Tuple[float, bool]] = deque()  # (monotonic time, failed)
+        self.opened_at = 0.0
+        self.probes = 0
+        self.generation = 0  # increased on each state change
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker of :class:`pysjtu.session.Session`, which stops sending requests to a host that keeps failing.
+
+    Each host has its own circuit. A circuit is closed initially, and requests pass through. When at least
+    `min_requests` requests are sent to a host in the last `window` seconds, and the proportion of failures (transport
+    errors, or responses with a status in `statuses`) reaches `failure_rate`, the circuit opens. Requests to an open
+    circuit fail fast with :exc:`pysjtu.exceptions.CircuitOpenException` without touching the network.
+
+    After `reset_timeout` seconds, the circuit is half open, and up to `half_open_requests` probe requests are let
+    through. If they succeed, the circuit closes, otherwise it opens again.
+
+    Each allowed request is tagged with the generation of the circuit, i.e. the number of state changes so far, and its
+    outcome is ignored once the circuit has changed its state. So slow requests sent while the circuit was closed don't
+    count as probes of a half-open circuit, or as failures of a circuit closed again.
+
+    Usage::
+
+        >>> sess = pysjtu.Session(circuit_breaker=CircuitBreaker.shared())
+
+    :param failure_rate: Proportion of failed requests which opens the circuit.
+    :param min_requests: Minimum number of requests in the window before the circuit can open.
+    :param window: Length (in seconds) of the sliding window where failure rates are computed.
+    :param reset_timeout: Seconds before an open circuit is probed again.
+    :param half_open_requests: Maximum number of concurrent probe requests of a half-open circuit.
+    :param statuses: Status codes of responses counted as failures.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _shared: Optional["CircuitBreaker"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, failure_rate: float = 0.5, min_requests: int = 10, window: float = 30,
+                 reset_timeout: float = 30, half_open_requests: int = 1, statuses=(502, 503, 504)):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if min_requests < 1 or half_open_requests < 1:
+            raise ValueError("min_requests and half_open_requests must be positive")
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self.statuses = frozenset(statuses)
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<CircuitBreaker failure_rate={self.failure_rate} min_requests={self.min_requests}>"
+
+    @classmethod
+    def shared(cls) -> "CircuitBreaker":
+        """ Get the circuit breaker shared by the whole process, which is created with default parameters. """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _circuit(self, host: str) -> _Circuit:
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _Circuit()
+        return circuit
+
+    def state(self, host: str) -> str:
+        """ Get the state of the circuit to a host. """
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == self.OPEN and time.monotonic() - circuit.opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return circuit.state
+
+    def allow(self, host: str) -> Optional[int]:
+        """
+        Check whether a request to a host can be sent. An allowed request must be followed by :meth:`record`
+        or :meth:`discard` with the returned generation.
+
+        :param host: the host of the request.
+        :return: the generation of the circuit the request is allowed in, or None if it's rejected.
+        """
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == self.CLOSED:
+                return circuit.generation
+            if circuit.state == self.OPEN:
+                if time.monotonic() - circuit.opened_at < self.reset_timeout:
+                    return None
+                self._transition(circuit, self.HALF_OPEN)
+                circuit.probes = 0
+            if circuit.probes >= self.half_open_requests:
+                return None
+            circuit.probes += 1
+            return circuit.generation
+
+    def record(self, host: str, failed: bool, generation: int):
+        """
+        Record the outcome of a request. Outcomes of requests allowed before the last state change are ignored.
+
+        :param host: the host of the request.
+        :param failed: whether the request failed.
+        :param generation: the generation returned by :meth:`allow`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.generation != generation:
+                return
+            if circuit.state == self.HALF_OPEN:
+                circuit.probes = max(circuit.probes - 1, 0)
+                if failed:
+                    self._open(circuit, now)
+                else:
+                    self._transition(circuit, self.CLOSED)
+                    circuit.outcomes.clear()
+                return
+            outcomes = circuit.outcomes
+            outcomes.append((now, failed))
+            while outcomes and outcomes[0][0] <= now - self.window:
+                outcomes.popleft()
+            if len(outcomes) >= self.min_requests and \
+                    sum(f for _, f in outcomes) >= self.failure_rate * len(outcomes):
+                self._open(circuit, now)
+
+    def discard(self, host: str, generation: int):
+        """
+        Forget an allowed request whose outcome is unknown, e.g. it's cancelled.
+
+        :param host: the host of the request.
+        :param generation: the generation returned by :meth:`allow`.
+        """
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.generation == generation and circuit.state == self.HALF_OPEN:
+                circuit.probes = max(circuit.probes - 1, 0)
+
+    @staticmethod
+    def _transition(circuit: _Circuit, state: str):
+        circuit.state = state
+        circuit.generation += 1
+
+    def _open(self, circuit: _Circuit, now: float):
+        self._transition(circuit, self.OPEN)
+        circuit.opened_at = now
+        circuit.outcomes.clear()
+
+    def reset(self):
+        """ Close all circuits. """
+        with self._lock:
+            self._circuits = {}
@@ -1,14 +1,26 @@
 import re
+from contextlib import contextmanager
 from datetime import date, datetime
+from typing import Iterator, Optional
 
 from pysjtu import consts
 from pysjtu.client.api import CourseLibMixin, ExamMixin, GPAMixin, ScheduleMixin, ScoreMixin, SelectionMixin, \
-    ProfileMixin
-from pysjtu.client.base import BaseClient
-from pysjtu.session import BaseSession, Session
+    ProfileMixin, AsyncCourseLibMixin, AsyncExamMixin, AsyncGPAMixin, AsyncScheduleMixin, AsyncScoreMixin, \
+    AsyncSelectionMixin, AsyncProfileMixin
+from pysjtu.client.base import BaseAsyncClient, BaseClient
+from pysjtu.session import BaseAsyncSession, BaseSession, Session
+from pysjtu.tracking import Tracker, track
 from pysjtu.utils import forward_method_args
 
 
+def _parse_term_start(text: str) -> date:
+    return datetime.strptime(min(re.findall(r"\d{4}-\d{2}-\d{2}", text)), "%Y-%m-%d").date()
+
+
+def _parse_student_id(text: str) -> int:
+    return int(re.findall(r"(?<=id=\"sessionUserKey\" value=\")\d*", text)[0])
+
+
 class Client(ProfileMixin, SelectionMixin, ScheduleMixin, CourseLibMixin, ExamMixin, GPAMixin, ScoreMixin, BaseClient):
     """
     A pysjtu client with schedule query, score query, exam query, etc.
@@ -44,7 +56,7 @@ class Client(ProfileMixin, SelectionMixin, ScheduleMixin, CourseLibMixin, ExamMi
         """ Get the term start date for the current term. """
         if not self._term_start:
             raw = self._session.get(consts.CALENDAR_URL + str(self.student_id))
-            self._term_start = datetime.strptime(min(re.findall(r"\d{4}-\d{2}-\d{2}", raw.text)), "%Y-%m-%d").date()
+            self._term_start = _parse_term_start(raw.text)
         return self._term_start
 
     # noinspection PyProtectedMember
@@ -53,10 +65,99 @@ class Client(ProfileMixin, SelectionMixin, ScheduleMixin, CourseLibMixin, ExamMi
         """ Get the student id of the current session. """
         if "student_id" not in self._session._cache_store:
             rtn = self._session.get(consts.HOME_URL)
-            self._session._cache_store["student_id"] = int(
-                re.findall(r"(?<=id=\"sessionUserKey\" value=\")\d*", rtn.text)[0])
+            self._session._cache_store["student_id"] = _parse_student_id(rtn.text)
         return self._session._cache_store["student_id"]
 
+    @contextmanager
+    def track(self, max_requests: Optional[int] = None, max_bytes: Optional[int] = None,
+              max_seconds: Optional[float] = None) -> Iterator[Tracker]:
+        """
+        Account HTTP requests, bytes and time used by operations in a `with` block, optionally within a budget.
+
+        Usage::
+
+            >>> with client.track(max_requests=2) as t:
+            ...     client.score(2019, 0)
+            >>> t.requests, t.bytes, t.seconds
+            (1, 4135, 0.21)
+
+        :param max_requests: (optional) Maximum number of requests.
+        :param max_bytes: (optional) Maximum number of bytes sent and received.
+        :param max_seconds: (optional) Maximum seconds elapsed.
+        :raises: :exc:`pysjtu.exceptions.BudgetExceeded` when a response exceeding the budget is received.
+        """
+        with track(self._session, max_requests, max_bytes, max_seconds) as tracker:
+            yield tracker
+
+
+class AsyncClient(AsyncProfileMixin, AsyncSelectionMixin, AsyncScheduleMixin, AsyncCourseLibMixin, AsyncExamMixin,
+                  AsyncGPAMixin, AsyncScoreMixin, BaseAsyncClient):
+    """
+    An asyncio pysjtu client. It provides the same APIs as :class:`Client`, but methods are coroutines and
+    properties are awaitable.
+
+    Usage::
+
+        >>> import pysjtu
+        >>> async with pysjtu.AsyncSession(username="user@sjtu.edu.cn", password="something_secret") as s:
+        ...     client = pysjtu.AsyncClient(session=s)
+        ...     sched, exams = await asyncio.gather(client.schedule(2019, 0), client.exam(2019, 0))
+        ...     await client.student_id
+        519027910001
+
+    :param session: The :class:`pysjtu.session.AsyncSession` to be built upon.
+    """
+    _session: BaseAsyncSession
+    _term_start: date
+
+    def __init__(self, session: BaseAsyncSession):
+        super().__init__()
+        if not isinstance(session, BaseAsyncSession):
+            raise TypeError("'session' isn't an instance of BaseAsyncSession.")
+        self._session = session
+
+        # noinspection PyTypeChecker
+        self._term_start = None  # type: ignore
+
+    @property
+    async def term_start_date(self) -> date:
+        """ Get the term start date for the current term. This property is awaitable. """
+        if not self._term_start:
+            raw = await self._session.get(consts.CALENDAR_URL + str(await self.student_id))
+            self._term_start = _parse_term_start(raw.text)
+        return self._term_start
+
+    # noinspection PyProtectedMember
+    @property
+    async def student_id(self) -> int:
+        """ Get the student id of the current session. This property is awaitable. """
+        if "student_id" not in self._session._cache_store:
+            rtn = await self._session.get(consts.HOME_URL)
+            self._session._cache_store["student_id"] = _parse_student_id(rtn.text)
+        return self._session._cache_store["student_id"]
+
+    @contextmanager
+    def track(self, max_requests: Optional[int] = None, max_bytes: Optional[int] = None,
+              max_seconds: Optional[float] = None) -> Iterator[Tracker]:
+        """
+        Account HTTP requests, bytes and time used by operations in a `with` block, optionally within a budget.
+        Requests of tasks created in the block are counted too, but those of other tasks sharing the session aren't.
+
+        Usage::
+
+            >>> with client.track(max_requests=2) as t:
+            ...     await client.score(2019, 0)
+            >>> t.requests, t.bytes, t.seconds
+            (1, 4135, 0.21)
+
+        :param max_requests: (optional) Maximum number of requests.
+        :param max_bytes: (optional) Maximum number of bytes sent and received.
+        :param max_seconds: (optional) Maximum seconds elapsed.
+        :raises: :exc:`pysjtu.exceptions.BudgetExceeded` when a response exceeding the budget is received.
+        """
+        with track(self._session, max_requests, max_bytes, max_seconds) as tracker:
+            yield tracker
+
 
 @forward_method_args(Session.__init__)
 def create_client(*args, **kwargs) -> Client:
@@ -1,7 +1,7 @@
-from .course import CourseLibMixin
-from .exam import ExamMixin
-from .gpa import GPAMixin
-from .profile import ProfileMixin
-from .schedule import ScheduleMixin
-from .score import ScoreMixin
-from .selection import SelectionMixin
+from .course import AsyncCourseLibMixin, CourseLibMixin
+from .exam import AsyncExamMixin, ExamMixin
+from .gpa import AsyncGPAMixin, GPAMixin
+from .profile import AsyncProfileMixin, ProfileMixin
+from .schedule import AsyncScheduleMixin, ScheduleMixin
+from .score import AsyncScoreMixin, ScoreMixin
+from .selection import AsyncSelectionMixin, SelectionMixin
@@ -2,17 +2,36 @@ from functools import partial
 
 from pysjtu import consts
 from pysjtu import models
-from pysjtu.client.base import BaseClient
+from pysjtu.client.base import BaseAsyncClient, BaseClient
 from pysjtu.utils import range_list_to_str, schema_post_loader
 
 
+def _query_courses_params(year: int, term: int, name: str = None, teacher: str = None, day_of_week: list = None,
+                          week: list = None, time_of_day: list = None) -> dict:
+    _args = {"year": "xnm", "term": "xqm", "name": "kch_id", "teacher": "jqh_id", "day_of_week": "xqj",
+             "week": "qsjsz", "time_of_day": "skjc"}
+    year = year
+    term = consts.TERMS[term]
+    name = name if name else ''
+    teacher = teacher if teacher else ''
+    day_of_week = range_list_to_str(day_of_week) if day_of_week else []
+    week = range_list_to_str(week) if week else []
+    time_of_day = range_list_to_str(time_of_day) if time_of_day else []
+    req_params = {}
+    for (k, v) in _args.items():
+        if k in dir():
+            req_params[v] = locals()[k]
+    return req_params
+
+
 class CourseLibMixin(BaseClient):
     def __init__(self):
         super().__init__()
 
     def query_courses(self, year: int, term: int, page_size: int = 15, name: str = None, teacher: str = None,
                       day_of_week: list = None, week: list = None, time_of_day: list = None,
-                      **kwargs) -> models.QueryResult[models.LibCourse]:
+                      max_in_flight: int = 1, read_ahead: int = 0, bulk: bool = False,
+                      page_store: models.PageStore = None, **kwargs) -> models.QueryResult[models.LibCourse]:
         """
         Query courses matching given criteria from the whole course lib of SJTU.
 
@@ -26,22 +45,36 @@ class CourseLibMixin(BaseClient):
         :param day_of_week: (optional) Day of week of target courses.
         :param week: (optional) Week of target courses.
         :param time_of_day: (optional) Time of day of target courses.
+        :param max_in_flight: (optional) Maximum number of pages fetched concurrently.
+        :param read_ahead: (optional) Number of pages prefetched in background during iteration.
+        :param bulk: (optional) Fetch courses in large pages, shrinking the page size if the server truncates them.
+        :param page_store: (optional) Store of fetched courses, e.g. a :class:`pysjtu.models.LRUPageStore`.
         """
-        _args = {"year": "xnm", "term": "xqm", "name": "kch_id", "teacher": "jqh_id", "day_of_week": "xqj",
-                 "week": "qsjsz", "time_of_day": "skjc"}
-        year = year
-        term = consts.TERMS[term]
-        name = name if name else ''
-        teacher = teacher if teacher else ''
-        day_of_week = range_list_to_str(day_of_week) if day_of_week else []
-        week = range_list_to_str(week) if week else []
-        time_of_day = range_list_to_str(time_of_day) if time_of_day else []
-        req_params = {}
-        for (k, v) in _args.items():
-            if k in dir():
-                req_params[v] = locals()[k]
-
+        req_params = _query_courses_params(year, term, name, teacher, day_of_week, week, time_of_day)
         req = partial(self._session.post, consts.COURSELIB_URL + str(self.student_id), **kwargs)
 
-        return models.QueryResult(req, partial(schema_post_loader, models.LibCourse.Schema), req_params,
-                                  page_size=page_size)
+        return models.QueryResult(req, partial(schema_post_loader, models.LibCourse), req_params,
+                                  page_size=page_size, max_in_flight=max_in_flight, read_ahead=read_ahead,
+                                  bulk=bulk, page_store=page_store)
+
+
+class AsyncCourseLibMixin(BaseAsyncClient):
+    def __init__(self):
+        super().__init__()
+
+    async def query_courses(self, year: int, term: int, page_size: int = 15, name: str = None, teacher: str = None,
+                            day_of_week: list = None, week: list = None, time_of_day: list = None,
+                            max_in_flight: int = 1, read_ahead: int = 0, bulk: bool = False,
+                            page_store: models.PageStore = None, **kwargs) -> models.AsyncQueryResult[models.LibCourse]:
+        """
+        Query courses matching given criteria from the whole course lib of SJTU.
+
+        See :meth:`pysjtu.client.Client.query_courses` for details.
+        The returned :class:`pysjtu.models.AsyncQueryResult` is lazy and its items are awaitable.
+        """
+        req_params = _query_courses_params(year, term, name, teacher, day_of_week, week, time_of_day)
+        req = partial(self._session.post, consts.COURSELIB_URL + str(await self.student_id), **kwargs)
+
+        return models.AsyncQueryResult(req, partial(schema_post_loader, models.LibCourse), req_params,
+                                       page_size=page_size, max_in_flight=max_in_flight, read_ahead=read_ahead,
+                                       bulk=bulk, page_store=page_store)
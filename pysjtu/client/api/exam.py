@@ -1,8 +1,24 @@
 import time
 
+import httpx
+
 from pysjtu import consts
 from pysjtu import models
-from pysjtu.client.base import BaseClient
+from pysjtu.client.base import BaseAsyncClient, BaseClient
+
+
+def _exam_payload(year: int, term: int) -> dict:
+    return {"xnm": year, "xqm": consts.TERMS[term], "_search": False, "ksmcdmb_id": '',
+            "kch": '', "kc": '', "ksrq": '', "kkbm_id": '',
+            "nd": int(time.time() * 1000), "queryModel.showCount": 15,
+            "queryModel.currentPage": 1, "queryModel.sortName": "",
+            "queryModel.sortOrder": "asc", "time": 1}
+
+
+def _load_exams(year: int, term: int, raw: httpx.Response) -> models.Exams:
+    exams = models.Exams(year, term)
+    exams.load(raw.json()["items"])  # type: ignore
+    return exams
 
 
 class ExamMixin(BaseClient):
@@ -18,12 +34,23 @@ class ExamMixin(BaseClient):
         :param year: query year
         :param term: query term
         """
-        raw = self._session.post(consts.EXAM_URL + str(self.student_id),
-                                 data={"xnm": year, "xqm": consts.TERMS[term], "_search": False, "ksmcdmb_id": '',
-                                       "kch": '', "kc": '', "ksrq": '', "kkbm_id": '',
-                                       "nd": int(time.time() * 1000), "queryModel.showCount": 15,
-                                       "queryModel.currentPage": 1, "queryModel.sortName": "",
-                                       "queryModel.sortOrder": "asc", "time": 1}, **kwargs)
-        scores = models.Exams(year, term)
-        scores.load(raw.json()["items"])  # type: ignore
-        return scores
+        raw = self._session.post(consts.EXAM_URL + str(self.student_id), data=_exam_payload(year, term), **kwargs)
+        return _load_exams(year, term, raw)
+
+
+class AsyncExamMixin(BaseAsyncClient):
+    def __init__(self):
+        super().__init__()
+
+    async def exam(self, year: int, term: int, **kwargs) -> models.Results[models.Exam]:
+        """
+        Fetch your exams schedule of specific year & term.
+
+        See :meth:`pysjtu.session.AsyncSession.post` for more information about the keyword arguments.
+
+        :param year: query year
+        :param term: query term
+        """
+        raw = await self._session.post(consts.EXAM_URL + str(await self.student_id), data=_exam_payload(year, term),
+                                       **kwargs)
+        return _load_exams(year, term, raw)
@@ -1,9 +1,29 @@
 import time
 
+import httpx
+
 from pysjtu import consts
 from pysjtu import models
-from pysjtu.client.base import BaseClient
+from pysjtu.client.base import BaseAsyncClient, BaseClient
+from pysjtu.compiled import get_loader
 from pysjtu.exceptions import GPACalculationException
+from pysjtu.schema import get_schema
+
+
+def _check_gpa_calculation(calc_rtn: httpx.Response):
+    if calc_rtn.text != "\"统计成功！\"":
+        if calc_rtn.text == "\"统计失败！\"":
+            raise GPACalculationException("Calculation failure.")
+        if "无功能权限" in calc_rtn.text:
+            raise GPACalculationException("Unauthorized.")
+
+
+def _gpa_query_payload(compiled_params: dict) -> dict:
+    return {**compiled_params,
+            "_search": False,
+            "nd": int(time.time() * 1000), "queryModel.showCount": 15,
+            "queryModel.currentPage": 1, "queryModel.sortName": "",
+            "queryModel.sortOrder": "asc", "time": 0}
 
 
 class GPAMixin(BaseClient):
@@ -20,7 +40,7 @@ class GPAMixin(BaseClient):
         if not self._default_gpa_query_params:
             rtn = self._session.get(consts.GPA_PARAMS_URL,
                                     params={"_": int(time.time() * 1000), "su": self.student_id})
-            self._default_gpa_query_params = models.GPAQueryParams.Schema().load(rtn.json())  # type: ignore
+            self._default_gpa_query_params = get_loader(models.GPAQueryParams).load(rtn.json())  # type: ignore
 
         return self._default_gpa_query_params
 
@@ -40,18 +60,47 @@ class GPAMixin(BaseClient):
         :param query_params: parameters for this query.
             A default one can be fetched by reading property :attr:`default_gpa_query_params`.
         """
-        compiled_params = models.GPAQueryParams.Schema().dump(query_params)
+        compiled_params = get_schema(models.GPAQueryParams).dump(query_params)
         calc_rtn = self._session.post(consts.GPA_CALC_URL + str(self.student_id),
                                       data=compiled_params, **kwargs)
-        if calc_rtn.text != "\"统计成功！\"":
-            if calc_rtn.text == "\"统计失败！\"":
-                raise GPACalculationException("Calculation failure.")
-            if "无功能权限" in calc_rtn.text:
-                raise GPACalculationException("Unauthorized.")
-        compiled_params.update({"_search": False,
-                                "nd": int(time.time() * 1000), "queryModel.showCount": 15,
-                                "queryModel.currentPage": 1, "queryModel.sortName": "",
-                                "queryModel.sortOrder": "asc", "time": 0})
+        _check_gpa_calculation(calc_rtn)
         raw = self._session.post(consts.GPA_QUERY_URL + str(self.student_id),
-                                 data=compiled_params, **kwargs)
-        return models.GPA.Schema().load(raw.json()["items"][0])  # type: ignore
+                                 data=_gpa_query_payload(compiled_params), **kwargs)
+        return get_loader(models.GPA).load(raw.json()["items"][0])  # type: ignore
+
+
+class AsyncGPAMixin(BaseAsyncClient):
+    _default_gpa_query_params: models.GPAQueryParams
+
+    def __init__(self):
+        super().__init__()
+        # noinspection PyTypeChecker
+        self._default_gpa_query_params = None
+
+    @property
+    async def default_gpa_query_params(self) -> models.GPAQueryParams:
+        """ Get default gpa query params defined by the website. This property is awaitable. """
+        if not self._default_gpa_query_params:
+            rtn = await self._session.get(consts.GPA_PARAMS_URL,
+                                          params={"_": int(time.time() * 1000), "su": await self.student_id})
+            self._default_gpa_query_params = get_loader(models.GPAQueryParams).load(rtn.json())  # type: ignore
+
+        return self._default_gpa_query_params
+
+    async def gpa(self, query_params: models.GPAQueryParams, **kwargs) -> models.GPA:
+        """
+        Query your GP & GPA and their rankings of specific year & term.
+
+        See :meth:`pysjtu.client.Client.gpa` for details.
+
+        :param query_params: parameters for this query.
+            A default one can be fetched by awaiting property :attr:`default_gpa_query_params`.
+        """
+        compiled_params = get_schema(models.GPAQueryParams).dump(query_params)
+        student_id = await self.student_id
+        calc_rtn = await self._session.post(consts.GPA_CALC_URL + str(student_id),
+                                            data=compiled_params, **kwargs)
+        _check_gpa_calculation(calc_rtn)
+        raw = await self._session.post(consts.GPA_QUERY_URL + str(student_id),
+                                       data=_gpa_query_payload(compiled_params), **kwargs)
+        return get_loader(models.GPA).load(raw.json()["items"][0])  # type: ignore
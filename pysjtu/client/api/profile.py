@@ -1,5 +1,5 @@
 from pysjtu import consts
-from pysjtu.client.base import BaseClient
+from pysjtu.client.base import BaseAsyncClient, BaseClient
 from pysjtu.models.profile import Profile
 from pysjtu.parser.profile import parse, profile_fields
 
@@ -16,3 +16,17 @@ class ProfileMixin(BaseClient):
             rtn = self._session.get(f"{consts.PROFILE_URL}{self.student_id}")
             self._session._cache_store["profile"] = parse(profile_fields, rtn.text)
         return Profile(**self._session._cache_store["profile"])
+
+
+class AsyncProfileMixin(BaseAsyncClient):
+    def __init__(self):
+        super().__init__()
+
+    # noinspection PyProtectedMember
+    @property
+    async def profile(self) -> Profile:
+        """ Get the user profile of the current session. This property is awaitable. """
+        if "profile" not in self._session._cache_store:
+            rtn = await self._session.get(f"{consts.PROFILE_URL}{await self.student_id}")
+            self._session._cache_store["profile"] = parse(profile_fields, rtn.text)
+        return Profile(**self._session._cache_store["profile"])
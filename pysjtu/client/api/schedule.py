@@ -1,6 +1,18 @@
+import httpx
+
 from pysjtu import consts
 from pysjtu import models
-from pysjtu.client.base import BaseClient
+from pysjtu.client.base import BaseAsyncClient, BaseClient
+
+
+def _schedule_payload(year: int, term: int) -> dict:
+    return {"xnm": year, "xqm": consts.TERMS[term]}
+
+
+def _load_schedule(year: int, term: int, raw: httpx.Response) -> models.Schedule:
+    schedule = models.Schedule(year, term)
+    schedule.load(raw.json()["kbList"])  # type: ignore
+    return schedule
 
 
 class ScheduleMixin(BaseClient):
@@ -16,7 +28,22 @@ class ScheduleMixin(BaseClient):
         :param year: query year
         :param term: query term
         """
-        raw = self._session.post(consts.SCHEDULE_URL, data={"xnm": year, "xqm": consts.TERMS[term]}, **kwargs)
-        schedule = models.Schedule(year, term)
-        schedule.load(raw.json()["kbList"])  # type: ignore
-        return schedule
+        raw = self._session.post(consts.SCHEDULE_URL, data=_schedule_payload(year, term), **kwargs)
+        return _load_schedule(year, term, raw)
+
+
+class AsyncScheduleMixin(BaseAsyncClient):
+    def __init__(self):
+        super().__init__()
+
+    async def schedule(self, year: int, term: int, **kwargs) -> models.Results[models.ScheduleCourse]:
+        """
+        Fetch your course schedule of specific year & term.
+
+        See :meth:`pysjtu.session.AsyncSession.post` for more information about the keyword arguments.
+
+        :param year: query year
+        :param term: query term
+        """
+        raw = await self._session.post(consts.SCHEDULE_URL, data=_schedule_payload(year, term), **kwargs)
+        return _load_schedule(year, term, raw)
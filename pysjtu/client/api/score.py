@@ -1,11 +1,33 @@
+import asyncio
 import time
 from functools import partial
 from typing import List
 
+import httpx
+
 from pysjtu import consts
 from pysjtu import models
-from pysjtu.client.base import BaseClient
+from pysjtu.client.base import BaseAsyncClient, BaseClient
 from pysjtu.models import Scores
+from pysjtu.compiled import get_loader
+
+
+def _score_detail_payload(year: int, term: int, class_id: str) -> dict:
+    return {"xnm": year, "xqm": consts.TERMS[term], "jxb_id": class_id, "_search": False,
+            "nd": int(time.time() * 1000), "queryModel.showCount": 15,
+            "queryModel.currentPage": 1, "queryModel.sortName": "",
+            "queryModel.sortOrder": "asc", "time": 1}
+
+
+def _load_score_detail(raw: httpx.Response) -> List[models.ScoreFactor]:
+    return get_loader(models.ScoreFactor, many=True).load(raw.json()["items"][:-1])  # type: ignore
+
+
+def _score_payload(year: int, term: int) -> dict:
+    return {"xnm": year, "xqm": consts.TERMS[term], "_search": False,
+            "nd": int(time.time() * 1000), "queryModel.showCount": 15,
+            "queryModel.currentPage": 1, "queryModel.sortName": "",
+            "queryModel.sortOrder": "asc", "time": 1}
 
 
 class ScoreMixin(BaseClient):
@@ -14,12 +36,8 @@ class ScoreMixin(BaseClient):
 
     def _get_score_detail(self, year: int, term: int, class_id: str, **kwargs) -> List[models.ScoreFactor]:
         raw = self._session.post(consts.SCORE_DETAIL_URL + str(self.student_id),
-                                 data={"xnm": year, "xqm": consts.TERMS[term], "jxb_id": class_id, "_search": False,
-                                       "nd": int(time.time() * 1000), "queryModel.showCount": 15,
-                                       "queryModel.currentPage": 1, "queryModel.sortName": "",
-                                       "queryModel.sortOrder": "asc", "time": 1}, **kwargs)
-        factors = models.ScoreFactor.Schema(many=True).load(raw.json()["items"][:-1])  # type: ignore
-        return factors
+                                 data=_score_detail_payload(year, term, class_id), **kwargs)
+        return _load_score_detail(raw)
 
     def score(self, year: int, term: int, **kwargs) -> Scores:
         """
@@ -30,11 +48,37 @@ class ScoreMixin(BaseClient):
         :param year: query year
         :param term: query term
         """
-        raw = self._session.post(consts.SCORE_URL,
-                                 data={"xnm": year, "xqm": consts.TERMS[term], "_search": False,
-                                       "nd": int(time.time() * 1000), "queryModel.showCount": 15,
-                                       "queryModel.currentPage": 1, "queryModel.sortName": "",
-                                       "queryModel.sortOrder": "asc", "time": 1}, **kwargs)
+        raw = self._session.post(consts.SCORE_URL, data=_score_payload(year, term), **kwargs)
         scores = models.Scores(year, term, partial(self._get_score_detail, **kwargs))
         scores.load(raw.json()["items"])  # type: ignore
         return scores
+
+
+class AsyncScoreMixin(BaseAsyncClient):
+    def __init__(self):
+        super().__init__()
+
+    async def _get_score_detail(self, year: int, term: int, class_id: str, **kwargs) -> List[models.ScoreFactor]:
+        raw = await self._session.post(consts.SCORE_DETAIL_URL + str(await self.student_id),
+                                       data=_score_detail_payload(year, term, class_id), **kwargs)
+        return _load_score_detail(raw)
+
+    def _spawn_score_detail(self, year: int, term: int, class_id: str, **kwargs) -> "asyncio.Task":
+        # A task, unlike a coroutine, can be awaited more than once, so it's safe to be memoized by Score.detail.
+        return asyncio.ensure_future(self._get_score_detail(year, term, class_id, **kwargs))
+
+    async def score(self, year: int, term: int, **kwargs) -> Scores:
+        """
+        Fetch your scores of specific year & term.
+
+        The :attr:`pysjtu.models.Score.detail` of returned scores is awaitable.
+
+        See :meth:`pysjtu.session.AsyncSession.post` for more information about the keyword arguments.
+
+        :param year: query year
+        :param term: query term
+        """
+        raw = await self._session.post(consts.SCORE_URL, data=_score_payload(year, term), **kwargs)
+        scores = models.Scores(year, term, partial(self._spawn_score_detail, **kwargs))
+        scores.load(raw.json()["items"])  # type: ignore
+        return scores
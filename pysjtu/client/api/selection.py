@@ -1,12 +1,110 @@
+import asyncio
 from functools import lru_cache, partial
-from typing import List
+from typing import List, Tuple
 
 from pysjtu import consts
-from pysjtu.client.base import BaseClient
+from pysjtu.client.base import BaseAsyncClient, BaseClient
+from pysjtu.compiled import get_loader
 from pysjtu.exceptions import DropException, FullCapacityException, RegistrationException, \
     SelectionClassFetchException, SelectionNotAvailableException, TimeConflictException
 from pysjtu.models.selection import SelectionClass, SelectionSector, SelectionSharedInfo, SelectionClassLazySchema
 from pysjtu.parser.selection import parse_sector, parse_sectors, parse_shared_info
+from pysjtu.schema import get_schema
+from pysjtu.utils import async_lru_cache
+
+
+def _is_registered_payload(_class: SelectionClass) -> dict:
+    return {
+        "jxb_id": _class.register_id,
+        "xkkz_id": _class.sector.xkkz_id,
+        "xnm": _class.sector.shared_info.selection_year,
+        "xqm": _class.sector.shared_info.selection_term
+    }
+
+
+def _register_payload(_class: SelectionClass) -> dict:
+    return {
+        "jxb_ids": _class.register_id,
+        "kch_id": _class.internal_course_id,
+        "qz": 0
+    }
+
+
+def _check_register_result(register):
+    if not register or "flag" not in register:
+        raise RegistrationException("Bad request.")  # pragma: no cover
+    if register["flag"] == "0":
+        if "msg" in register:
+            if register["msg"] == "所选教学班的上课时间与其他教学班有冲突！":
+                raise TimeConflictException
+            else:  # pragma: no cover
+                raise RegistrationException(register["msg"])  # pragma: no cover
+        else:
+            raise RegistrationException("Unknown error.")  # pragma: no cover
+    elif register["flag"] == "-1":
+        raise FullCapacityException
+    elif register["flag"] == "1":
+        return
+    else:
+        raise RegistrationException(f"Unexpected response: {register}")  # pragma: no cover
+
+
+def _drop_payload(_class: SelectionClass) -> dict:
+    return {
+        "kch_id": _class.internal_course_id,
+        "jxb_ids": _class.register_id
+    }
+
+
+def _check_drop_result(drop):
+    if drop == "1":
+        return
+    elif drop == "2":  # pragma: no cover
+        raise DropException("Server busy.")  # pragma: no cover
+    elif drop == "3":  # pragma: no cover
+        raise DropException("Unknown error.")  # pragma: no cover
+    elif drop == "4":  # pragma: no cover
+        raise DropException("Illegal access.")  # pragma: no cover
+    elif drop == "5":  # pragma: no cover
+        raise DropException("Validation failure.")  # pragma: no cover
+    else:
+        raise DropException(f"Unexpected response: {drop}")  # pragma: no cover
+
+
+def _sector_payload(sector: SelectionSector) -> dict:
+    return {
+        **get_schema(SelectionSector).dump(sector),
+        **get_schema(SelectionSharedInfo).dump(sector.shared_info)
+    }
+
+
+def _find_selection_class(class_dicts: List[dict], selection_class: SelectionClass) -> dict:
+    for class_dict in class_dicts:
+        if class_dict["class_id"] == selection_class.class_id:
+            return class_dict
+    raise SelectionClassFetchException("Unable to fetch selection class information.")  # pragma: no cover
+
+
+def _parse_sectors_page(sectors_query: str) -> Tuple[SelectionSharedInfo, List[Tuple[str, str, str]]]:
+    if "对不起，当前不属于选课阶段" in sectors_query:
+        raise SelectionNotAvailableException
+
+    raw_shared_info = parse_shared_info(sectors_query)
+    shared_info: SelectionSharedInfo = get_loader(SelectionSharedInfo).load(raw_shared_info)
+    return shared_info, parse_sectors(sectors_query)
+
+
+def _sector_param_payload(shared_info: SelectionSharedInfo, xkkz_id: str) -> dict:
+    return {"xkkz_id": xkkz_id, "xszxzt": shared_info.self_selecting_status, "kspage": 0, "jspage": 0}
+
+
+def _load_sector(sector_query: str, shared_info: SelectionSharedInfo, kklxdm: str, xkkz_id: str,
+                 name: str) -> SelectionSector:
+    raw_sector = parse_sector(sector_query)
+    sector: SelectionSector = get_loader(SelectionSector).load(raw_sector)
+    sector.name, sector.course_type_code, sector.xkkz_id, sector.shared_info = \
+        name, kklxdm, xkkz_id, shared_info
+    return sector
 
 
 class SelectionMixin(BaseClient):
@@ -16,85 +114,41 @@ class SelectionMixin(BaseClient):
         self._get_selection_classes = lru_cache(maxsize=16)(self._get_selection_classes)
 
     def _class_is_registered(self, _class: SelectionClass, **kwargs) -> bool:
-        payload = {
-            "jxb_id": _class.register_id,
-            "xkkz_id": _class.sector.xkkz_id,
-            "xnm": _class.sector.shared_info.selection_year,
-            "xqm": _class.sector.shared_info.selection_term
-        }
-        is_registered = self._session.post(f"{consts.SELECTION_IS_REGISTERED}{self.student_id}", data=payload,
-                                           **kwargs).json()
+        is_registered = self._session.post(f"{consts.SELECTION_IS_REGISTERED}{self.student_id}",
+                                           data=_is_registered_payload(_class), **kwargs).json()
         return is_registered == "1"
 
     def _class_register(self, _class: SelectionClass, **kwargs):
-        payload = {
-            "jxb_ids": _class.register_id,
-            "kch_id": _class.internal_course_id,
-            "qz": 0
-        }
-        register = self._session.post(f"{consts.SELECTION_REGISTER}{self.student_id}", data=payload, **kwargs).json()
-        if not register or "flag" not in register:
-            raise RegistrationException("Bad request.")  # pragma: no cover
-        if register["flag"] == "0":
-            if "msg" in register:
-                if register["msg"] == "所选教学班的上课时间与其他教学班有冲突！":
-                    raise TimeConflictException
-                else:  # pragma: no cover
-                    raise RegistrationException(register["msg"])  # pragma: no cover
-            else:
-                raise RegistrationException("Unknown error.")  # pragma: no cover
-        elif register["flag"] == "-1":
-            raise FullCapacityException
-        elif register["flag"] == "1":
-            return
-        else:
-            raise RegistrationException(f"Unexpected response: {register}")  # pragma: no cover
+        register = self._session.post(f"{consts.SELECTION_REGISTER}{self.student_id}",
+                                      data=_register_payload(_class), **kwargs).json()
+        _check_register_result(register)
 
     def _class_drop(self, _class: SelectionClass, **kwargs):
-        payload = {
-            "kch_id": _class.internal_course_id,
-            "jxb_ids": _class.register_id
-        }
-        drop = self._session.post(f"{consts.SELECTION_DROP}{self.student_id}", data=payload, **kwargs).json()
-        if drop == "1":
-            return
-        elif drop == "2":  # pragma: no cover
-            raise DropException("Server busy.")  # pragma: no cover
-        elif drop == "3":  # pragma: no cover
-            raise DropException("Unknown error.")  # pragma: no cover
-        elif drop == "4":  # pragma: no cover
-            raise DropException("Illegal access.")  # pragma: no cover
-        elif drop == "5":  # pragma: no cover
-            raise DropException("Validation failure.")  # pragma: no cover
-        else:
-            raise DropException(f"Unexpected response: {drop}")  # pragma: no cover
+        drop = self._session.post(f"{consts.SELECTION_DROP}{self.student_id}",
+                                  data=_drop_payload(_class), **kwargs).json()
+        _check_drop_result(drop)
 
     def _fetch_selection_classes(self, sector: SelectionSector, internal_course_id: str) -> List[dict]:
         payload = {
-            **SelectionSector.Schema().dump(sector),
-            **SelectionSharedInfo.Schema().dump(sector.shared_info),
+            **_sector_payload(sector),
             "kch_id": internal_course_id
         }
         classes_query = self._session.post(f"{consts.SELECTION_QUERY_CLASSES}{self.student_id}", data=payload).json()
-        return SelectionClassLazySchema(many=True).load(classes_query)
+        return get_loader(SelectionClassLazySchema, many=True).load(classes_query)
 
     def _fetch_selection_class(self, selection_class: SelectionClass):
         class_dicts = self._fetch_selection_classes(selection_class.sector, selection_class.internal_course_id)
-        for class_dict in class_dicts:
-            if class_dict["class_id"] == selection_class.class_id:
-                return class_dict
-        raise SelectionClassFetchException("Unable to fetch selection class information.")  # pragma: no cover
+        return _find_selection_class(class_dicts, selection_class)
 
     def _get_selection_classes(self, sector: SelectionSector) -> List[SelectionClass]:
         payload = {
-            **SelectionSector.Schema().dump(sector),
-            **SelectionSharedInfo.Schema().dump(sector.shared_info),
+            **_sector_payload(sector),
             "kspage": 1,
             "jspage": 5000
         }
         courses_query = self._session.post(f"{consts.SELECTION_QUERY_COURSES}{self.student_id}", data=payload).json()
         selection_classes: List[SelectionClass] = [item for item in
-                                                   SelectionClass.Schema(many=True).load(courses_query["tmpList"])]
+                                                   get_loader(SelectionClass, many=True).load(courses_query["tmpList"])]
         for _class in selection_classes:
             _class.sector = sector
             _class._load_func = partial(self._fetch_selection_class, _class)
@@ -110,23 +164,112 @@ class SelectionMixin(BaseClient):
         This property contains all available course sectors in this round of selection.
         """
         sectors_query = self._session.get(f"{consts.SELECTION_ALL_SECTORS_PARAM_URL}{self.student_id}").text
-        if "对不起，当前不属于选课阶段" in sectors_query:
-            raise SelectionNotAvailableException
+        shared_info, raw_sectors = _parse_sectors_page(sectors_query)
 
-        raw_shared_info = parse_shared_info(sectors_query)
-        shared_info: SelectionSharedInfo = SelectionSharedInfo.Schema().load(raw_shared_info)
-
-        raw_sectors = parse_sectors(sectors_query)
         sectors = []
         for kklxdm, xkkz_id, name in raw_sectors:
             sector_query = self._session.post(f"{consts.SELECTION_SECTOR_PARAM_URL}{self.student_id}",
-                                              data={"xkkz_id": xkkz_id,
-                                                    "xszxzt": shared_info.self_selecting_status,
-                                                    "kspage": 0, "jspage": 0}).text
-            raw_sector = parse_sector(sector_query)
-            sector: SelectionSector = SelectionSector.Schema().load(raw_sector)
-            sector.name, sector.course_type_code, sector.xkkz_id, sector.shared_info = \
-                name, kklxdm, xkkz_id, shared_info
+                                              data=_sector_param_payload(shared_info, xkkz_id)).text
+            sector = _load_sector(sector_query, shared_info, kklxdm, xkkz_id, name)
+            sector._func_classes = partial(self._get_selection_classes, sector=sector)
+            sectors.append(sector)
+
+        return sectors
+
+    def flush_selection_class_cache(self):
+        self._fetch_selection_classes.cache_clear()
+
+
+class AsyncSelectionMixin(BaseAsyncClient):
+    def __init__(self):
+        super().__init__()
+        self._fetch_selection_classes = async_lru_cache(maxsize=1024)(self._fetch_selection_classes)
+        self._get_selection_classes = async_lru_cache(maxsize=16)(self._get_selection_classes)
+
+    async def _class_is_registered(self, _class: SelectionClass, **kwargs) -> bool:
+        await self.load_selection_class(_class)
+        is_registered = (await self._session.post(f"{consts.SELECTION_IS_REGISTERED}{await self.student_id}",
+                                                  data=_is_registered_payload(_class), **kwargs)).json()
+        return is_registered == "1"
+
+    async def _class_register(self, _class: SelectionClass, **kwargs):
+        await self.load_selection_class(_class)
+        register = (await self._session.post(f"{consts.SELECTION_REGISTER}{await self.student_id}",
+                                             data=_register_payload(_class), **kwargs)).json()
+        _check_register_result(register)
+
+    async def _class_drop(self, _class: SelectionClass, **kwargs):
+        await self.load_selection_class(_class)
+        drop = (await self._session.post(f"{consts.SELECTION_DROP}{await self.student_id}",
+                                         data=_drop_payload(_class), **kwargs)).json()
+        _check_drop_result(drop)
+
+    async def _fetch_selection_classes(self, sector: SelectionSector, internal_course_id: str) -> List[dict]:
+        payload = {
+            **_sector_payload(sector),
+            "kch_id": internal_course_id
+        }
+        classes_query = (await self._session.post(f"{consts.SELECTION_QUERY_CLASSES}{await self.student_id}",
+                                                  data=payload)).json()
+        return get_loader(SelectionClassLazySchema, many=True).load(classes_query)
+
+    @staticmethod
+    def _unloaded_selection_class():
+        raise SelectionClassFetchException("Selection class details haven't been loaded. "
+                                           "Call `await client.load_selection_class(...)` first.")
+
+    async def load_selection_class(self, selection_class: SelectionClass):
+        """
+        Load lazy fields (register id, teachers, time, etc.) of a selection class.
+
+        Lazy fields can't be fetched implicitly on attribute access in an event loop,
+        so they have to be loaded explicitly before being accessed. Registration operations load them automatically.
+
+        :param selection_class: the selection class to be loaded.
+        """
+        class_dicts = await self._fetch_selection_classes(selection_class.sector, selection_class.internal_course_id)
+        for k, v in _find_selection_class(class_dicts, selection_class).items():
+            setattr(selection_class, k, v)
+
+    async def _get_selection_classes(self, sector: SelectionSector) -> List[SelectionClass]:
+        payload = {
+            **_sector_payload(sector),
+            "kspage": 1,
+            "jspage": 5000
+        }
+        courses_query = (await self._session.post(f"{consts.SELECTION_QUERY_COURSES}{await self.student_id}",
+                                                  data=payload)).json()
+        selection_classes: List[SelectionClass] = [item for item in
+                                                   get_loader(SelectionClass, many=True).load(courses_query["tmpList"])]
+        for _class in selection_classes:
+            _class.sector = sector
+            _class._load_func = self._unloaded_selection_class
+            _class.is_registered = partial(self._class_is_registered, _class)
+            _class.register = partial(self._class_register, _class)
+            _class.drop = partial(self._class_drop, _class)
+        return selection_classes
+
+    @property
+    async def course_selection_sectors(self) -> List[SelectionSector]:
+        """
+        In iSJTU, courses are split into different sectors when selecting course.
+        This property contains all available course sectors in this round of selection. It's awaitable.
+        Sector parameters are fetched concurrently.
+
+        The :attr:`pysjtu.models.SelectionSector.classes` of returned sectors is awaitable as well.
+        """
+        student_id = await self.student_id
+        sectors_query = (await self._session.get(f"{consts.SELECTION_ALL_SECTORS_PARAM_URL}{student_id}")).text
+        shared_info, raw_sectors = _parse_sectors_page(sectors_query)
+
+        sector_queries = await asyncio.gather(*(
+            self._session.post(f"{consts.SELECTION_SECTOR_PARAM_URL}{student_id}",
+                               data=_sector_param_payload(shared_info, xkkz_id))
+            for _, xkkz_id, _ in raw_sectors))
+
+        sectors = []
+        for (kklxdm, xkkz_id, name), sector_query in zip(raw_sectors, sector_queries):
+            sector = _load_sector(sector_query.text, shared_info, kklxdm, xkkz_id, name)
             sector._func_classes = partial(self._get_selection_classes, sector=sector)
             sectors.append(sector)
 
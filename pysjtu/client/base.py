@@ -1,4 +1,6 @@
-from pysjtu.session import Session
+from typing import Awaitable
+
+from pysjtu.session import AsyncSession, Session
 
 
 class BaseClient:
@@ -7,3 +9,11 @@ class BaseClient:
 
     @property
     def student_id(self) -> int: ...
+
+
+class BaseAsyncClient:
+    """ Base class for AsyncClientMixin """
+    _session: AsyncSession
+
+    @property
+    def student_id(self) -> Awaitable[int]: ...
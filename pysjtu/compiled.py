@@ -0,0 +1,183 @@
+"""
+Code-generated loaders of models, which build model instances directly from response data.
+
+A compiled loader is generated from the marshmallow schema of a model: field keys, renamed keys (`load_key`), defaults
+and custom fields are all taken from the schema, so marshmallow stays the reference implementation. Builtin fields
+(strings, integers, floats and raw values) are converted inline, and custom fields are called without marshmallow's
+dispatching. Whenever a row doesn't take the fast path, e.g. a required key is missing or a field raises an error,
+the whole input is loaded by the schema again, so results and errors are the same as marshmallow's.
+
+Compiled loaders are disabled by default. Enable them with :func:`use_compiled_loaders`.
+"""
+import math
+from typing import Dict, Optional, Tuple
+
+from marshmallow import EXCLUDE, RAISE, Schema, fields, missing
+
+from pysjtu.schema import HookedSchema, LoadDumpSchema, apply_rename_plan, get_schema
+
+_enabled = False
+_loaders: Dict[Tuple[type, bool], object] = {}
+
+# Hooks a compiled loader knows how to run, i.e. those installed by :func:`pysjtu.schema.FinalizeHook`.
+_SUPPORTED_HOOKS = {("pre_load", False): ["pre_load"], ("post_load", False): ["post_load"],
+                    ("pre_dump", False): ["pre_dump"], ("post_dump", False): ["post_dump"]}
+
+
+class _Fallback(Exception):
+    """ Raised by generated code when a row has to be loaded by marshmallow. """
+
+
+def use_compiled_loaders(enabled: bool = True):
+    """
+    Enable or disable compiled loaders for all models.
+
+    :param enabled: (optional) whether to use compiled loaders.
+    """
+    global _enabled
+    _enabled = enabled
+    _loaders.clear()
+
+
+def _finite(v: float) -> float:
+    if math.isfinite(v):
+        return v
+    raise _Fallback
+
+
+def _implementation(schema: Schema, name: str):
+    """ Get the class implementing a hook, skipping the wrappers installed by :func:`pysjtu.schema.FinalizeHook`. """
+    for cls in type(schema).__mro__:
+        method = vars(cls).get(name)
+        if method is not None and not hasattr(method, "__marshmallow_hook__"):
+            return cls
+    return None  # pragma: no cover
+
+
+def _convert(i: int, field: fields.Field, key: str) -> str:
+    """ Generate the expression converting the present, non-null value `v` of a field. """
+    if field.validators:
+        return f"f{i}.deserialize(v, {key!r}, data)"
+    generic = f"f{i}._deserialize(v, {key!r}, data)"
+    if type(field) is fields.Raw:
+        return "v"
+    elif type(field) is fields.String:
+        return f"v if type(v) is str else {generic}"
+    elif type(field) is fields.Integer and not field.strict:
+        return f"int(v) if type(v) is int or type(v) is str else {generic}"
+    elif type(field) is fields.Float:
+        # NaN and infinity are rejected by marshmallow unless allowed, so they fall back to it then
+        convert = "float(v)" if field.allow_nan else "finite(float(v))"
+        return f"{convert} if type(v) is float or type(v) is int or type(v) is str else {generic}"
+    return generic
+
+
+def _generate(schema: Schema, model: Optional[type]) -> Tuple[str, dict]:
+    """ Generate the source of a loader, and the namespace it runs in. """
+    hooks = {tag: names for tag, names in schema._hooks.items() if names}
+    if any(_SUPPORTED_HOOKS.get(tag) != names for tag, names in hooks.items()):
+        raise TypeError(f"{type(schema).__name__} has hooks or validators unsupported by compiled loaders")
+    if schema.unknown not in (EXCLUDE, RAISE):
+        raise TypeError(f"{type(schema).__name__} includes unknown keys, which is unsupported by compiled loaders")
+
+    namespace = {"missing": missing, "Fallback": _Fallback, "finite": _finite, "model": model}
+    lines = ["def load(data, many=False):"]
+    if ("pre_load", False) in hooks and _implementation(schema, "pre_load") is not LoadDumpSchema:
+        namespace["pre_load"] = schema.pre_load
+        lines.append("    data = pre_load(data, many=many, partial=None)")
+    lines.append("    if type(data) is not dict: raise Fallback")
+    if ("pre_load", False) in hooks and _implementation(schema, "pre_load") is LoadDumpSchema:
+        plan = schema.rename_plans()[0]
+        if plan[0]:
+            # renamed on a copy, so that the input is intact when falling back to marshmallow
+            namespace.update(rename=apply_rename_plan, plan=plan)
+            lines.append("    data = rename(dict(data), plan)")
+    if schema.unknown == RAISE:
+        namespace["known"] = frozenset(field.data_key or name for name, field in schema.load_fields.items())
+        lines.append("    if not data.keys() <= known: raise Fallback")
+
+    lines.append("    kw = {}")
+    for i, (name, field) in enumerate(schema.load_fields.items()):
+        key = field.data_key or name
+        attr = field.attribute or name
+        if "." in attr:
+            raise TypeError(f"Nested attribute {attr} is unsupported by compiled loaders")
+        namespace[f"f{i}"] = field
+        lines.append(f"    v = data.get({key!r}, missing)")
+        lines.append("    if v is missing:")
+        if field.required:
+            lines.append("        raise Fallback")
+        elif field.load_default is missing:
+            lines.append("        pass")
+        else:
+            default = f"f{i}.load_default()" if callable(field.load_default) else f"f{i}.load_default"
+            lines.append(f"        kw[{attr!r}] = {default}")
+        lines.append("    elif v is None:")
+        lines.append(f"        kw[{attr!r}] = None" if field.allow_none else "        raise Fallback")
+        lines.append("    else:")
+        lines.append(f"        kw[{attr!r}] = {_convert(i, field, key)}")
+
+    if ("post_load", False) in hooks and _implementation(schema, "post_load") is not HookedSchema:
+        namespace["post_load"] = schema.post_load
+        lines.append("    kw = post_load(kw, many=many, partial=None)")
+    lines.append("    return model(**kw)" if model is not None else "    return kw")
+    return "\n".join(lines) + "\n", namespace
+
+
+class CompiledLoader:
+    """
+    A loader of a model generated from its schema, with the same `load` interface as the schema.
+
+    :param schema_ref: a model class, or a Schema class whose `load` returns dicts.
+    :param many: (optional) whether to load lists of rows.
+    :raises: :exc:`TypeError` if the schema uses features unsupported by compiled loaders.
+    """
+
+    def __init__(self, schema_ref, many: bool = False):
+        schema_cls = getattr(schema_ref, "Schema", schema_ref)
+        if schema_cls is schema_ref and schema_cls.load is not Schema.load:
+            raise TypeError(f"{schema_cls.__name__} overrides load, pass its model instead")
+        self.many = many
+        self.fallbacks = 0
+        self._schema = get_schema(schema_cls, many)
+        model = schema_ref if schema_cls is not schema_ref else None
+        self.source, namespace = _generate(get_schema(schema_cls), model)
+        exec(compile(self.source, f"<compiled loader of {schema_cls.__name__}>", "exec"), namespace)
+        self._load = namespace["load"]
+
+    def load(self, data):
+        """
+        Load a row, or a list of rows if the loader is created with `many=True`.
+
+        :param data: the data to be loaded.
+        :raises: :exc:`marshmallow.ValidationError` if the data is invalid.
+        """
+        try:
+            if self.many:
+                _load = self._load
+                return [_load(item, True) for item in data]
+            return self._load(data)
+        except Exception:
+            self.fallbacks += 1
+            return self._schema.load(data)
+
+
+def get_loader(schema_ref, many: bool = False):
+    """
+    Get the loader of a model: its :class:`CompiledLoader` if compiled loaders are enabled and the model can be
+    compiled, otherwise its shared schema (see :func:`pysjtu.schema.get_schema`).
+
+    :param schema_ref: a model class, or a Schema class.
+    :param many: (optional) whether to get the loader of lists of rows.
+    """
+    if not _enabled:
+        return get_schema(schema_ref, many)
+    key = (schema_ref, many)
+    loader = _loaders.get(key)
+    if loader is None:
+        try:
+            loader = CompiledLoader(schema_ref, many)
+        except TypeError:
+            loader = get_schema(schema_ref, many)
+        loader = _loaders.setdefault(key, loader)
+    return loader
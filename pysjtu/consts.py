@@ -31,3 +31,19 @@ HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:71.0) Gecko/2010010
            "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7,zh-TW;q=0.6"}
 TERMS = [3, 12, 16]
 CHINESE_WEEK = {"日": 0, "一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6}
+
+# Endpoints which only query data, so that identical requests to them can share a response.
+READ_ONLY_URLS = [SCHEDULE_URL, SCORE_URL, SCORE_DETAIL_URL, EXAM_URL, CALENDAR_URL, COURSELIB_URL, GPA_PARAMS_URL,
+                  GPA_QUERY_URL, PROFILE_URL, SELECTION_ALL_SECTORS_PARAM_URL, SELECTION_SECTOR_PARAM_URL,
+                  SELECTION_QUERY_COURSES, SELECTION_QUERY_CLASSES, SELECTION_IS_REGISTERED]
+
+# Time to live (in seconds) of cached responses of read-only endpoints, used by :class:`pysjtu.cache.ResponseCache`.
+CACHE_TTLS = {SCHEDULE_URL: 3600,
+              SCORE_URL: 3600,
+              SCORE_DETAIL_URL: 3600,
+              EXAM_URL: 3600,
+              CALENDAR_URL: 86400,
+              COURSELIB_URL: 86400,
+              GPA_PARAMS_URL: 86400,
+              GPA_QUERY_URL: 600,
+              PROFILE_URL: 3600}
@@ -0,0 +1,61 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict
+
+# Names of events emitted by sessions.
+CONNECT = "connect"  # opening a TCP connection, including DNS resolution
+TLS = "tls"  # TLS handshake
+REQUEST = "request"  # sending request headers and body
+RESPONSE = "response"  # a whole round trip, from sending a request to reading the response
+RENEW = "renew"  # session renewal
+LOGIN = "login"  # a whole login, including retries
+OCR = "ocr"  # recognizing a captcha
+ALL = "*"  # hooks registered for this name receive all events
+
+
+@dataclass
+class Event:
+    """
+    A timing event emitted by :class:`pysjtu.session.Session`.
+
+    :var name: name of the event, e.g. `response`. See :mod:`pysjtu.events` for all names.
+    :var seconds: duration of the event.
+    :var endpoint: path of the requested URL, or an empty string for events not bound to a request.
+    :var info: additional information, e.g. `status`, `bytes_sent` and `bytes_received` of `response` events.
+    """
+    name: str
+    seconds: float
+    endpoint: str = ""
+    info: Dict = field(default_factory=dict)
+
+
+# (step, phase) pairs of httpcore trace events starting and ending each phase.
+_TRACE_STARTS = {"connect_tcp": CONNECT, "connect_unix_socket": CONNECT, "start_tls": TLS,
+                 "send_request_headers": REQUEST}
+_TRACE_ENDS = {"connect_tcp": CONNECT, "connect_unix_socket": CONNECT, "start_tls": TLS,
+               "send_request_body": REQUEST}
+
+
+class _Tracer:
+    """ An httpcore `trace` extension turning trace events into connect, TLS and request events. """
+
+    def __init__(self, emit: Callable, endpoint: str):
+        self._emit = emit
+        self._endpoint = endpoint
+        self._starts: Dict[str, float] = {}
+
+    def __call__(self, name: str, info: dict):
+        step, _, status = name.split(".", 1)[-1].rpartition(".")
+        if status == "started":
+            phase = _TRACE_STARTS.get(step)
+            if phase is not None:
+                self._starts[phase] = time.perf_counter()
+            return
+        phase = _TRACE_ENDS.get(step)
+        start = self._starts.pop(phase, None) if phase is not None else None
+        if start is not None:
+            extra = {"error": info["exception"]} if status == "failed" else {}
+            self._emit(phase, time.perf_counter() - start, self._endpoint, **extra)
+
+    async def atrace(self, name: str, info: dict):
+        self(name, info)
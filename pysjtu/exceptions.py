@@ -6,6 +6,10 @@ class DumpWarning(UserWarning):
     """ Missing fields in the dumped dict, which may cause a SessionException later. """
 
 
+class ProtocolWarning(UserWarning):
+    """ HTTP/2 is requested but the `h2` package isn't installed, so HTTP/1.1 is used instead. """
+
+
 class GPACalculationException(Exception):
     """ A failure has been reported by the remote server when calculating GPA. """
 
@@ -48,3 +52,11 @@ class OCRException(Exception):
 
 class ServiceUnavailable(Exception):
     """ The website is down or under maintenance. """
+
+
+class CircuitOpenException(ServiceUnavailable):
+    """ The website keeps failing, so requests to it fail fast until the circuit breaker probes it again. """
+
+
+class BudgetExceeded(Exception):
+    """ More requests, bytes or time are used than the budget of a tracked operation allows. """
@@ -0,0 +1,47 @@
+import hashlib
+import json
+from typing import Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+# Form & query keys carrying timestamps injected by pysjtu into queries, which change on every request and don't affect
+# responses. Generic keys like `t` and `_` are kept, since other endpoints may depend on them.
+NONCE_KEYS = frozenset({"nd"})
+
+
+def _canonical_pairs(qs: str) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, v) for k, v in parse_qsl(qs, keep_blank_values=True) if k not in NONCE_KEYS))
+
+
+def canonical_request(request: httpx.Request) -> tuple:
+    """
+    Get the canonical form of a request, which is equal for requests with the same effect.
+
+    The query string and form body are sorted and stripped of nonce keys (see :data:`NONCE_KEYS`), JSON bodies are
+    re-serialized with sorted keys, and other bodies are replaced by their digests.
+
+    :param request: a request, which must have been read.
+    """
+    url = request.url
+    content_type = request.headers.get("content-type", "")
+    content = request.content
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        body = _canonical_pairs(content.decode())
+    elif content_type.startswith("application/json"):
+        body = json.dumps(json.loads(content), sort_keys=True, ensure_ascii=False)
+    else:
+        body = hashlib.sha256(content).hexdigest() if content else ""
+    return (request.method, url.scheme, url.host, url.port, url.path,
+            _canonical_pairs(url.query.decode()), body)
+
+
+def request_fingerprint(request: httpx.Request, scope: str = "") -> str:
+    """
+    Compute a fingerprint of a request from its canonical form. See :func:`canonical_request`.
+
+    :param request: a request, which must have been read.
+    :param scope: a namespace of the fingerprint, e.g. the username, so that requests of different accounts differ.
+    :return: a hex digest.
+    """
+    return hashlib.sha256(json.dumps([scope, canonical_request(request)], ensure_ascii=False).encode()).hexdigest()
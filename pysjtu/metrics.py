@@ -0,0 +1,174 @@
+import json
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Sequence, Tuple
+
+from .events import Event, RESPONSE
+
+# Upper bounds (in seconds) of histogram buckets, the same as the default of Prometheus clients.
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .075, .1, .25, .5, .75, 1, 2.5, 5, 7.5, 10)
+
+
+def _metric_name(prefix: str, name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", f"{prefix}_{name}" if prefix else name)
+
+
+def _labels(endpoint: str, **extra) -> str:
+    labels = {"endpoint": endpoint, **extra} if endpoint else extra
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    """
+    Thread-safe counters and observations of session activities, e.g. the number of logins and session renewals,
+    the time spent in each stage of logins, and latencies of requests to each endpoint.
+
+    Observations are summarized into histograms, which are optionally labeled by endpoints.
+    A metrics object can be shared by multiple sessions to aggregate their counters, and exported in the Prometheus
+    text format or as JSON.
+
+    Usage::
+
+        >>> sess = pysjtu.Session(username="user@sjtu.edu.cn", password="something_secret")
+        >>> sess.metrics["logins"]
+        1
+        >>> sess.metrics.snapshot()
+        {'logins': 1, ...}
+        >>> sess.metrics.summary("response_seconds", endpoint="/xtgl/index_initMenu.html")
+        {'count': 2, 'sum': 0.43, 'min': 0.2, 'max': 0.23, 'buckets': {...}}
+
+    :param buckets: (optional) Upper bounds of histogram buckets.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, float] = defaultdict(int)
+        self._summaries: Dict[Tuple[str, str], dict] = {}
+
+    def incr(self, name: str, value: float = 1):
+        """
+        Increase a counter.
+
+        :param name: name of the counter.
+        :param value: (optional) the amount to be added.
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float, endpoint: str = ""):
+        """
+        Record an observation, e.g. the duration of an operation.
+
+        :param name: name of the observed quantity.
+        :param value: the observed value.
+        :param endpoint: (optional) the endpoint the observation is labeled with.
+        """
+        with self._lock:
+            summary = self._summaries.get((name, endpoint))
+            if summary is None:
+                summary = self._summaries[(name, endpoint)] = {
+                    "count": 0, "sum": 0, "min": value, "max": value, "buckets": [0] * (len(self._buckets) + 1)}
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["min"] = min(summary["min"], value)
+            summary["max"] = max(summary["max"], value)
+            summary["buckets"][bisect_left(self._buckets, value)] += 1
+
+    def record(self, event: Event):
+        """
+        Record a timing event. It's called by sessions on every event, and can be registered as an event hook too.
+
+        The duration is observed as `<event name>_seconds`, labeled with the endpoint of the event, and bytes sent and
+        received in `response` events are counted.
+        """
+        self.observe(f"{event.name}_seconds", event.seconds, event.endpoint)
+        if event.name == RESPONSE:
+            self.incr("bytes_sent", event.info.get("bytes_sent", 0))
+            self.incr("bytes_received", event.info.get("bytes_received", 0))
+
+    def summary(self, name: str, endpoint: str = "") -> dict:
+        """
+        Get the summary of observations of a quantity.
+
+        :param name: name of the observed quantity.
+        :param endpoint: (optional) the endpoint the observations are labeled with.
+        :return: a dict containing `count`, `sum`, `min`, `max` and cumulative `buckets` keyed by upper bounds,
+            which is empty if nothing has been observed.
+        """
+        with self._lock:
+            summary = self._summaries.get((name, endpoint))
+            return self._export_summary(summary) if summary is not None else {}
+
+    def _export_summary(self, summary: dict) -> dict:
+        buckets, total = {}, 0
+        for bound, count in zip(self._buckets + (float("inf"),), summary["buckets"]):
+            total += count
+            buckets[bound] = total
+        return {**summary, "buckets": buckets}
+
+    def __getitem__(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        """ Proportion of cacheable requests served from the response cache. """
+        with self._lock:
+            hits, misses = self._counters.get("cache_hits", 0), self._counters.get("cache_misses", 0)
+        return hits / (hits + misses) if hits + misses else 0
+
+    def snapshot(self) -> Dict[str, float]:
+        """ Get a copy of all counters. """
+        with self._lock:
+            return dict(self._counters)
+
+    def to_json(self) -> str:
+        """ Export counters and summaries as JSON. """
+        with self._lock:
+            summaries: Dict[str, dict] = defaultdict(dict)
+            for (name, endpoint), summary in self._summaries.items():
+                exported = self._export_summary(summary)
+                exported["buckets"] = {str(bound): count for bound, count in exported["buckets"].items()}
+                summaries[name][endpoint] = exported
+            counters = dict(self._counters)
+        return json.dumps({"counters": counters, "cache_hit_ratio": self.cache_hit_ratio, "summaries": summaries},
+                          ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = "pysjtu") -> str:
+        """
+        Export counters and histograms in the Prometheus text exposition format.
+
+        :param prefix: (optional) prefix of metric names.
+        """
+        lines = []
+        with self._lock:
+            for name, value in sorted(self._counters.items()):
+                metric = _metric_name(prefix, name)
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            names = sorted({name for name, _ in self._summaries})
+            for name in names:
+                metric = _metric_name(prefix, name)
+                lines.append(f"# TYPE {metric} histogram")
+                for (n, endpoint), summary in sorted(self._summaries.items()):
+                    if n != name:
+                        continue
+                    for bound, count in self._export_summary(summary)["buckets"].items():
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(f"{metric}_bucket{_labels(endpoint, le=le)} {count}")
+                    lines.append(f"{metric}_sum{_labels(endpoint)} {summary['sum']}")
+                    lines.append(f"{metric}_count{_labels(endpoint)} {summary['count']}")
+        metric = _metric_name(prefix, "cache_hit_ratio")
+        lines += [f"# TYPE {metric} gauge", f"{metric} {self.cache_hit_ratio}"]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """ Reset all counters and observations. """
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
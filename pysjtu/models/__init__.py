@@ -1,7 +1,8 @@
-from .base import LazyResult, _PARTIAL, QueryResult, Result, Results
+from .base import AsyncQueryResult, LazyResult, _PARTIAL, QueryResult, Result, Results
 from .course import LibCourse
 from .exam import Exam, Exams
 from .gpa import CourseRange, GPA, GPAQueryParams, LogicEnum, Ranking
+from .pages import LRUPageStore, PageStore
 from .profile import Profile
 from .schedule import Schedule, ScheduleCourse
 from .score import Score, ScoreFactor, Scores
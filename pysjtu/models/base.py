@@ -1,16 +1,27 @@
+import asyncio
+import contextvars
+import threading
 import time
 from abc import ABC
-from typing import Callable, Generic, List, Tuple, Type, TypeVar, Union, ClassVar
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, ClassVar, Generic, List, Optional, Tuple, Type, TypeVar, Union
 
 from marshmallow import Schema  # type: ignore
 
-from pysjtu.utils import overlap, parse_slice, range_in_set
+from pysjtu.models.pages import PageStore
+from pysjtu.compiled import get_loader
+from pysjtu.utils import overlap, parse_slice
 
 
 class _PARTIAL:
     pass
 
 
+def _submit(executor: ThreadPoolExecutor, fn: Callable, *args) -> Future:
+    """ Submit a call running in a copy of the current context, so that trackers of the caller count its requests. """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
 class Result:
     """ Base class for Result. All item models inherit from this class. """
     Schema: ClassVar[Type[Schema]] = Schema
@@ -36,7 +47,122 @@ class LazyResult(Result, ABC):
 T_Item = TypeVar("T_Result", bound=Result)
 
 
-class QueryResult(Generic[T_Item]):
+class _QueryResultBase(Generic[T_Item]):
+    """ Bookkeeping shared by :class:`QueryResult` and :class:`AsyncQueryResult`. """
+    BULK_PAGE_SIZE: ClassVar[int] = 5000
+    _ref: Callable
+    _post_ref: Callable
+    _query_params: dict
+    _length: int
+    _store: PageStore
+    _page_size: int
+    _max_in_flight: int
+    _read_ahead: int
+    _bulk: bool
+    _inflight: dict
+    _lock: threading.Lock
+
+    def __init__(self, method_ref: Callable, post_ref: Callable, query_params: dict, page_size: int = 15,
+                 max_in_flight: int = 1, read_ahead: int = 0, bulk: bool = False,
+                 page_store: Optional[PageStore] = None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+        self._ref = method_ref  # type: ignore
+        self._post_ref = post_ref  # type: ignore
+        self._query_params = query_params
+        self._length = 0
+        self._store = page_store if page_store is not None else PageStore()
+        self._page_size = max(page_size, self.BULK_PAGE_SIZE) if bulk else page_size
+        self._bulk = bulk
+        self._max_in_flight = max_in_flight
+        self._read_ahead = read_ahead
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @property
+    def page_store(self) -> PageStore:
+        """ The store of fetched items, which keeps cache statistics. """
+        return self._store
+
+    @staticmethod
+    def _normalize_index(idx: int, length: int) -> int:
+        idx = length + idx if idx < 0 else idx
+        if idx >= length or idx < 0:
+            raise IndexError("index out of range")
+        return idx
+
+    @staticmethod
+    def _normalize_slice(idx: slice, length: int) -> range:
+        """ Get indices of items selected by a slice. """
+        parse_slice(idx.start)
+        parse_slice(idx.stop)
+        parse_slice(idx.step)
+        return range(*idx.indices(length))
+
+    @staticmethod
+    def _bounds(indices: range) -> Tuple[int, int]:
+        """ Get the smallest [start, end) interval containing the given non-empty indices. """
+        return min(indices[0], indices[-1]), max(indices[0], indices[-1]) + 1
+
+    @staticmethod
+    def _select(indices: range, items: list, start: int) -> list:
+        """ Pick items at given indices from items read from the start index. """
+        if indices.step == 1:
+            return items
+        return [items[idx - start] for idx in indices]
+
+    def _missing_pages(self, start: int, end: int) -> List[int]:
+        """ Get all pages to be fetched to fill items in [start, end). """
+        page_size = self._page_size
+        pages: List[int] = []
+        for gap_start, gap_end in self._store.missing(start, end):
+            first = max(gap_start // page_size + 1, pages[-1] + 1 if pages else 0)
+            pages.extend(range(first, (gap_end - 1) // page_size + 2))
+        return pages
+
+    def _page_cached(self, page: int) -> bool:
+        return not self._missing_pages((page - 1) * self._page_size, min(page * self._page_size, self._length))
+
+    def _pages_ahead(self, page: int) -> List[int]:
+        """ Get pages following the given one which should be read ahead. """
+        last_page = (self._length - 1) // self._page_size + 1
+        return [ahead for ahead in range(page + 1, min(page + self._read_ahead, last_page) + 1)
+                if ahead not in self._inflight and not self._page_cached(ahead)]
+
+    @property
+    def _first_page_size(self) -> int:
+        # In bulk mode, the length is read from the first real page instead of a single item probe.
+        return self._page_size if self._bulk else 1
+
+    def _load_first_page(self, count: int, rtn: dict):
+        self._length = rtn["totalResult"]
+        if self._bulk:
+            self._adapt_page_size(1, count, rtn["items"])
+            self._store_page(1, count, rtn["items"])
+
+    def _adapt_page_size(self, page: int, count: int, items: list):
+        """ Shrink the page size in bulk mode if the server returned fewer items than requested. """
+        expected = min(count, self._length - count * (page - 1))
+        if self._bulk and len(items) < expected:
+            self._page_size = len(items) if items else max(count // 2, 1)
+
+    def _store_page(self, page: int, count: int, items: list) -> Tuple[int, int]:
+        offset = count * (page - 1)
+        self._store.put(offset, items)
+        return offset, offset + len(items)
+
+    def _page_params(self, page: int, count: int) -> dict:
+        # Build a new dict on each call, since pages may be fetched concurrently.
+        return {**self._query_params,
+                "queryModel.showCount": count,
+                "queryModel.currentPage": page,
+                "queryModel.sortName": "",
+                "queryModel.sortOrder": "asc",
+                "nd": int(time.time() * 1000),
+                "_search": False}
+
+
+class QueryResult(_QueryResultBase[T_Item]):
     """
     A key accessible, sliceable, and iterable interface to query result collections.
     All lazy container models inherit from this class.
@@ -49,28 +175,29 @@ class QueryResult(Generic[T_Item]):
 
     A QueryResult object is lazy, which means network I/Os won't be performed until items are actually accessed.
 
+    Pages missing from a slice are fetched concurrently on a thread pool bounded by `max_in_flight`,
+    and during iteration, the following `read_ahead` pages are loaded in background while the current one is consumed.
+
+    In `bulk` mode, pages of :attr:`BULK_PAGE_SIZE` items are requested, and the page size is shrunk to the number of
+    items actually returned if the server truncates a page. The length is then read from the first page instead of a
+    dedicated probe request, so a whole catalog can be dumped in a handful of round trips.
+
     :param method_ref: The request method to be called when fetching data.
     :param post_ref: The schema load method to be called on fetched data.
     :param query_params: Parameters for this query.
     :param page_size: The page size for result iteration.
+    :param max_in_flight: The maximum number of pages being fetched concurrently.
+    :param read_ahead: The number of pages to be fetched ahead during iteration.
+    :param bulk: Whether to fetch items in large pages.
+    :param page_store: The store of fetched items. Pass a :class:`pysjtu.models.LRUPageStore` to bound memory usage,
+        evicted items are fetched again when accessed.
     """
-    _ref: Callable
-    _post_ref: Callable
-    _query_params: dict
-    _length: int
-    _cache: List[dict]
-    _cached_items: set
-    _page_size: int
 
-    def __init__(self, method_ref: Callable, post_ref: Callable, query_params: dict, page_size: int = 15):
-        self._ref = method_ref  # type: ignore
-        self._post_ref = post_ref  # type: ignore
-        self._query_params = query_params
-        self._length = 0
-        # noinspection PyTypeChecker
-        self._cache = [{}] * len(self)
-        self._cached_items = set()
-        self._page_size = page_size
+    def __init__(self, method_ref: Callable, post_ref: Callable, query_params: dict, page_size: int = 15,
+                 max_in_flight: int = 1, read_ahead: int = 0, bulk: bool = False,
+                 page_store: Optional[PageStore] = None):
+        super().__init__(method_ref, post_ref, query_params, page_size, max_in_flight, read_ahead, bulk, page_store)
+        len(self)
 
     def __getitem__(self, arg: Union[int, slice]) -> T_Item:
         if isinstance(arg, int):
@@ -83,77 +210,216 @@ class QueryResult(Generic[T_Item]):
         return data  # type: ignore
 
     def _handle_result_by_index(self, idx: int) -> dict:
-        idx = len(self) + idx if idx < 0 else idx
-        if idx >= len(self) or idx < 0:
-            raise IndexError("index out of range")
-        self._update_cache(idx, idx + 1)
-        return self._cache[idx]
+        idx = self._normalize_index(idx, len(self))
+        return self._read(idx, idx + 1)[0]
 
     def _handle_result_by_idx_slice(self, idx: slice) -> list:
-        idx_start = parse_slice(idx.start)
-        idx_stop = parse_slice(idx.stop)
-
-        if idx_start is None:
-            start = 0
-        elif idx_start < 0:
-            start = len(self) + idx.start
-        else:
-            start = idx.start
-
-        if idx_stop is None:
-            end = len(self) - 1
-        elif idx_stop < 0:
-            end = len(self) + idx.stop - 1
-        else:
-            end = idx.stop
-
-        if end > len(self):
-            end = len(self)
-        if start >= end:
+        indices = self._normalize_slice(idx, len(self))
+        if not indices:
             return []
-        self._update_cache(start, end)
-        return self._cache[idx]
+        start, end = self._bounds(indices)
+        if self._max_in_flight > 1:
+            self._update_cache(start, end)
+        return self._select(indices, self._read(start, end), start)
+
+    def _read(self, start: int, end: int) -> list:
+        """ Read items in [start, end), fetching pages not in store. """
+        rtn: list = []
+        while start + len(rtn) < end:
+            idx = start + len(rtn)
+            items = self._store.run(idx, end)
+            if not items:
+                self._fetch_page(idx // self._page_size + 1)
+            rtn.extend(items)
+        return rtn
 
     def __len__(self) -> int:
         if not self._length:
-            rtn = self._query(1, 1)
-            self._length = rtn["totalResult"]
+            count = self._first_page_size
+            self._load_first_page(count, self._query(1, count))
         return self._length
 
     def flush_cache(self):
         """ Flush caches. Local caches are dropped and data will be fetched from remote. """
         self._length = 0
-        # noinspection PyTypeChecker
-        self._cache = [None] * len(self)
-        self._cached_items = set()
+        self._store.clear()
+        len(self)
 
     def _update_cache(self, start: int, end: int):
-        fetch_set = set(set(range(start, end)) - self._cached_items)
-        while len(fetch_set) != 0:
-            fetch_range = next(range_in_set(fetch_set))
-            page = int(fetch_range.start / self._page_size) + 1
-            self._cached_items.update(range(*self._fetch_range(page, self._page_size)))
-            fetch_set = set(set(range(start, end)) - self._cached_items)
+        # Each missing page is fetched once. Pages evicted meanwhile by a bounded store, or left out after the page size
+        # shrinks in bulk mode, are fetched again one at a time by `_read`.
+        pages = self._missing_pages(start, end)
+        if self._max_in_flight > 1 and len(pages) > 1:
+            with ThreadPoolExecutor(max_workers=min(self._max_in_flight, len(pages))) as executor:
+                for future in [_submit(executor, self._fetch_page, page) for page in pages]:
+                    future.result()
+        else:
+            for page in pages:
+                self._fetch_page(page)
+
+    def _fetch_page(self, page: int):
+        """ Fetch a page, or wait for it if it's being fetched by another thread. """
+        with self._lock:
+            if self._page_cached(page):
+                return
+            future = self._inflight.get(page)
+            is_owner = future is None
+            if is_owner:
+                future = self._inflight[page] = Future()
+        if not is_owner:
+            future.result()
+            return
+        try:
+            self._fetch_range(page, self._page_size)
+            future.set_result(None)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[page]
 
     def _fetch_range(self, page: int, count: int) -> Tuple[int, int]:
         rtn = self._query(page, count)["items"]
-        for item in zip(range(count * (page - 1), count * (page - 1) + len(rtn)), rtn):
-            self._cache[item[0]] = item[1]
-        return count * (page - 1), count * (page - 1) + len(rtn)
+        self._adapt_page_size(page, count, rtn)
+        return self._store_page(page, count, rtn)
 
     def _query(self, page: int, count: int) -> dict:
-        new_params = self._query_params
-        new_params["queryModel.showCount"] = count
-        new_params["queryModel.currentPage"] = page
-        new_params["queryModel.sortName"] = ""
-        new_params["queryModel.sortOrder"] = "asc"
-        new_params["nd"] = int(time.time() * 1000)
-        new_params["_search"] = False
-        return self._ref(data=new_params).json()
+        return self._ref(data=self._page_params(page, count)).json()
 
     def __iter__(self):
-        for i in range(len(self)):
-            yield self[i]
+        if not self._read_ahead:
+            for i in range(len(self)):
+                yield self[i]
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(self._max_in_flight, self._read_ahead))
+        try:
+            for i in range(len(self)):
+                if i % self._page_size == 0:
+                    for page in self._pages_ahead(i // self._page_size + 1):
+                        _submit(executor, self._fetch_page, page)
+                yield self[i]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncQueryResult(_QueryResultBase[T_Item]):
+    """
+    An asynchronous counterpart of :class:`QueryResult`, returned by :class:`pysjtu.client.AsyncClient`.
+
+    Items are fetched lazily like :class:`QueryResult`, but accessing them is awaitable.
+    Missing pages are fetched concurrently as tasks bounded by `max_in_flight`.
+
+    Usage::
+
+        >>> courses = await client.query_courses(2019, 0, name="高等数学")
+        >>> await courses.length()
+        90
+        >>> await courses[0]
+        <LibCourse 高等数学I class_name=(2019-2020-1)-MA077-1>
+        >>> async for course in courses:
+        ...     print(course)
+
+    :param method_ref: The asynchronous request method to be called when fetching data.
+    :param post_ref: The schema load method to be called on fetched data.
+    :param query_params: Parameters for this query.
+    :param page_size: The page size for result iteration.
+    :param max_in_flight: The maximum number of pages being fetched concurrently.
+    :param read_ahead: The number of pages to be fetched ahead during iteration.
+    :param bulk: Whether to fetch items in large pages. See :class:`QueryResult` for details.
+    :param page_store: The store of fetched items. See :class:`QueryResult` for details.
+    """
+
+    def __getitem__(self, arg: Union[int, slice]) -> Awaitable[T_Item]:
+        return self.get(arg)
+
+    async def get(self, arg: Union[int, slice]) -> T_Item:
+        """
+        Get an item or a slice of items.
+
+        :param arg: an index or a slice.
+        """
+        if isinstance(arg, int):
+            length = await self.length()
+            idx = self._normalize_index(arg, length)
+            data = (await self._read(idx, idx + 1))[0]
+        elif isinstance(arg, slice):
+            indices = self._normalize_slice(arg, await self.length())
+            if indices:
+                start, end = self._bounds(indices)
+                if self._max_in_flight > 1:
+                    await self._update_cache(start, end)
+                data = self._select(indices, await self._read(start, end), start)
+            else:
+                data = []
+        else:
+            raise TypeError("QueryResult indices must be integers or slices, not " + type(arg).__name__)
+        return self._post_ref(data)  # type: ignore
+
+    async def _read(self, start: int, end: int) -> list:
+        """ Read items in [start, end), fetching pages not in store. """
+        rtn: list = []
+        while start + len(rtn) < end:
+            idx = start + len(rtn)
+            items = self._store.run(idx, end)
+            if not items:
+                await self._fetch_page(idx // self._page_size + 1)
+            rtn.extend(items)
+        return rtn
+
+    async def length(self) -> int:
+        """ Get the number of items in this query result. """
+        if not self._length:
+            count = self._first_page_size
+            self._load_first_page(count, await self._query(1, count))
+        return self._length
+
+    async def flush_cache(self):
+        """ Flush caches. Local caches are dropped and data will be fetched from remote. """
+        self._length = 0
+        self._store.clear()
+        await self.length()
+
+    async def _update_cache(self, start: int, end: int):
+        semaphore = asyncio.Semaphore(self._max_in_flight)
+
+        async def _bounded_fetch(page: int):
+            async with semaphore:
+                await self._fetch_page(page)
+
+        # Each missing page is fetched once, see :meth:`QueryResult._update_cache`.
+        await asyncio.gather(*(_bounded_fetch(page) for page in self._missing_pages(start, end)))
+
+    async def _fetch_page(self, page: int):
+        """ Fetch a page, or wait for it if it's being fetched by another task. """
+        if self._page_cached(page):
+            return
+        task = self._inflight.get(page)
+        if task is None:
+            task = self._inflight[page] = asyncio.ensure_future(self._fetch_range(page, self._page_size))
+            task.add_done_callback(lambda _: self._inflight.pop(page, None))
+        await asyncio.shield(task)
+
+    async def _fetch_range(self, page: int, count: int) -> Tuple[int, int]:
+        rtn = (await self._query(page, count))["items"]
+        self._adapt_page_size(page, count, rtn)
+        return self._store_page(page, count, rtn)
+
+    async def _query(self, page: int, count: int) -> dict:
+        return (await self._ref(data=self._page_params(page, count))).json()
+
+    async def __aiter__(self):
+        read_ahead = []
+        try:
+            for i in range(await self.length()):
+                if self._read_ahead and i % self._page_size == 0:
+                    read_ahead = [asyncio.ensure_future(self._fetch_page(page))
+                                  for page in self._pages_ahead(i // self._page_size + 1)]
+                yield await self.get(i)
+        finally:
+            for task in read_ahead:
+                task.cancel()
 
 
 class Results(List[T_Item]):
@@ -189,8 +455,7 @@ class Results(List[T_Item]):
         :param data: a list of dicts.
         :meta private:
         """
-        schema = self._item.Schema(many=True)
-        results = schema.load(data)
+        results = get_loader(self._item, many=True).load(data)
         for result in results:
             self.append(result)
 
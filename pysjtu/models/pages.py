@@ -0,0 +1,217 @@
+import sys
+import threading
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class PageStore:
+    """
+    Storage of fetched query result items, used by :class:`pysjtu.models.QueryResult`.
+
+    Items are kept in runs of consecutive indices, each run being a page returned by the server. Run offsets are kept
+    sorted, so looking up an item or computing ranges not loaded yet is done by bisection,
+    without materializing every index.
+
+    :var hits: number of lookups served from the store.
+    :var misses: number of lookups of items not in store.
+    :var evictions: number of pages evicted from the store.
+    """
+
+    def __init__(self):
+        self._offsets: List[int] = []
+        self._pages: Dict[int, list] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """ Get the number of pages in store. """
+        return len(self._offsets)
+
+    def __contains__(self, idx: int) -> bool:
+        with self._lock:
+            return self._locate(idx) is not None
+
+    def _locate(self, idx: int):
+        pos = bisect_right(self._offsets, idx) - 1
+        if pos < 0:
+            return None
+        offset = self._offsets[pos]
+        if idx >= offset + len(self._pages[offset]):
+            return None
+        return offset
+
+    def _remove(self, offset: int):
+        del self._pages[offset]
+        self._offsets.pop(bisect_right(self._offsets, offset) - 1)
+
+    def _touch(self, offset: int):
+        """ Called when a page is read. """
+
+    def put(self, offset: int, items: list):
+        """
+        Store a page of items, replacing overlapping items stored before.
+
+        :param offset: index of the first item in the page.
+        :param items: items in the page.
+        """
+        if not items:
+            return
+        end = offset + len(items)
+        with self._lock:
+            pos = max(bisect_right(self._offsets, offset) - 1, 0)
+            while pos < len(self._offsets) and self._offsets[pos] < end:
+                old_offset = self._offsets[pos]
+                old_items = self._pages[old_offset]
+                old_end = old_offset + len(old_items)
+                if old_end <= offset:
+                    pos += 1
+                    continue
+                self._remove(old_offset)
+                if old_offset < offset:
+                    self._put(old_offset, old_items[:offset - old_offset])
+                    pos += 1
+                if old_end > end:
+                    self._put(end, old_items[end - old_offset:])
+            self._put(offset, list(items))
+
+    def _put(self, offset: int, items: list):
+        insort(self._offsets, offset)
+        self._pages[offset] = items
+
+    def get(self, idx: int):
+        """
+        Get an item by index.
+
+        :raises: :exc:`KeyError` if the item isn't in store.
+        """
+        with self._lock:
+            offset = self._locate(idx)
+            if offset is None:
+                self.misses += 1
+                raise KeyError(idx)
+            self.hits += 1
+            self._touch(offset)
+            return self._pages[offset][idx - offset]
+
+    def run(self, start: int, end: int) -> list:
+        """
+        Get consecutive items in [start, end) from the page containing the start index.
+
+        :return: a list of items, which is empty if the start index isn't in store.
+        """
+        with self._lock:
+            offset = self._locate(start)
+            if offset is None:
+                self.misses += 1
+                return []
+            self.hits += 1
+            self._touch(offset)
+            return self._pages[offset][start - offset:end - offset]
+
+    def items(self, start: int, end: int) -> list:
+        """
+        Get items in [start, end).
+
+        :raises: :exc:`KeyError` if some of the items aren't in store.
+        """
+        rtn: list = []
+        with self._lock:
+            while start + len(rtn) < end:
+                items = self.run(start + len(rtn), end)
+                if not items:
+                    raise KeyError(start + len(rtn))
+                rtn.extend(items)
+        return rtn
+
+    def missing(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """ Get ranges of items in [start, end) which aren't in store, as (start, end) tuples. """
+        with self._lock:
+            pos = max(bisect_right(self._offsets, start) - 1, 0)
+            gaps = []
+            idx = start
+            while idx < end and pos < len(self._offsets):
+                offset = self._offsets[pos]
+                if offset >= end:
+                    break
+                if offset > idx:
+                    gaps.append((idx, offset))
+                idx = max(idx, offset + len(self._pages[offset]))
+                pos += 1
+            if idx < end:
+                gaps.append((idx, end))
+        return gaps
+
+    def clear(self):
+        """ Drop all items in store. """
+        with self._lock:
+            self._offsets = []
+            self._pages = {}
+
+
+def _sizeof(items: list) -> int:
+    """ Estimate memory taken by a page of raw items. """
+    size = sys.getsizeof(items)
+    for item in items:
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in item.items())
+    return size
+
+
+class LRUPageStore(PageStore):
+    """
+    A :class:`PageStore` bounded in number of pages or estimated bytes, evicting least recently used pages first.
+
+    Evicted items are fetched again when accessed.
+    The most recently stored page is always kept, even if it alone exceeds the limits.
+
+    :param max_pages: (optional) maximum number of pages kept.
+    :param max_bytes: (optional) maximum estimated size of items kept.
+    """
+
+    def __init__(self, max_pages: Optional[int] = None, max_bytes: Optional[int] = None):
+        super().__init__()
+        if max_pages is not None and max_pages < 1:
+            raise ValueError("max_pages must be positive")
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self._recency: OrderedDict = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def size(self) -> int:
+        """ Estimated size of items in store. """
+        return self._bytes
+
+    def _put(self, offset: int, items: list):
+        super()._put(offset, items)
+        size = _sizeof(items)
+        self._recency[offset] = size
+        self._bytes += size
+
+    def _remove(self, offset: int):
+        super()._remove(offset)
+        self._bytes -= self._recency.pop(offset)
+
+    def _touch(self, offset: int):
+        self._recency.move_to_end(offset)
+
+    def _over_limit(self) -> bool:
+        return (self.max_pages is not None and len(self._offsets) > self.max_pages) or \
+               (self.max_bytes is not None and self._bytes > self.max_bytes)
+
+    def put(self, offset: int, items: list):
+        with self._lock:
+            super().put(offset, items)
+            while len(self._recency) > 1 and self._over_limit():
+                self._remove(next(iter(self._recency)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            super().clear()
+            self._recency = OrderedDict()
+            self._bytes = 0
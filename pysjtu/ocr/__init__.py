@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import ExitStack
 from io import BytesIO
 from typing import Optional
@@ -26,6 +27,10 @@ class Recognizer:
     def recognize(self, img: bytes):
         raise NotImplementedError  # pragma: no cover
 
+    async def arecognize(self, img: bytes):
+        """ Recognize a captcha in an event loop. By default, :meth:`recognize` is run in a worker thread. """
+        return await asyncio.to_thread(self.recognize, img)
+
 
 class JCSSRecognizer(Recognizer):
     """
@@ -40,11 +45,19 @@ class JCSSRecognizer(Recognizer):
     For additional keyword arguments, see https://www.python-httpx.org/api.
 
     :param url: The URL of the JCSS instance.
+    :param async_transport: (optional) An asynchronous transport, which :meth:`arecognize` sends requests with instead
+        of a worker thread running :meth:`recognize`, e.g. the shared transport of
+        :class:`pysjtu.pool.AsyncSessionPool`.
     """
 
-    def __init__(self, url: str = "https://jcss.lightquantum.me", **kwargs):
+    def __init__(self, url: str = "https://jcss.lightquantum.me",
+                 async_transport: Optional[httpx.AsyncBaseTransport] = None, **kwargs):
         self.url = url
         self.client = httpx.Client(**kwargs)
+        self.async_client = None
+        if async_transport is not None:
+            self.async_client = httpx.AsyncClient(
+                transport=async_transport, **{k: v for k, v in kwargs.items() if k not in ("transport", "mounts")})
 
     def recognize(self, img: bytes):
         try:
@@ -54,6 +67,16 @@ class JCSSRecognizer(Recognizer):
         except Exception as e:  # pragma: no cover
             raise OCRException from e  # pragma: no cover
 
+    async def arecognize(self, img: bytes):
+        if self.async_client is None:
+            return await super().arecognize(img)
+        try:
+            r = await self.async_client.post(self.url, files={"image": BytesIO(img)})
+            resp = r.json()
+            return resp["data"]["prediction"]
+        except Exception as e:  # pragma: no cover
+            raise OCRException from e  # pragma: no cover
+
 
 class NNRecognizer(Recognizer):
     """
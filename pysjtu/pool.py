@@ -0,0 +1,299 @@
+import asyncio
+import io
+import queue
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from pysjtu.ocr import JCSSRecognizer, Recognizer
+from .exceptions import SessionException
+from .metrics import Metrics
+from .session import AsyncSession, Session, _read_session_file, _write_session_file
+from .transport import AsyncSharedTransport, SharedTransport
+from .utils import FileTypes
+
+Accounts = Union[Mapping, Iterable[Tuple[str, str]]]
+
+# Keyword arguments of httpx clients which configure the underlying transport.
+_TRANSPORT_KWARGS = ("verify", "cert", "http1", "http2", "limits", "trust_env")
+
+
+def _read_store(store: Optional[FileTypes]) -> dict:
+    if store is None or (isinstance(store, (str, Path)) and not Path(store).exists()):
+        return {}
+    return _read_session_file(store)
+
+
+def _write_store(store: FileTypes, conf: dict):
+    if isinstance(store, (io.RawIOBase, io.BufferedIOBase)):
+        store.seek(0)
+    _write_session_file(store, conf)
+
+
+class _BaseSessionPool:
+    def __init__(self, accounts: Accounts, max_concurrency: int = 4, ocr: Optional[Recognizer] = None,
+                 store: Optional[FileTypes] = None, metrics: Optional[Metrics] = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+        self._accounts: Dict[str, str] = dict(accounts.items() if isinstance(accounts, Mapping) else accounts)
+        self._max_concurrency = max_concurrency
+        self._ocr = ocr
+        self._store = store
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._sessions: dict = {}
+        self.failures: Dict[str, Exception] = {}
+
+    def _pending(self) -> Dict[str, dict]:
+        """ Get session dicts of accounts not logged in yet, including cookies persisted in store. """
+        stored = _read_store(self._store)
+        return {username: {**stored.get(username, {}), "username": username, "password": password}
+                for username, password in self._accounts.items() if username not in self._sessions}
+
+    def __len__(self) -> int:
+        """ Get the number of logged in sessions. """
+        return len(self._sessions)
+
+    def __getitem__(self, username: str):
+        return self._sessions[username]
+
+    @property
+    def metrics(self) -> Metrics:
+        """ Metrics shared by all sessions in the pool. """
+        return self._metrics
+
+    def save(self):
+        """ Persist all sessions into the store. Sessions of accounts already in the store are replaced. """
+        if self._store is None:
+            raise ValueError("No store is specified")
+        conf = _read_store(self._store)
+        conf.update({username: sess.dumps() for username, sess in self._sessions.items()})
+        _write_store(self._store, conf)
+
+
+class SessionPool(_BaseSessionPool):
+    """
+    A pool of logged in :class:`pysjtu.session.Session` of multiple accounts.
+
+    Accounts are logged in concurrently, with at most `max_concurrency` logins in flight. All sessions share one captcha
+    recognizer, one connection pool and one :class:`pysjtu.metrics.Metrics`, and are persisted into a single store.
+    Sessions are leased to workers one at a time, in least recently returned order.
+
+    Usage::
+
+        >>> with SessionPool({"user1": "secret1", "user2": "secret2"}, max_concurrency=8, store="sessions") as pool:
+        ...     pool.login()
+        ...     with pool.lease() as sess:
+        ...         Client(sess).profile
+        <Profile name=...>
+
+    For additional keyword arguments, see :class:`pysjtu.session.Session`. To tune the connection pool or share it with
+    other pools, pass a :class:`pysjtu.transport.SharedTransport` as `transport`.
+
+    :param accounts: A dict or an iterable of (username, password) pairs.
+    :param max_concurrency: Maximum number of concurrent logins.
+    :param ocr: (optional) The captcha :class:`Recognizer` shared by all sessions.
+        Defaults to a :class:`pysjtu.ocr.JCSSRecognizer`.
+    :param store: (optional) A binary file object / filepath which sessions are loaded from & saved to.
+        Cookies in the store are reused if they are still valid.
+    :param metrics: (optional) A :class:`pysjtu.metrics.Metrics` shared by all sessions.
+    :var failures: accounts which failed to log in, with their exceptions.
+    """
+
+    def __init__(self, accounts: Accounts, max_concurrency: int = 4, ocr: Optional[Recognizer] = None,
+                 store: Optional[FileTypes] = None, metrics: Optional[Metrics] = None, **kwargs):
+        super().__init__(accounts, max_concurrency, ocr, store, metrics)
+        transport = kwargs.pop("transport", None)
+        transport_kwargs = {k: kwargs.pop(k) for k in _TRANSPORT_KWARGS if k in kwargs}
+        self._own_transport = transport is None
+        if transport is None:
+            transport = SharedTransport(**transport_kwargs)
+        elif not isinstance(transport, SharedTransport):
+            transport = SharedTransport(transport=transport)
+        self._transport = transport
+        self._session_kwargs = {**kwargs, "transport": transport}
+        if self._ocr is None:
+            self._ocr = JCSSRecognizer(transport=transport)
+        self._idle: queue.Queue = queue.Queue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._store is not None:
+            self.save()
+        self.close()
+
+    def _open(self, conf: dict) -> Session:
+        sess = Session(ocr=self._ocr, metrics=self._metrics, **self._session_kwargs)
+        try:
+            sess.loads(conf)
+        except BaseException:
+            sess.close()
+            raise
+        return sess
+
+    def login(self) -> Dict[str, Exception]:
+        """
+        Log in all accounts which aren't logged in yet.
+
+        :return: accounts which failed to log in, with their exceptions. They are also kept in :attr:`failures`.
+        """
+        pending = self._pending()
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            futures = {username: executor.submit(self._open, conf) for username, conf in pending.items()}
+        self.failures = {}
+        for username, future in futures.items():
+            try:
+                sess = future.result()
+            except Exception as e:
+                self.failures[username] = e
+                self._metrics.incr("pool_login_failures")
+            else:
+                self._sessions[username] = sess
+                self._idle.put(sess)
+        return self.failures
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Session]:
+        """
+        Lease a session exclusively, which is returned to the pool when exiting the `with` block.
+
+        :param timeout: (optional) How long to wait for a session to be returned, if all of them are leased.
+        :raises: :exc:`TimeoutError` if no session is returned in time.
+        """
+        if not self._sessions:
+            raise SessionException("No session in the pool is logged in")
+        try:
+            sess = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("All sessions are leased") from None
+        try:
+            yield sess
+        finally:
+            self._idle.put(sess)
+
+    def close(self):
+        """ Close all sessions and the shared connection pool. """
+        for sess in self._sessions.values():
+            sess.close()
+        if self._own_transport:
+            self._transport.shutdown()
+
+
+class AsyncSessionPool(_BaseSessionPool):
+    """
+    A pool of logged in :class:`pysjtu.session.AsyncSession` of multiple accounts.
+
+    It shares the same semantics with :class:`SessionPool`.
+
+    Usage::
+
+        >>> async with AsyncSessionPool({"user1": "secret1", "user2": "secret2"}, max_concurrency=8) as pool:
+        ...     await pool.login()
+        ...     async with pool.lease() as sess:
+        ...         await AsyncClient(sess).profile()
+        <Profile name=...>
+
+    For additional keyword arguments, see :class:`pysjtu.session.AsyncSession`. To tune the connection pool or share it
+    with other pools, pass a :class:`pysjtu.transport.AsyncSharedTransport` as `transport`.
+
+    :param accounts: A dict or an iterable of (username, password) pairs.
+    :param max_concurrency: Maximum number of concurrent logins.
+    :param ocr: (optional) The captcha :class:`Recognizer` shared by all sessions.
+        Defaults to a :class:`pysjtu.ocr.JCSSRecognizer` sending requests with the shared transport.
+    :param store: (optional) A binary file object / filepath which sessions are loaded from & saved to.
+        Cookies in the store are reused if they are still valid.
+    :param metrics: (optional) A :class:`pysjtu.metrics.Metrics` shared by all sessions.
+    :var failures: accounts which failed to log in, with their exceptions.
+    """
+
+    def __init__(self, accounts: Accounts, max_concurrency: int = 4, ocr: Optional[Recognizer] = None,
+                 store: Optional[FileTypes] = None, metrics: Optional[Metrics] = None, **kwargs):
+        super().__init__(accounts, max_concurrency, ocr, store, metrics)
+        transport = kwargs.pop("transport", None)
+        transport_kwargs = {k: kwargs.pop(k) for k in _TRANSPORT_KWARGS if k in kwargs}
+        self._own_transport = transport is None
+        if transport is None:
+            transport = AsyncSharedTransport(**transport_kwargs)
+        elif not isinstance(transport, AsyncSharedTransport):
+            transport = AsyncSharedTransport(transport=transport)
+        self._transport = transport
+        self._session_kwargs = {**kwargs, "transport": transport}
+        if self._ocr is None:
+            self._ocr = JCSSRecognizer(async_transport=transport)
+        # created lazily, so that the pool can be constructed outside of an event loop
+        self._idle_: Optional[asyncio.Queue] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._store is not None:
+            self.save()
+        await self.aclose()
+
+    @property
+    def _idle(self) -> asyncio.Queue:
+        if self._idle_ is None:
+            self._idle_ = asyncio.Queue()
+        return self._idle_
+
+    async def _open(self, conf: dict, semaphore: asyncio.Semaphore) -> AsyncSession:
+        async with semaphore:
+            sess = AsyncSession(ocr=self._ocr, metrics=self._metrics, **self._session_kwargs)
+            try:
+                await sess.loads(conf)
+            except BaseException:
+                await sess.aclose()
+                raise
+            return sess
+
+    async def login(self) -> Dict[str, Exception]:
+        """
+        Log in all accounts which aren't logged in yet.
+
+        :return: accounts which failed to log in, with their exceptions. They are also kept in :attr:`failures`.
+        """
+        pending = self._pending()
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        results = await asyncio.gather(*(self._open(conf, semaphore) for conf in pending.values()),
+                                       return_exceptions=True)
+        self.failures = {}
+        for username, result in zip(pending, results):
+            if isinstance(result, Exception):
+                self.failures[username] = result
+                self._metrics.incr("pool_login_failures")
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                self._sessions[username] = result
+                self._idle.put_nowait(result)
+        return self.failures
+
+    @asynccontextmanager
+    async def lease(self, timeout: Optional[float] = None) -> AsyncIterator[AsyncSession]:
+        """
+        Lease a session exclusively, which is returned to the pool when exiting the `async with` block.
+
+        :param timeout: (optional) How long to wait for a session to be returned, if all of them are leased.
+        :raises: :exc:`TimeoutError` if no session is returned in time.
+        """
+        if not self._sessions:
+            raise SessionException("No session in the pool is logged in")
+        try:
+            sess = await asyncio.wait_for(self._idle.get(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("All sessions are leased") from None
+        try:
+            yield sess
+        finally:
+            self._idle.put_nowait(sess)
+
+    async def aclose(self):
+        """ Close all sessions and the shared connection pool. """
+        for sess in self._sessions.values():
+            await sess.aclose()
+        if self._own_transport:
+            await self._transport.shutdown()
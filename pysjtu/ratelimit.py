@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+
+def _check_limits(rate: float, burst: int):
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    if burst < 1:
+        raise ValueError("burst must be positive")
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket, which allows `burst` operations at once and `rate` operations per second on average.
+
+    Tokens are reserved rather than waited for, so a bucket can be shared by threads and asyncio tasks: callers sleep
+    for the returned delay in whatever way fits them.
+
+    :param rate: Tokens added per second.
+    :param burst: Capacity of the bucket, which is full initially.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        _check_limits(rate, burst)
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<TokenBucket rate={self.rate} burst={self.burst}>"
+
+    def reserve(self) -> float:
+        """
+        Take a token.
+
+        :return: seconds to wait before the token becomes available, which is 0 if it's available now.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0
+
+
+class RateLimiter:
+    """
+    A client-side rate limiter of :class:`pysjtu.session.Session`, with a token bucket per host and optional token
+    buckets per endpoint. A request waits until both buckets have a token for it.
+
+    A rate limiter can be shared by multiple sessions, in threads or asyncio tasks, to limit their total rate.
+
+    Usage::
+
+        >>> limiter = RateLimiter(rate=10, burst=20, endpoints={consts.COURSELIB_URL: (2, 5)})
+        >>> sess = pysjtu.Session(rate_limiter=limiter)
+
+    :param rate: Requests per second to each host.
+    :param burst: Requests sent at once to each host before being limited.
+    :param endpoints: (optional) (rate, burst) tuples of endpoints, keyed by endpoint URLs like those in
+        :mod:`pysjtu.consts`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, endpoints: Optional[Dict[str, Tuple[float, int]]] = None):
+        _check_limits(rate, burst)
+        self.rate = rate
+        self.burst = burst
+        self._hosts: Dict[str, TokenBucket] = {}
+        self._endpoints = {urlsplit(url).path: TokenBucket(*limits) for url, limits in (endpoints or {}).items()}
+        self._lock = threading.Lock()
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._hosts.get(host)
+            if bucket is None:
+                bucket = self._hosts[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def reserve(self, url: httpx.URL) -> float:
+        """
+        Reserve a slot for a request.
+
+        :param url: the absolute URL of the request.
+        :return: seconds to wait before sending the request.
+        """
+        delay = self._host_bucket(url.host).reserve()
+        endpoint = self._endpoints.get(url.path)
+        if endpoint is not None:
+            delay = max(delay, endpoint.reserve())
+        return delay
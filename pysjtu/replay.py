@@ -0,0 +1,209 @@
+import asyncio
+import base64
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict
+from os import PathLike
+from typing import Dict, List, Tuple, Union
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from .cache import _DROPPED_HEADERS
+from .fingerprint import NONCE_KEYS, request_fingerprint
+
+# Form & query keys carrying credentials, whose values are replaced in archives.
+SCRUBBED_KEYS = frozenset({"user", "pass", "captcha"})
+# Headers carrying credentials, which are dropped from archives.
+SCRUBBED_HEADERS = frozenset({"authorization", "cookie", "set-cookie"})
+SCRUBBED_VALUE = "scrubbed"
+# Timestamp nonces removed from archives, i.e. :data:`pysjtu.fingerprint.NONCE_KEYS` and `t` of captcha and logout URLs.
+SCRUBBED_NONCES = NONCE_KEYS | {"t"}
+
+ARCHIVE_VERSION = 1
+
+PathTypes = Union[str, PathLike]
+
+
+def _scrub_pairs(qs: str) -> str:
+    return urlencode([(k, SCRUBBED_VALUE if k in SCRUBBED_KEYS else v)
+                      for k, v in parse_qsl(qs, keep_blank_values=True) if k not in SCRUBBED_NONCES])
+
+
+def _scrub_request(request: httpx.Request) -> Tuple[str, str, str]:
+    """
+    Scrub credentials and nonces from a request.
+
+    :return: the scrubbed URL and form body, and the fingerprint of the scrubbed request.
+    """
+    url = request.url.copy_with(query=_scrub_pairs(request.url.query.decode()).encode() or None)
+    content_type = request.headers.get("content-type", "")
+    body = request.content
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        body = _scrub_pairs(body.decode()).encode()
+    scrubbed = httpx.Request(request.method, url, content=body, headers={"content-type": content_type})
+    return str(url), body.decode(errors="replace"), request_fingerprint(scrubbed)
+
+
+def _read_archive(path: PathTypes) -> List[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        archive = json.load(f)
+    if archive.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported archive version: {archive.get('version')}")
+    return archive["entries"]
+
+
+def _write_archive(path: PathTypes, entries: List[dict]):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"version": ARCHIVE_VERSION, "entries": entries}, f, ensure_ascii=False, separators=(",", ":"))
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    A transport recording request/response pairs to a gzipped JSON archive, to be replayed by
+    :class:`ReplayTransport` later.
+
+    Credentials are scrubbed before recording: values of login form keys in :data:`SCRUBBED_KEYS` are replaced,
+    headers in :data:`SCRUBBED_HEADERS` (cookies, etc.) are dropped, and timestamp nonces are removed from URLs and
+    form bodies. Response bodies are kept as they are.
+
+    It works with both :class:`pysjtu.session.Session` and :class:`pysjtu.session.AsyncSession`, depending on the
+    wrapped transport. The archive is written when the transport is closed, or :meth:`save` is called.
+
+    Usage::
+
+        >>> with pysjtu.Session(username="...", password="...", transport=RecordingTransport("traffic.json.gz")) as s:
+        ...     pysjtu.Client(s).schedule(2019, 0)
+
+    :param path: path of the archive.
+    :param transport: (optional) The transport to record. Defaults to :class:`httpx.HTTPTransport`.
+    """
+
+    def __init__(self, path: PathTypes, transport: Union[httpx.BaseTransport, httpx.AsyncBaseTransport, None] = None):
+        self.path = path
+        self._transport = transport if transport is not None else httpx.HTTPTransport()
+        self._entries: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _record(self, request: httpx.Request, response: httpx.Response, elapsed: float) -> httpx.Response:
+        url, body, key = _scrub_request(request)
+        # the body is decoded by now, so encoding and framing headers no longer apply to it
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS]
+        with self._lock:
+            self._entries.append({"key": key, "method": request.method, "url": url, "body": body,
+                                  "status": response.status_code,
+                                  "headers": [(k, v) for k, v in headers if k.lower() not in SCRUBBED_HEADERS],
+                                  "content": base64.b64encode(response.content).decode(),
+                                  "http_version": response.extensions.get("http_version", b"HTTP/1.1").decode(),
+                                  "elapsed": elapsed})
+        return httpx.Response(response.status_code, headers=headers, content=response.content,
+                              extensions=response.extensions)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        start = time.perf_counter()
+        response = self._transport.handle_request(request)  # type: ignore
+        try:
+            response.read()
+        finally:
+            response.close()
+        return self._record(request, response, time.perf_counter() - start)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        start = time.perf_counter()
+        response = await self._transport.handle_async_request(request)  # type: ignore
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        return self._record(request, response, time.perf_counter() - start)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self):
+        """ Write recorded pairs to the archive. """
+        with self._lock:
+            _write_archive(self.path, self._entries)
+
+    def close(self):
+        self.save()
+        self._transport.close()  # type: ignore
+
+    async def aclose(self):
+        self.save()
+        await self._transport.aclose()  # type: ignore
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    A transport serving responses recorded by :class:`RecordingTransport`, without touching the network.
+
+    Requests are matched by their fingerprints after scrubbing, so credentials and nonces don't affect matching.
+    If a request is recorded multiple times, its responses are served in the recorded order, and the last one is
+    repeated afterwards.
+
+    It works with both :class:`pysjtu.session.Session` and :class:`pysjtu.session.AsyncSession`.
+
+    Usage::
+
+        >>> sess = pysjtu.Session(username="any", password="any", transport=ReplayTransport("traffic.json.gz"))
+        >>> pysjtu.Client(sess).schedule(2019, 0)
+
+    :param path: path of the archive.
+    :param latency: (optional) Seconds of latency added to every response.
+    :param recorded_latency: (optional) Whether to add the latency observed when recording.
+    :raises: :exc:`LookupError` when a request isn't recorded.
+    """
+
+    def __init__(self, path: PathTypes, latency: float = 0, recorded_latency: bool = False):
+        self.path = path
+        self.latency = latency
+        self.recorded_latency = recorded_latency
+        self._entries: Dict[str, List[dict]] = defaultdict(list)
+        for entry in _read_archive(path):
+            self._entries[entry["key"]].append(entry)
+        self._served: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _lookup(self, request: httpx.Request) -> dict:
+        url, _, key = _scrub_request(request)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise LookupError(f"No recorded response for {request.method} {url}")
+            entry = entries[min(self._served[key], len(entries) - 1)]
+            self._served[key] += 1
+        return entry
+
+    def _delay(self, entry: dict) -> float:
+        return self.latency + (entry["elapsed"] if self.recorded_latency else 0)
+
+    @staticmethod
+    def _response(entry: dict) -> httpx.Response:
+        return httpx.Response(entry["status"], headers=entry["headers"], content=base64.b64decode(entry["content"]),
+                              extensions={"http_version": entry["http_version"].encode()})
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        entry = self._lookup(request)
+        delay = self._delay(entry)
+        if delay:
+            time.sleep(delay)
+        return self._response(entry)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        entry = self._lookup(request)
+        delay = self._delay(entry)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._response(entry)
+
+    def reset(self):
+        """ Serve recorded responses from the beginning again. """
+        with self._lock:
+            self._served.clear()
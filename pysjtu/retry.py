@@ -0,0 +1,104 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import consts
+
+# Methods which have the same effect when repeated. See RFC 7231, section 4.2.2.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """ Parse the `Retry-After` header, which is either delay seconds or an HTTP date. """
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    A policy deciding whether and when a failed request is retried by :class:`pysjtu.session.Session`.
+
+    Requests failed with a transport error (e.g. connection refused, timeouts) or responded with a status in `statuses`
+    are retried, if they are idempotent. Requests using methods in :data:`IDEMPOTENT_METHODS` are idempotent, and so are
+    POST requests to `idempotent_urls`, which are iSJTU query endpoints by default. Other requests, e.g. course
+    registrations, are never retried.
+
+    Delays grow exponentially from `backoff` up to `max_backoff`, and a random `jitter` fraction of them is subtracted,
+    so that retries of many clients don't arrive in bursts. If the server responds with a `Retry-After` header, it's
+    respected instead, but capped at `max_backoff`.
+
+    Usage::
+
+        >>> sess = pysjtu.Session(retry_policy=RetryPolicy(max_retries=5, backoff=1))
+
+    :param max_retries: Maximum number of retries of a request.
+    :param backoff: Delay (in seconds) before the first retry, which is doubled for every following retry.
+    :param max_backoff: Maximum delay (in seconds) before a retry.
+    :param jitter: The maximum fraction of a delay to be randomly subtracted. 1 gives full jitter, and 0 disables it.
+    :param statuses: Status codes of responses to be retried.
+    :param idempotent_urls: (optional) URLs to which POST requests are idempotent.
+        Defaults to :data:`pysjtu.consts.READ_ONLY_URLS`.
+    :param respect_retry_after: Whether to respect the `Retry-After` header of responses.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30, jitter: float = 1,
+                 statuses: Iterable[int] = (429, 502, 503, 504), idempotent_urls: Optional[Iterable[str]] = None,
+                 respect_retry_after: bool = True):
+        if max_retries < 0:
+            raise ValueError("max_retries must be non-negative")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        urls = consts.READ_ONLY_URLS if idempotent_urls is None else idempotent_urls
+        self._idempotent_paths = frozenset(urlsplit(url).path for url in urls)
+        self.respect_retry_after = respect_retry_after
+
+    def __repr__(self):
+        return f"<RetryPolicy max_retries={self.max_retries} backoff={self.backoff}>"
+
+    def is_idempotent(self, request: httpx.Request) -> bool:
+        """ Check whether a request can be safely repeated. """
+        return request.method in IDEMPOTENT_METHODS or \
+            (request.method == "POST" and request.url.path in self._idempotent_paths)
+
+    def retryable(self, request: httpx.Request, response: Optional[httpx.Response] = None) -> bool:
+        """
+        Check whether a request should be retried.
+
+        :param request: the request.
+        :param response: (optional) the response, or None if the request failed with a transport error.
+        """
+        if response is not None and response.status_code not in self.statuses:
+            return False
+        return self.is_idempotent(request)
+
+    def delay(self, retries: int, response: Optional[httpx.Response] = None) -> float:
+        """
+        Compute the delay before a retry.
+
+        :param retries: the number of retries already made.
+        :param response: (optional) the response to be retried, whose `Retry-After` header is respected.
+        """
+        if self.respect_retry_after and response is not None:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        delay = min(self.backoff * 2 ** retries, self.max_backoff)
+        return delay * (1 - self.jitter * random.random())
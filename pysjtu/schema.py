@@ -1,6 +1,6 @@
 import typing
 from dataclasses import MISSING, field
-from typing import Type, Union, TypeVar, Optional, Callable
+from typing import Type, Union, TypeVar, Optional, Callable, ClassVar, Dict, Tuple
 
 import marshmallow
 import marshmallow_dataclass
@@ -56,25 +56,97 @@ def FinalizeHook(cls: Type[HookedSchema]) -> Type[Schema]:
     return FinalizedSchema
 
 
+def _rename_plan(pairs: Tuple[Tuple[str, str], ...]) -> Tuple[Tuple[Tuple[str, str], ...], bool]:
+    """ Make a plan of key renaming, which is applied in one pass unless a source key is shared or renamed into. """
+    from_keys = {from_key for from_key, _ in pairs}
+    return pairs, len(from_keys) < len(pairs) or bool(from_keys & {to_key for _, to_key in pairs})
+
+
+def apply_rename_plan(data, plan):
+    """
+    Rename keys of a dict by a plan of :meth:`LoadDumpSchema.rename_plans`.
+
+    :param data: the dict to be renamed, which may be modified in place.
+    :param plan: the plan of key renaming.
+    :return: the renamed dict.
+    """
+    pairs, chained = plan
+    if not pairs:
+        return data
+    if chained:
+        return replace_keys(data, pairs)
+    for from_key, to_key in pairs:
+        if from_key in data:
+            data[to_key] = data.pop(from_key)
+    return data
+
+
 class LoadDumpSchema(HookedSchema):
     """ A Schema that supports load and dump key renaming.
 
     Use `load_key` and `dump_key` in field metadata to specify the key to be used in load and dump.
+
+    Renaming plans are computed once per schema class and set of fields (which `only` and `exclude` narrow), and
+    nothing is done if there's no key to rename.
     """
+    _rename_plans: ClassVar[Dict[Tuple[type, Tuple[str, ...]], tuple]] = {}
+
+    def rename_plans(self) -> tuple:
+        """ Get the plans of key renaming in load and dump, to be applied by :func:`apply_rename_plan`. """
+        key = (type(self), tuple(self.fields))
+        plans = LoadDumpSchema._rename_plans.get(key)
+        if plans is None:
+            fields_ = self.fields.items()
+            load_pairs = tuple((field.metadata['load_key'], field.data_key or field_name)
+                               for field_name, field in fields_ if 'load_key' in field.metadata)
+            dump_pairs = tuple((field.data_key or field_name, field.metadata['dump_key'])
+                               for field_name, field in fields_ if 'dump_key' in field.metadata)
+            plans = (_rename_plan(load_pairs), _rename_plan(dump_pairs))
+            plans = LoadDumpSchema._rename_plans.setdefault(key, plans)
+        return plans
 
     def pre_load(self, data, **kwargs):
-        pairs = tuple(
-            (field.metadata['load_key'], field.data_key or field_name)
-            for field_name, field in self.fields.items() if 'load_key' in field.metadata
-        )
-        return replace_keys(data, pairs)
+        return apply_rename_plan(data, self.rename_plans()[0])
 
     def post_dump(self, data, **kwargs):
-        pairs = tuple(
-            (field.data_key or field_name, field.metadata['dump_key'])
-            for field_name, field in self.fields.items() if 'dump_key' in field.metadata
-        )
-        return replace_keys(data, pairs)
+        return apply_rename_plan(data, self.rename_plans()[1])
+
+
+_schemas: Dict[Tuple[type, bool], Schema] = {}
+
+
+def get_schema(schema_ref, many: bool = False) -> Schema:
+    """ Get the shared instance of a schema, which is built on first use and reused afterwards.
+
+    Schemas keep no state between loads and dumps, so one instance per schema class serves every call.
+
+    :param schema_ref: a Schema class, or a model class with a `Schema` attribute.
+    :param many: whether to get the `many=True` variant.
+    """
+    schema_cls = getattr(schema_ref, "Schema", schema_ref)
+    schema = _schemas.get((schema_cls, many))
+    if schema is None:
+        schema = _schemas.setdefault((schema_cls, many), schema_cls(many=many))
+    return schema
+
+
+def warm_up(*schema_refs):
+    """ Build schemas (and compiled loaders if enabled) ahead of time, so that the cost lands at startup rather than
+    on the first request.
+
+    :param schema_refs: Schema classes or model classes. Defaults to all models in :mod:`pysjtu.models`.
+    """
+    from pysjtu.compiled import get_loader
+    if not schema_refs:
+        from pysjtu import models
+        from pysjtu.models.selection import SelectionClassLazySchema
+        schema_refs = tuple(v for v in vars(models).values()
+                            if isinstance(v, type) and getattr(v, "Schema", Schema) is not Schema)
+        schema_refs += (SelectionClassLazySchema,)
+    for schema_ref in schema_refs:
+        for many in (False, True):
+            get_schema(schema_ref, many)
+            get_loader(schema_ref, many)
 
 
 class UNSET:
@@ -1,26 +1,201 @@
+import asyncio
 import io
 import pickle
 import re
+import threading
 import time
 import warnings
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
 from functools import partial
 from http.cookiejar import CookieJar
 from pathlib import Path
-from typing import Callable, Optional, Union
-from urllib.parse import parse_qs, urlparse
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse, urlsplit
 
 import httpx
 from httpx import Response
 
 from pysjtu.ocr import JCSSRecognizer, Recognizer
-from . import consts
+from . import consts, events
+from .cache import ResponseCache
 from .consts import CAPTCHA_REFERER
-from .exceptions import DumpWarning, LoadWarning, LoginException, ServiceUnavailable, SessionException
+from .circuit import CircuitBreaker
+from .events import Event, _Tracer
+from .exceptions import CircuitOpenException, DumpWarning, LoadWarning, LoginException, ServiceUnavailable, \
+    SessionException
+from .fingerprint import request_fingerprint
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .tracking import _check_budgets
+from .transport import _resolve_http2, protocol_counter
 from .utils import FileTypes
+from .validation import ValidationPolicy
 
 CookieTypes = Union[httpx.Cookies, CookieJar]
 URLTypes = Union[httpx.URL, str]
 
+_LOGIN_PAGE_PATH = b"/xtgl/login_slogin.html"
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+_READ_ONLY_PATHS = frozenset(urlsplit(url).path for url in consts.READ_ONLY_URLS)
+_BUILD_REQUEST_KWARGS = ("content", "data", "files", "json", "params", "headers", "cookies", "timeout", "extensions")
+
+# Events emitted from httpcore traces, which are installed only when there are hooks of these events.
+_TRACED_EVENTS = (events.CONNECT, events.TLS, events.REQUEST, events.ALL)
+
+# A request built by :meth:`_SessionBase._prepare`: (request, fingerprint, whether it's coalesced, cache TTL).
+_Prepared = Tuple[httpx.Request, Optional[str], bool, float]
+
+
+def _is_login_page(resp: Response) -> bool:
+    """ Check whether a response has been redirected to the login page, i.e. the session is expired. """
+    return resp.url.raw_path == _LOGIN_PAGE_PATH  # type: ignore
+
+
+def _parse_login_page(resp: Response) -> Tuple[str, dict]:
+    """
+    Extract the captcha uuid and the login parameters from the JAccount login page.
+
+    :param resp: the response of the JAccount login page.
+    :return: a tuple of (uuid, login parameters).
+    """
+    uuid = re.findall(r"(?<=uuid=).*(?=\")", resp.text)[0]
+    login_params = {k: v[0] for k, v in parse_qs(urlparse(str(resp.url)).query).items()}
+    return uuid, login_params
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str, on_done: Optional[Callable[[float], None]] = None):
+    """ Add the time spent in a `with` block to the timing of given stage, and pass it to `on_done` if given. """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        timings[stage] += seconds
+        if on_done is not None:
+            on_done(seconds)
+
+
+def _next_login_attempt(uuid: str, captcha_refreshed: bool) -> Tuple[Optional[str], bool]:
+    """
+    Decide how a failed login is retried.
+
+    :return: a tuple of (the uuid of the login page to retry with, or None to fetch a new one, whether the captcha of
+        the next attempt is a refreshed one).
+    """
+    if captcha_refreshed:
+        # Failed again with a refreshed captcha. Start over with a new login page and captcha at once.
+        return None, False
+    # Most failures are caused by misrecognized captchas, so retry with a new captcha at once.
+    return uuid, True
+
+
+def _record_login_timings(metrics: Metrics, timings: Dict[str, float]):
+    for stage, seconds in timings.items():
+        if stage != "attempts":
+            metrics.observe(f"login_{stage}_seconds", seconds)
+
+
+def _build_request(client: Union[httpx.Client, httpx.AsyncClient], method: str, url: URLTypes,
+                   kwargs: dict) -> httpx.Request:
+    """ Build a request as the client would send, ignoring keyword arguments which only affect sending. """
+    return client.build_request(method, url, **{k: v for k, v in kwargs.items() if k in _BUILD_REQUEST_KWARGS})
+
+
+def _is_idempotent(req: httpx.Request) -> bool:
+    """ Check whether a request has no side effect, so that identical requests can be coalesced. """
+    return req.method in _SAFE_METHODS or req.url.path in _READ_ONLY_PATHS
+
+
+def _is_cacheable(resp: Response) -> bool:
+    return resp.status_code == httpx.codes.OK and not _is_login_page(resp)
+
+
+def _retry_delay(policy: Optional[RetryPolicy], metrics: Metrics, retries: int, request: httpx.Request,
+                 response: Optional[Response] = None) -> Optional[float]:
+    """
+    Decide whether a failed request is retried, and count retries and give-ups.
+
+    :return: the delay before the retry, or None if the request isn't retried.
+    """
+    if policy is None or not policy.retryable(request, response):
+        return None
+    if retries >= policy.max_retries:
+        metrics.incr("retry_give_ups")
+        return None
+    metrics.incr("retries")
+    return policy.delay(retries, response)
+
+
+def _sync_client_kwargs(kwargs: dict) -> dict:
+    """ Drop asynchronous transports from keyword arguments of an async client, to create a sync client with. """
+    kwargs = {k: v for k, v in kwargs.items() if not isinstance(v, httpx.AsyncBaseTransport)}
+    if kwargs.get("mounts"):
+        kwargs["mounts"] = {k: v for k, v in kwargs["mounts"].items() if not isinstance(v, httpx.AsyncBaseTransport)}
+    return kwargs
+
+
+def _keep_alive(session_ref: "weakref.ref[Session]", interval: float, stop: threading.Event):
+    """ Ping the session in background when it has been idle for given seconds, until stopped or collected. """
+    while True:
+        sess = session_ref()
+        if sess is None:
+            return
+        delay = sess._last_active + interval - time.monotonic()
+        del sess
+        if delay > 0:
+            if stop.wait(delay):
+                return
+            continue
+        sess = session_ref()
+        if sess is None:
+            return
+        sess._keep_alive_ping()
+        del sess
+
+
+def _to_cookie_jar(cookies) -> CookieTypes:
+    """ Convert a cookie object read from a session dict to a cookie type accepted by httpx. """
+    if isinstance(cookies, httpx.Cookies):
+        return cookies
+    if isinstance(cookies, dict):
+        cj = CookieJar()
+        # noinspection PyTypeHints
+        cj._cookies = cookies  # type: ignore
+        return cj
+    raise TypeError
+
+
+def _read_session_file(fp: FileTypes) -> dict:
+    """ Read a session dict from a binary file object / filepath. An empty file yields an empty dict. """
+    if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+        try:
+            return pickle.load(fp)
+        except EOFError:
+            return {}
+    elif isinstance(fp, (str, Path)):
+        try:
+            with open(fp, mode="rb") as f:
+                return pickle.load(f)
+        except EOFError:
+            return {}
+    raise TypeError
+
+
+def _write_session_file(fp: FileTypes, conf: dict):
+    """ Write a session dict to a binary file object / filepath. """
+    if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+        pickle.dump(conf, fp)
+    elif isinstance(fp, (str, Path)):
+        with open(fp, mode="wb") as f:
+            pickle.dump(conf, f)
+    else:
+        raise TypeError
+
 
 class BaseSession:
     """ Base session """
@@ -33,7 +208,377 @@ class BaseSession:
         raise NotImplementedError  # pragma: no cover
 
 
-class Session(BaseSession):
+class BaseAsyncSession:
+    """ Base asynchronous session """
+    _cache_store: dict
+
+    async def get(self, *args, **kwargs):
+        raise NotImplementedError  # pragma: no cover
+
+    async def post(self, *args, **kwargs):
+        raise NotImplementedError  # pragma: no cover
+
+
+class _SessionBase:
+    """ State and transport-independent logic shared by :class:`Session` and :class:`AsyncSession`. """
+    _client: Union[httpx.Client, httpx.AsyncClient]  # httpx session
+    _retry: list = [.5] * 5 + list(range(1, 5))  # an item per login attempt
+    _ocr: Recognizer
+    _username: str
+    _password: str
+    _session_file: Optional[FileTypes]
+    _cache_store: dict
+    _response_cache: Optional[ResponseCache]
+    _generation: int  # increased on each login or renewal
+    _metrics: Metrics
+    _keep_alive_interval: Optional[float]
+    _last_active: float  # monotonic time of the last response which proves the session is valid
+    _validation: ValidationPolicy
+    _last_login_timings: Dict[str, float]
+    _http_version: Optional[str]  # HTTP version of the last response
+    _retry_policy: Optional[RetryPolicy]
+    _rate_limiter: Optional[RateLimiter]
+    _circuit_breaker: Optional[CircuitBreaker]
+    _hooks: Dict[str, List[Callable[[Event], None]]]
+
+    def __init__(self, client: Union[httpx.Client, httpx.AsyncClient], ocr: Optional[Recognizer],
+                 retry: Optional[list], cache: Optional[ResponseCache], metrics: Optional[Metrics],
+                 keep_alive: Optional[float], validation: Optional[ValidationPolicy],
+                 retry_policy: Optional[RetryPolicy], rate_limiter: Optional[RateLimiter],
+                 circuit_breaker: Optional[CircuitBreaker], hooks: Optional[Dict[str, List[Callable[[Event], None]]]],
+                 recognizer_kwargs: dict):
+        self._client = client
+        self._ocr = ocr if ocr else JCSSRecognizer(**recognizer_kwargs)
+        self._username = ""
+        self._password = ""
+        self._cache_store = {}
+        self._response_cache = cache
+        self._generation = 0
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._validation = validation if validation is not None else ValidationPolicy.always()
+        self._last_login_timings = {}
+        self._http_version = None
+        self._retry_policy = retry_policy
+        self._rate_limiter = rate_limiter
+        self._circuit_breaker = circuit_breaker
+        self._hooks = defaultdict(list)
+        for name, callbacks in (hooks or {}).items():
+            self._hooks[name].extend(callbacks)
+        self._keep_alive_interval = keep_alive
+        self._last_active = time.monotonic()
+        # noinspection PyTypeChecker
+        self._session_file = None
+        if retry:
+            self._retry = retry
+
+    @staticmethod
+    def _https_request(e: httpx.NetworkError) -> httpx.Request:
+        """ Switch a request failed with a network error to HTTPS, or re-raise the error if it's already HTTPS. """
+        req = e.request
+        if req.url.scheme == "https":
+            raise e
+        req.url = req.url.copy_with(scheme="https", port=None)
+        return req
+
+    def _save_session_file(self):
+        if self._session_file:
+            if isinstance(self._session_file, (io.RawIOBase, io.BufferedIOBase)):
+                self._session_file.seek(0)
+            self.dump(self._session_file)
+
+    def _keep_alive_failed(self):
+        # Failures are left to the next real request. Wait for another interval before retrying.
+        self._last_active = time.monotonic()
+        self._metrics.incr("keep_alive_failures")
+
+    def _prepare(self, method: str, url: URLTypes, kwargs: dict, validate_session: bool) -> _Prepared:
+        """
+        Build a request as it would be sent, and fingerprint it once if it can be coalesced or cached.
+
+        :return: a tuple of (the request, its fingerprint or None, whether it can be coalesced, TTL of its cached
+            response or 0).
+        """
+        req = _build_request(self._client, method, url, kwargs)
+        coalesce = validate_session and _is_idempotent(req)
+        ttl = self._response_cache.ttl(req) if self._response_cache is not None and self._username else 0
+        key = request_fingerprint(req, self._username) if coalesce or ttl else None
+        return req, key, coalesce, ttl
+
+    def _cached(self, prepared: _Prepared) -> Optional[Response]:
+        """ Look up a prepared request in the response cache, and count cache hits and misses. """
+        req, key, _, ttl = prepared
+        if not ttl:
+            return None
+        cached = self._response_cache.get(key, req)  # type: ignore
+        self._metrics.incr("cache_hits" if cached is not None else "cache_misses")
+        return cached
+
+    def _check_response(self, resp: Response, validate_session: bool) -> bool:
+        """
+        Record the protocol of a response, and raise an error for an error status.
+
+        :return: whether the response shows that the session has expired.
+        """
+        self._record_protocol(resp)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPError as e:
+            if resp.status_code == httpx.codes.SERVICE_UNAVAILABLE:
+                raise ServiceUnavailable
+            raise e
+        return validate_session and _is_login_page(resp)
+
+    def _prepare_send(self, url: URLTypes, kwargs: dict) -> Tuple[httpx.URL, dict]:
+        """ Resolve the full URL of a request, and trace the request if there are hooks of traced events. """
+        full_url = self._client.base_url.join(url)
+        if any(name in self._hooks for name in _TRACED_EVENTS):
+            tracer = _Tracer(self._emit, full_url.path)
+            trace = tracer.atrace if isinstance(self._client, httpx.AsyncClient) else tracer
+            kwargs = {**kwargs, "extensions": {**kwargs.get("extensions", {}), "trace": trace}}
+        return full_url, kwargs
+
+    def _admit(self, url: httpx.URL) -> Optional[int]:
+        """
+        Ask the circuit breaker whether a request can be sent.
+
+        :return: the generation of the circuit the request is allowed in, or None if there's no circuit breaker.
+        :raises CircuitOpenException: when the circuit to the host is open.
+        """
+        if self._circuit_breaker is None:
+            return None
+        generation = self._circuit_breaker.allow(url.host)
+        if generation is None:
+            self._metrics.incr("circuit_rejections")
+            raise CircuitOpenException(f"Circuit to {url.host} is open.")
+        return generation
+
+    def _transport_failed(self, url: httpx.URL, generation: Optional[int], retries: int,
+                          e: httpx.TransportError) -> Optional[float]:
+        """
+        Record a request failed with a transport error.
+
+        :return: the delay before the retry, or None if the request isn't retried.
+        """
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record(url.host, True, generation)  # type: ignore
+        return _retry_delay(self._retry_policy, self._metrics, retries, e.request)
+
+    def _send_aborted(self, url: httpx.URL, generation: Optional[int]):
+        """ Forget a request interrupted by an error other than a transport error, e.g. a cancellation. """
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.discard(url.host, generation)  # type: ignore
+
+    def _responded(self, url: httpx.URL, generation: Optional[int], seconds: float, retries: int,
+                   resp: Response) -> Optional[float]:
+        """
+        Record a response, and emit its event.
+
+        :return: the delay before the retry, or None if the request isn't retried.
+        """
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record(url.host, resp.status_code in self._circuit_breaker.statuses,
+                                         generation)  # type: ignore
+        self._emit(events.RESPONSE, seconds, url.path, status=resp.status_code,
+                   bytes_sent=int(resp.request.headers.get("content-length", 0)),
+                   bytes_received=resp.num_bytes_downloaded, http_version=resp.http_version)
+        return _retry_delay(self._retry_policy, self._metrics, retries, resp.request, resp)
+
+    def _renewed(self, start: float):
+        self._generation += 1
+        self._metrics.incr("renewals")
+        self._emit(events.RENEW, time.perf_counter() - start)
+
+    @staticmethod
+    def _captcha_params(uuid: str) -> dict:
+        return {"uuid": uuid, "t": int(time.time() * 1000)}
+
+    @staticmethod
+    def _login_form(login_params: dict, uuid: str, username: str, password: str, captcha: str) -> dict:
+        login_params.update({"v": "", "uuid": uuid, "user": username, "pass": password, "captcha": captcha})
+        return login_params
+
+    def _logged_in(self, username: str, password: str):
+        self._username = username
+        self._password = password
+        self._generation += 1
+        self._last_active = time.monotonic()
+        self._metrics.incr("logins")
+
+    def _login_finished(self, timings: Dict[str, float]):
+        self._last_login_timings = dict(timings)
+        _record_login_timings(self._metrics, timings)
+        self._emit(events.LOGIN, timings["total"], attempts=int(timings["attempts"]))
+
+    @staticmethod
+    def _logout_params() -> dict:
+        return {"t": int(time.time() * 1000), "login_type": ""}
+
+    def _logged_out(self, purge_session: bool, cookie_bak: httpx.Cookies):
+        if purge_session:
+            self._username = ''
+            self._password = ''
+        else:
+            self._client.cookies = cookie_bak
+
+    def _read_credentials(self, d: dict) -> bool:
+        """
+        Read credentials from a session dict. A warning will be given if username or password field is missing.
+
+        :return: whether both username and password are given.
+        """
+        if "username" not in d.keys() or "password" not in d.keys() or not d["username"] or not d["password"]:
+            warnings.warn("Missing username or password field", LoadWarning)
+            self._username = ""
+            self._password = ""
+            return False
+        self._username = d["username"]
+        self._password = d["password"]
+        return True
+
+    def fingerprint(self, method: str, url: URLTypes, **kwargs) -> str:
+        """
+        Compute the fingerprint of a request, which is equal for requests with the same effect in this session.
+
+        Query strings and form bodies are canonicalized, and the `nd` timestamp nonce is ignored.
+        See :func:`pysjtu.fingerprint.request_fingerprint` for details.
+
+        For additional keyword arguments, see https://www.python-httpx.org/api.
+
+        :param method: HTTP method of the request.
+        :param url: URL of the request.
+        :return: a hex digest.
+        """
+        return request_fingerprint(_build_request(self._client, method, url, kwargs), self._username)
+
+    # noinspection PyProtectedMember
+    def dumps(self) -> dict:
+        """
+        Return a dict represents the current session. A warning will be given if username or password field is missing.
+
+        :return: a dict represents the current session.
+        """
+        if not self._username or not self._password:
+            warnings.warn("Missing username or password field", DumpWarning)
+        return {"username": self._username, "password": self._password,
+                "cookies": self._client.cookies.jar._cookies}  # type: ignore
+
+    def dump(self, fp: FileTypes):
+        """
+        Write the current session to a given file. A warning will be given if username or password field is missing.
+
+        :param fp: a binary file object/ filepath as the destination of session data.
+        """
+        _write_session_file(fp, self.dumps())
+
+    @property
+    def _cookies(self) -> CookieTypes:
+        """ Get or set the cookie to be used on each request. This protected property skips session validation. """
+        return self._client.cookies
+
+    @_cookies.setter
+    def _cookies(self, new_cookie: CookieTypes):
+        self._cache_store = {}
+        self._generation += 1
+        # noinspection PyTypeHints
+        self._client.cookies = new_cookie  # type: ignore
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """ Get or set the timeout to be used on each request. """
+        return self._client.timeout
+
+    @timeout.setter
+    def timeout(self, new_timeout: httpx.Timeout):
+        self._client.timeout = new_timeout
+
+    @property
+    def base_url(self) -> httpx.URL:
+        """ Base url of backend APIs. """
+        return self._client.base_url
+
+    @property
+    def metrics(self) -> Metrics:
+        """ Counters of session activities, including `logins` and `renewals`. """
+        return self._metrics
+
+    def add_hook(self, name: str, callback: Callable[[Event], None]):
+        """
+        Register a callback receiving timing events.
+
+        Events are named `connect`, `tls`, `request`, `response`, `renew`, `login` and `ocr` (see :mod:`pysjtu.events`).
+        Register a callback with name `*` to receive all events. Connect, TLS and request events are traced only when
+        there are hooks registered for them (or for all events).
+
+        Exceptions raised by callbacks are re-raised after all callbacks have received the event.
+
+        Usage::
+
+            >>> sess.add_hook("response", lambda event: print(event.endpoint, event.seconds))
+
+        :param name: name of events.
+        :param callback: a callable receiving a :class:`pysjtu.events.Event`.
+        """
+        self._hooks[name].append(callback)
+
+    def remove_hook(self, name: str, callback: Callable[[Event], None]):
+        """
+        Unregister a callback registered by :meth:`add_hook`.
+
+        :param name: name of events.
+        :param callback: the registered callback.
+        """
+        self._hooks[name].remove(callback)
+        if not self._hooks[name]:
+            del self._hooks[name]
+
+    def _emit(self, name: str, seconds: float, endpoint: str = "", **info):
+        event = Event(name, seconds, endpoint, info)
+        self._metrics.record(event)
+        error = None
+        for callback in self._hooks.get(name, []) + self._hooks.get(events.ALL, []):
+            try:
+                callback(event)
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+
+    def _check_budgets(self):
+        """ Check budgets of trackers of the caller, after a request (maybe shared with other callers) returns. """
+        hooks = self._hooks.get(events.RESPONSE)
+        if hooks:
+            _check_budgets(hooks)
+
+    def _rate_limit_delay(self, url: httpx.URL) -> float:
+        """ Reserve a slot of the rate limiter for a request, and record the time it waits in queue. """
+        delay = self._rate_limiter.reserve(url)  # type: ignore
+        self._metrics.observe("rate_limit_wait_seconds", delay)
+        return delay
+
+    def _record_protocol(self, resp: Response):
+        self._http_version = resp.http_version
+        self._metrics.incr(protocol_counter(resp.http_version))
+
+    @property
+    def http_version(self) -> Optional[str]:
+        """
+        HTTP version negotiated for the last response, e.g. `HTTP/2` or `HTTP/1.1`.
+
+        Responses are also counted per version in :attr:`metrics`, e.g. as `responses_http2`.
+        """
+        return self._http_version
+
+    @property
+    def last_login_timings(self) -> Dict[str, float]:
+        """
+        Time (in seconds) spent in each stage of the last login: `page` (fetching the login page), `captcha`, `ocr`,
+        `submit` and `total`, along with the number of `attempts`.
+        """
+        return dict(self._last_login_timings)
+
+
+class Session(BaseSession, _SessionBase):
     """
     A pysjtu session with login management, cookie persistence, etc.
 
@@ -64,15 +609,32 @@ class Session(BaseSession):
     :param cookies: The cookie to be used on each request.
     :param ocr: The captcha :class:`Recognizer`.
     :param session_file: The file which a session is loaded from & saved to.
-    :param retry: A list contains retry delays. If it's exhausted, an exception will be raised.
+    :param retry: A list with an item per login attempt, whose values are ignored. If all attempts fail, an exception
+        will be raised.
     :param base_url: Base url of backend APIs.
+    :param cache: (optional) A :class:`pysjtu.cache.ResponseCache` to serve responses of read-only endpoints from.
+        Responses are cached per username, so sessions without credentials aren't cached.
+    :param metrics: (optional) A :class:`pysjtu.metrics.Metrics` to record session activities to. It can be shared by
+        multiple sessions.
+    :param keep_alive: (optional) If set, a background thread pings the server when the session has been idle for
+        this many seconds, and renews the session if it has expired, so that requests don't pay for renewals.
+        Call :meth:`close` or use the session as a context manager to stop it.
+    :param validation: (optional) A :class:`pysjtu.validation.ValidationPolicy` deciding whether new cookies are
+        validated with extra requests. Defaults to validating them.
+    :param retry_policy: (optional) A :class:`pysjtu.retry.RetryPolicy` deciding how requests failed with transport
+        errors or transient statuses (e.g. 503) are retried. Defaults to no retries.
+    :param rate_limiter: (optional) A :class:`pysjtu.ratelimit.RateLimiter` to delay requests with, so that they don't
+        exceed given rates. It can be shared by multiple sessions.
+    :param circuit_breaker: (optional) A :class:`pysjtu.circuit.CircuitBreaker` which makes requests fail fast with
+        :exc:`pysjtu.exceptions.CircuitOpenException` when the server keeps failing. Pass
+        :meth:`pysjtu.circuit.CircuitBreaker.shared` to share its state with other sessions in the process.
+    :param hooks: (optional) Callbacks receiving :class:`pysjtu.events.Event`, keyed by event names.
+        See :meth:`add_hook`.
     """
     _client: httpx.Client  # httpx session
-    _retry: list = [.5] * 5 + list(range(1, 5))  # retry list
-    _ocr: Recognizer
-    _username: str
-    _password: str
-    _session_file: Optional[FileTypes]
+    _flights: SingleFlight
+    _renew_lock: threading.RLock
+    _keep_alive_stop: threading.Event
 
     def _secure_req(self, ref: Callable) -> Response:
         """
@@ -84,35 +646,30 @@ class Session(BaseSession):
         try:
             return ref()
         except httpx.NetworkError as e:
-            req = e.request
-            if req.url.scheme != "https":
-                req.url = req.url.copy_with(scheme="https", port=None)
-            else:
-                raise e
-            return self._client.send(req)
+            return self._client.send(self._https_request(e))
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._client.close()
-        if self._session_file:
-            if isinstance(self._session_file, (io.RawIOBase, io.BufferedIOBase)):
-                self._session_file.seek(0)
-            self.dump(self._session_file)
+        self.close()
+        self._save_session_file()
 
     def __init__(self, username: str = "", password: str = "", cookies: Optional[CookieTypes] = None,
                  ocr: Optional[Recognizer] = None, session_file: Optional[FileTypes] = None,
-                 retry: Optional[list] = None, base_url: str = "https://i.sjtu.edu.cn", **kwargs):
-        self._client = httpx.Client(follow_redirects=True, base_url=base_url, **kwargs)
-        self._ocr = ocr if ocr else JCSSRecognizer(**kwargs)
-        self._username = ""
-        self._password = ""
-        self._cache_store = {}
-        # noinspection PyTypeChecker
-        self._session_file = None
-        if retry:
-            self._retry = retry
+                 retry: Optional[list] = None, base_url: str = "https://i.sjtu.edu.cn",
+                 cache: Optional[ResponseCache] = None, metrics: Optional[Metrics] = None,
+                 keep_alive: Optional[float] = None, validation: Optional[ValidationPolicy] = None,
+                 retry_policy: Optional[RetryPolicy] = None, rate_limiter: Optional[RateLimiter] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 hooks: Optional[Dict[str, List[Callable[[Event], None]]]] = None, **kwargs):
+        if "http2" in kwargs:
+            kwargs["http2"] = _resolve_http2(kwargs["http2"])
+        super().__init__(httpx.Client(follow_redirects=True, base_url=base_url, **kwargs), ocr, retry, cache, metrics,
+                         keep_alive, validation, retry_policy, rate_limiter, circuit_breaker, hooks, kwargs)
+        self._flights = SingleFlight()
+        self._renew_lock = threading.RLock()
+        self._keep_alive_stop = threading.Event()
 
         if session_file:
             self.load(session_file)
@@ -123,6 +680,22 @@ class Session(BaseSession):
         elif cookies:
             self.loads({"cookies": cookies})
 
+        if keep_alive:
+            threading.Thread(target=_keep_alive, args=(weakref.ref(self), keep_alive, self._keep_alive_stop),
+                             name="pysjtu-keep-alive", daemon=True).start()
+
+    def close(self):
+        """ Stop the keep-alive thread and close the underlying HTTP connections. """
+        self._keep_alive_stop.set()
+        self._client.close()
+
+    def _keep_alive_ping(self):
+        try:
+            self.get(consts.HOME_URL)
+            self._metrics.incr("keep_alives")
+        except Exception:
+            self._keep_alive_failed()
+
     def request(
             self,
             method: str,
@@ -143,32 +716,82 @@ class Session(BaseSession):
         :param validate_session: (optional) Whether to validate the current session.
         :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
         """
-        rtn = self._client.request(method, url=url, **kwargs)
-        try:
-            rtn.raise_for_status()
-        except httpx.HTTPError as e:
-            if rtn.status_code == httpx.codes.SERVICE_UNAVAILABLE:
-                raise ServiceUnavailable
-            raise e
-        if validate_session and rtn.url.raw_path == b"/xtgl/login_slogin.html":  # type: ignore
+        prepared = self._prepare(method, url, kwargs, validate_session)
+        _, key, coalesce, _ = prepared
+        if coalesce:
+            rtn = self._flights.do(key, partial(self._request, method, url, prepared,  # type: ignore
+                                                validate_session=validate_session, auto_renew=auto_renew, **kwargs))
+        else:
+            rtn = self._request(method, url, prepared, validate_session=validate_session, auto_renew=auto_renew,
+                                **kwargs)
+        self._check_budgets()
+        return rtn
+
+    def _request(self, method: str, url: URLTypes, prepared: _Prepared, *, validate_session: bool, auto_renew: bool,
+                 **kwargs) -> Response:
+        cached = self._cached(prepared)
+        if cached is not None:
+            return cached
+
+        generation = self._generation
+        rtn = self._send(method, url, kwargs)
+        if self._check_response(rtn, validate_session):
             if not auto_renew:
                 raise SessionException("Session expired.")
-            self._secure_req(partial(self.get, consts.LOGIN_URL, validate_session=False))  # refresh token
-            # Sometimes JAccount OAuth token isn't expired
-            if self.get(consts.HOME_URL,
-                        validate_session=False).url.raw_path == b"/xtgl/login_slogin.html":  # type: ignore
-                if self._username and self._password:
-                    self.login(self._username, self._password)
-                else:
-                    raise SessionException("Session expired. Unable to renew session due to missing username or "
-                                           "password")
-            return self.request(method, url,
-                                validate_session=validate_session,
-                                auto_renew=False,  # disable auto_renew to avoid infinite recursion
-                                **kwargs)
+            with self._renew_lock:
+                # The session may have been renewed by another thread while this request is in flight.
+                if self._generation == generation:
+                    self._renew()
+            return self._request(method, url, prepared,
+                                 validate_session=validate_session,
+                                 auto_renew=False,  # disable auto_renew to avoid infinite recursion
+                                 **kwargs)
         else:
+            if validate_session:
+                self._last_active = time.monotonic()
+            _, key, _, ttl = prepared
+            if ttl and _is_cacheable(rtn):
+                self._response_cache.set(key, rtn, ttl)  # type: ignore
             return rtn
 
+    def _send(self, method: str, url: URLTypes, kwargs: dict) -> Response:
+        """ Send a request, retrying it according to the retry policy. """
+        full_url, kwargs = self._prepare_send(url, kwargs)
+        retries = 0
+        while True:
+            if self._rate_limiter is not None:
+                time.sleep(self._rate_limit_delay(full_url))
+            generation = self._admit(full_url)
+            start = time.perf_counter()
+            try:
+                rtn = self._client.request(method, url=url, **kwargs)
+            except httpx.TransportError as e:
+                delay = self._transport_failed(full_url, generation, retries, e)
+                if delay is None:
+                    raise
+            except BaseException:
+                self._send_aborted(full_url, generation)
+                raise
+            else:
+                delay = self._responded(full_url, generation, time.perf_counter() - start, retries, rtn)
+                if delay is None:
+                    return rtn
+            time.sleep(delay)
+            retries += 1
+
+    def _renew(self):
+        """ Renew the expired session. Must be called with the renewal lock held. """
+        start = time.perf_counter()
+        self._secure_req(partial(self.get, consts.LOGIN_URL, validate_session=False))  # refresh token
+        # Sometimes JAccount OAuth token isn't expired
+        if _is_login_page(self.get(consts.HOME_URL, validate_session=False)):
+            if self._username and self._password:
+                self._login(self._username, self._password)
+            else:
+                raise SessionException("Session expired. Unable to renew session due to missing username or "
+                                       "password")
+        self._renewed(start)
+
     def get(
             self,
             url: URLTypes,
@@ -352,29 +975,45 @@ class Session(BaseSession):
         :param password: JAccount password.
         :raises LoginException: Failed to log in after several attempts.
         """
-        self._cache_store = {}
-        for i in self._retry:
-            login_page_req = self._secure_req(
-                partial(self.get, consts.LOGIN_URL, validate_session=False, headers=consts.HEADERS))
-            uuid = re.findall(r"(?<=uuid=).*(?=\")", login_page_req.text)[0]
-            login_params = {k: v[0] for k, v in parse_qs(urlparse(str(login_page_req.url)).query).items()}
-
-            captcha_img = self.get(consts.CAPTCHA_URL,
-                                   params={"uuid": uuid, "t": int(time.time() * 1000)},
-                                   headers={"Referer": CAPTCHA_REFERER}).content
-            captcha = self._ocr.recognize(captcha_img)
-
-            login_params.update({"v": "", "uuid": uuid, "user": username, "pass": password, "captcha": captcha})
-            result = self._secure_req(
-                partial(self.post, consts.LOGIN_POST_URL, params=login_params, headers=consts.HEADERS))
-            if b"err=" not in result.url.query:  # type: ignore
-                self._username = username
-                self._password = password
-                return
+        with self._renew_lock:
+            self._login(username, password)
 
-            time.sleep(i)
-
-        raise LoginException
+    def _login(self, username: str, password: str):
+        self._cache_store = {}
+        timings: Dict[str, float] = defaultdict(float)
+        uuid, login_params = None, {}
+        captcha_refreshed = False
+        try:
+            with _timed(timings, "total"):
+                # Steps are sequential. The next captcha isn't prefetched while submitting, as JAccount keeps one
+                # captcha per login page, and a new one could replace the captcha the submission is checked against.
+                for _ in self._retry:
+                    timings["attempts"] += 1
+                    if uuid is None:
+                        with _timed(timings, "page"):
+                            login_page_req = self._secure_req(
+                                partial(self.get, consts.LOGIN_URL, validate_session=False, headers=consts.HEADERS))
+                            uuid, login_params = _parse_login_page(login_page_req)
+
+                    with _timed(timings, "captcha"):
+                        captcha_img = self.get(consts.CAPTCHA_URL, params=self._captcha_params(uuid),
+                                               headers={"Referer": CAPTCHA_REFERER}, validate_session=False).content
+                    with _timed(timings, "ocr", partial(self._emit, events.OCR)):
+                        captcha = self._ocr.recognize(captcha_img)
+
+                    login_params = self._login_form(login_params, uuid, username, password, captcha)
+                    with _timed(timings, "submit"):
+                        result = self._secure_req(
+                            partial(self.post, consts.LOGIN_POST_URL, params=login_params, headers=consts.HEADERS,
+                                    validate_session=False))
+                    if b"err=" not in result.url.query:  # type: ignore
+                        self._logged_in(username, password)
+                        return
+                    uuid, captcha_refreshed = _next_login_attempt(uuid, captcha_refreshed)
+
+                raise LoginException
+        finally:
+            self._login_finished(timings)
 
     def logout(self, purge_session: bool = True):
         """
@@ -384,12 +1023,8 @@ class Session(BaseSession):
             caution.
         """
         cookie_bak = self._client.cookies
-        self.get(consts.LOGOUT_URL, params={"t": int(time.time() * 1000), "login_type": ""}, validate_session=False)
-        if purge_session:
-            self._username = ''
-            self._password = ''
-        else:
-            self._client.cookies = cookie_bak
+        self.get(consts.LOGOUT_URL, params=self._logout_params(), validate_session=False)
+        self._logged_out(purge_session, cookie_bak)
 
     def loads(self, d: dict):
         """
@@ -400,14 +1035,7 @@ class Session(BaseSession):
         renew_required = True
 
         if "cookies" in d.keys() and d["cookies"]:
-            if isinstance(d["cookies"], httpx.Cookies):
-                cj = d["cookies"]  # type: ignore
-            elif isinstance(d["cookies"], dict):
-                cj = CookieJar()  # type: ignore
-                # noinspection PyTypeHints
-                cj._cookies = d["cookies"]  # type: ignore
-            else:
-                raise TypeError
+            cj = _to_cookie_jar(d["cookies"])
             try:
                 self.cookies = cj
                 renew_required = False
@@ -416,14 +1044,8 @@ class Session(BaseSession):
         else:
             self._cookies = {}
 
-        if "username" not in d.keys() or "password" not in d.keys() or not d["username"] or not d["password"]:
-            warnings.warn("Missing username or password field", LoadWarning)
-            self._username = ""
-            self._password = ""
+        if not self._read_credentials(d):
             renew_required = False
-        else:
-            self._username = d["username"]
-            self._password = d["password"]
 
         if renew_required:
             self.login(self._username, self._password)
@@ -434,89 +1056,461 @@ class Session(BaseSession):
 
         :param fp: a binary file object / filepath contains a session.
         """
-        if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
-            try:
-                conf = pickle.load(fp)
-            except EOFError:
-                conf = {}
-        elif isinstance(fp, (str, Path)):
-            try:
-                with open(fp, mode="rb") as f:
-                    conf = pickle.load(f)
-            except EOFError:
-                conf = {}
-        else:
-            raise TypeError
-        self.loads(conf)
+        self.loads(_read_session_file(fp))
 
-    # noinspection PyProtectedMember
-    def dumps(self) -> dict:
+    @property
+    def cookies(self) -> CookieTypes:
         """
-        Return a dict represents the current session. A warning will be given if username or password field is missing.
+        Get or set the cookie to be used on each request. Session validation is performed on each set event,
+        unless the validation policy trusts new cookies.
 
-        :return: a dict represents the current session.
+        :raises SessionException: when given cookie doesn't contain a valid session.
         """
-        if not self._username or not self._password:
-            warnings.warn("Missing username or password field", DumpWarning)
-        return {"username": self._username, "password": self._password,
-                "cookies": self._client.cookies.jar._cookies}  # type: ignore
+        return self._client.cookies
 
-    def dump(self, fp: FileTypes):
+    @cookies.setter
+    def cookies(self, new_cookie: CookieTypes):
+        if self._validation.trust_cookies:
+            self._cookies = new_cookie
+            return
+        bak_cookie = self._client.cookies
+        # noinspection PyTypeHints
+        self._client.cookies = new_cookie  # type: ignore
+        self._secure_req(partial(self.get, consts.LOGIN_URL, validate_session=False,
+                                 headers=consts.HEADERS))  # refresh JSESSION token
+        if _is_login_page(self.get(consts.HOME_URL, validate_session=False)):
+            self._client.cookies = bak_cookie
+            raise SessionException("Invalid cookies. You may skip this validation by setting _cookies")
+        self._cache_store = {}
+
+
+class AsyncSession(BaseAsyncSession, _SessionBase):
+    """
+    An asyncio pysjtu session with login management, cookie persistence, etc.
+
+    It shares the same semantics with :class:`Session`, but is built on :class:`httpx.AsyncClient`,
+    so that a large number of sessions and requests can be driven by a single event loop.
+
+    Network I/Os can't be performed in the constructor. Given credentials or cookies are stored as is,
+    and the session is logged in or renewed on the first request which finds it expired.
+    Call :meth:`login` or :meth:`loads` explicitly if you want to log in eagerly.
+
+    Usage::
+
+        >>> import pysjtu
+        >>> async with pysjtu.AsyncSession(username='user@sjtu.edu.cn', password='something_secret') as s:
+        ...     await s.get('https://i.sjtu.edu.cn')
+        <Response [200 OK]>
+
+        >>> s = pysjtu.AsyncSession()
+        >>> await s.login('user@sjtu.edu.cn', 'something_secret')
+        >>> s.dump('session_file')
+
+    For additional keyword arguments, see https://www.python-httpx.org/api.
+
+    :param username: JAccount username.
+    :param password: JAccount password.
+    :param cookies: The cookie to be used on each request.
+    :param ocr: The captcha :class:`Recognizer`.
+    :param session_file: The file which a session is loaded from & saved to.
+    :param retry: A list with an item per login attempt, whose values are ignored. If all attempts fail, an exception
+        will be raised.
+    :param base_url: Base url of backend APIs.
+    :param cache: (optional) A :class:`pysjtu.cache.ResponseCache` to serve responses of read-only endpoints from.
+        Responses are cached per username, so sessions without credentials aren't cached. The cache is read and written
+        in worker threads, so that the event loop isn't blocked.
+    :param metrics: (optional) A :class:`pysjtu.metrics.Metrics` to record session activities to. It can be shared by
+        multiple sessions.
+    :param keep_alive: (optional) If set, a background task pings the server when the session has been idle for
+        this many seconds, and renews the session if it has expired. The task is started by the first request, and
+        stopped by :meth:`aclose`.
+    :param validation: (optional) A :class:`pysjtu.validation.ValidationPolicy` deciding whether new cookies are
+        validated with extra requests. Defaults to validating them.
+    :param retry_policy: (optional) A :class:`pysjtu.retry.RetryPolicy` deciding how requests failed with transport
+        errors or transient statuses (e.g. 503) are retried. Defaults to no retries.
+    :param rate_limiter: (optional) A :class:`pysjtu.ratelimit.RateLimiter` to delay requests with, so that they don't
+        exceed given rates. It can be shared by multiple sessions.
+    :param circuit_breaker: (optional) A :class:`pysjtu.circuit.CircuitBreaker` which makes requests fail fast with
+        :exc:`pysjtu.exceptions.CircuitOpenException` when the server keeps failing. Pass
+        :meth:`pysjtu.circuit.CircuitBreaker.shared` to share its state with other sessions in the process.
+    :param hooks: (optional) Callbacks receiving :class:`pysjtu.events.Event`, keyed by event names.
+        See :meth:`add_hook`.
+    """
+    _client: httpx.AsyncClient  # httpx session
+    _flights: AsyncSingleFlight
+    _renew_lock_: Optional[asyncio.Lock]
+    _keep_alive_task: Optional[asyncio.Task]
+
+    async def _secure_req(self, ref: Callable[[], Awaitable[Response]]) -> Response:
         """
-        Write the current session to a given file. A warning will be given if username or password field is missing.
+        Send a request using HTTPS explicitly to work around an upstream bug.
 
-        :param fp: a binary file object/ filepath as the destination of session data.
+        :param ref: a partial request call.
+        :return: the response of the original request.
+        """
+        try:
+            return await ref()
+        except httpx.NetworkError as e:
+            return await self._client.send(self._https_request(e))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+        self._save_session_file()
+
+    def __init__(self, username: str = "", password: str = "", cookies: Optional[CookieTypes] = None,
+                 ocr: Optional[Recognizer] = None, session_file: Optional[FileTypes] = None,
+                 retry: Optional[list] = None, base_url: str = "https://i.sjtu.edu.cn",
+                 cache: Optional[ResponseCache] = None, metrics: Optional[Metrics] = None,
+                 keep_alive: Optional[float] = None, validation: Optional[ValidationPolicy] = None,
+                 retry_policy: Optional[RetryPolicy] = None, rate_limiter: Optional[RateLimiter] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 hooks: Optional[Dict[str, List[Callable[[Event], None]]]] = None, **kwargs):
+        if "http2" in kwargs:
+            kwargs["http2"] = _resolve_http2(kwargs["http2"])
+        super().__init__(httpx.AsyncClient(follow_redirects=True, base_url=base_url, **kwargs), ocr, retry, cache,
+                         metrics, keep_alive, validation, retry_policy, rate_limiter, circuit_breaker, hooks,
+                         _sync_client_kwargs(kwargs))
+        self._flights = AsyncSingleFlight()
+        self._renew_lock_ = None
+        self._keep_alive_task = None
+
+        conf: dict = {}
+        if session_file:
+            conf = _read_session_file(session_file)
+            self._session_file = session_file
+        if username and password:
+            conf = {"username": username, "password": password}
+        elif cookies:
+            conf = {"cookies": cookies}
+
+        if conf.get("cookies"):
+            self._cookies = _to_cookie_jar(conf["cookies"])
+        if conf.get("username") and conf.get("password"):
+            self._username = conf["username"]
+            self._password = conf["password"]
+
+    async def aclose(self):
+        """ Stop the keep-alive task and close the underlying HTTP connections. """
+        if self._keep_alive_task is not None:
+            self._keep_alive_task.cancel()
+            self._keep_alive_task = None
+        await self._client.aclose()
+
+    async def _keep_alive(self):
+        while True:
+            delay = self._last_active + self._keep_alive_interval - time.monotonic()  # type: ignore
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self.get(consts.HOME_URL)
+                self._metrics.incr("keep_alives")
+            except Exception:
+                self._keep_alive_failed()
+
+    async def request(
+            self,
+            method: str,
+            url: URLTypes,
+            *,
+            validate_session: bool = True,
+            auto_renew: bool = True,
+            **kwargs
+    ) -> Response:
         """
-        if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
-            pickle.dump(self.dumps(), fp)
-        elif isinstance(fp, (str, Path)):
-            with open(fp, mode="wb") as f:
-                pickle.dump(self.dumps(), f)
+        Send a request. If asked, validate the current session and renew it when necessary.
+
+        For additional keyword arguments, see https://www.python-httpx.org/api.
+
+        :param method: HTTP method for the new `Request` object: `GET`, `OPTIONS`,
+            `HEAD`, `POST`, `PUT`, `PATCH`, or `DELETE`.
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        if self._keep_alive_interval and self._keep_alive_task is None:
+            self._keep_alive_task = asyncio.ensure_future(self._keep_alive())
+        prepared = self._prepare(method, url, kwargs, validate_session)
+        _, key, coalesce, _ = prepared
+        if coalesce:
+            rtn = await self._flights.do(key, partial(self._request, method, url, prepared,  # type: ignore
+                                                      validate_session=validate_session, auto_renew=auto_renew,
+                                                      **kwargs))
+        else:
+            rtn = await self._request(method, url, prepared, validate_session=validate_session,
+                                      auto_renew=auto_renew, **kwargs)
+        self._check_budgets()
+        return rtn
+
+    async def _request(self, method: str, url: URLTypes, prepared: _Prepared, *, validate_session: bool,
+                       auto_renew: bool, **kwargs) -> Response:
+        cached = await asyncio.to_thread(self._cached, prepared) if prepared[3] else None
+        if cached is not None:
+            return cached
+
+        generation = self._generation
+        rtn = await self._send(method, url, kwargs)
+        if self._check_response(rtn, validate_session):
+            if not auto_renew:
+                raise SessionException("Session expired.")
+            async with self._renew_lock:
+                # The session may have been renewed by another task while this request is in flight.
+                if self._generation == generation:
+                    await self._renew()
+            return await self._request(method, url, prepared,
+                                       validate_session=validate_session,
+                                       auto_renew=False,  # disable auto_renew to avoid infinite recursion
+                                       **kwargs)
         else:
-            raise TypeError
+            if validate_session:
+                self._last_active = time.monotonic()
+            _, key, _, ttl = prepared
+            if ttl and _is_cacheable(rtn):
+                await asyncio.to_thread(self._response_cache.set, key, rtn, ttl)  # type: ignore
+            return rtn
 
     @property
-    def _cookies(self) -> CookieTypes:
-        """ Get or set the cookie to be used on each request. This protected property skips session validation. """
-        return self._client.cookies
+    def _renew_lock(self) -> asyncio.Lock:
+        # Created lazily, since an asyncio lock may be bound to the event loop running when it's created.
+        if self._renew_lock_ is None:
+            self._renew_lock_ = asyncio.Lock()
+        return self._renew_lock_
+
+    async def _send(self, method: str, url: URLTypes, kwargs: dict) -> Response:
+        """ Send a request, retrying it according to the retry policy. """
+        full_url, kwargs = self._prepare_send(url, kwargs)
+        retries = 0
+        while True:
+            if self._rate_limiter is not None:
+                await asyncio.sleep(self._rate_limit_delay(full_url))
+            generation = self._admit(full_url)
+            start = time.perf_counter()
+            try:
+                rtn = await self._client.request(method, url=url, **kwargs)
+            except httpx.TransportError as e:
+                delay = self._transport_failed(full_url, generation, retries, e)
+                if delay is None:
+                    raise
+            except BaseException:
+                self._send_aborted(full_url, generation)
+                raise
+            else:
+                delay = self._responded(full_url, generation, time.perf_counter() - start, retries, rtn)
+                if delay is None:
+                    return rtn
+            await asyncio.sleep(delay)
+            retries += 1
+
+    async def _renew(self):
+        """ Renew the expired session. Must be called with the renewal lock held. """
+        start = time.perf_counter()
+        await self._secure_req(partial(self.get, consts.LOGIN_URL, validate_session=False))  # refresh token
+        # Sometimes JAccount OAuth token isn't expired
+        if _is_login_page(await self.get(consts.HOME_URL, validate_session=False)):
+            if self._username and self._password:
+                await self._login(self._username, self._password)
+            else:
+                raise SessionException("Session expired. Unable to renew session due to missing username or "
+                                       "password")
+        self._renewed(start)
 
-    @_cookies.setter
-    def _cookies(self, new_cookie: CookieTypes):
+    async def get(self, url: URLTypes, *, validate_session: bool = True, auto_renew: bool = True,
+                  **kwargs) -> Response:
+        """
+        Send a GET request. See :meth:`request` for details.
+
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        return await self.request("GET", url, validate_session=validate_session, auto_renew=auto_renew, **kwargs)
+
+    async def options(self, url: URLTypes, *, validate_session: bool = True, auto_renew: bool = True,
+                      **kwargs) -> Response:
+        """
+        Send a OPTIONS request. See :meth:`request` for details.
+
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        return await self.request("OPTIONS", url, validate_session=validate_session, auto_renew=auto_renew, **kwargs)
+
+    async def head(self, url: URLTypes, *, validate_session: bool = True, auto_renew: bool = True,
+                   **kwargs) -> Response:
+        """
+        Send a HEAD request. See :meth:`request` for details.
+
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        return await self.request("HEAD", url, validate_session=validate_session, auto_renew=auto_renew, **kwargs)
+
+    async def post(self, url: URLTypes, *, validate_session: bool = True, auto_renew: bool = True,
+                   **kwargs) -> Response:
+        """
+        Send a POST request. See :meth:`request` for details.
+
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        return await self.request("POST", url, validate_session=validate_session, auto_renew=auto_renew, **kwargs)
+
+    async def put(self, url: URLTypes, *, validate_session: bool = True, auto_renew: bool = True,
+                  **kwargs) -> Response:
+        """
+        Send a PUT request. See :meth:`request` for details.
+
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        return await self.request("PUT", url, validate_session=validate_session, auto_renew=auto_renew, **kwargs)
+
+    async def patch(self, url: URLTypes, *, validate_session: bool = True, auto_renew: bool = True,
+                    **kwargs) -> Response:
+        """
+        Send a PATCH request. See :meth:`request` for details.
+
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        return await self.request("PATCH", url, validate_session=validate_session, auto_renew=auto_renew, **kwargs)
+
+    async def delete(self, url: URLTypes, *, validate_session: bool = True, auto_renew: bool = True,
+                     **kwargs) -> Response:
+        """
+        Send a DELETE request. See :meth:`request` for details.
+
+        :param url: URL for the new `Request` object.
+        :param validate_session: (optional) Whether to validate the current session.
+        :param auto_renew: (optional) Whether to renew the session when it expires. Works when validate_session is True.
+        """
+        return await self.request("DELETE", url, validate_session=validate_session, auto_renew=auto_renew, **kwargs)
+
+    async def login(self, username: str, password: str):
+        """
+        Log in JAccount using given username & password.
+
+        The captcha is solved in a worker thread, so that the event loop won't be blocked by the recognizer.
+
+        :param username: JAccount username.
+        :param password: JAccount password.
+        :raises LoginException: Failed to log in after several attempts.
+        """
+        async with self._renew_lock:
+            await self._login(username, password)
+
+    async def _login(self, username: str, password: str):
         self._cache_store = {}
-        # noinspection PyTypeHints
-        self._client.cookies = new_cookie  # type: ignore
+        timings: Dict[str, float] = defaultdict(float)
+        uuid, login_params = None, {}
+        captcha_refreshed = False
+        try:
+            with _timed(timings, "total"):
+                # Steps are sequential. The next captcha isn't prefetched while submitting, as JAccount keeps one
+                # captcha per login page, and a new one could replace the captcha the submission is checked against.
+                for _ in self._retry:
+                    timings["attempts"] += 1
+                    if uuid is None:
+                        with _timed(timings, "page"):
+                            login_page_req = await self._secure_req(
+                                partial(self.get, consts.LOGIN_URL, validate_session=False, headers=consts.HEADERS))
+                            uuid, login_params = _parse_login_page(login_page_req)
+
+                    with _timed(timings, "captcha"):
+                        captcha_img = (await self.get(consts.CAPTCHA_URL, params=self._captcha_params(uuid),
+                                                      headers={"Referer": CAPTCHA_REFERER},
+                                                      validate_session=False)).content
+                    with _timed(timings, "ocr", partial(self._emit, events.OCR)):
+                        captcha = await self._ocr.arecognize(captcha_img)
+
+                    login_params = self._login_form(login_params, uuid, username, password, captcha)
+                    with _timed(timings, "submit"):
+                        result = await self._secure_req(
+                            partial(self.post, consts.LOGIN_POST_URL, params=login_params, headers=consts.HEADERS,
+                                    validate_session=False))
+                    if b"err=" not in result.url.query:  # type: ignore
+                        self._logged_in(username, password)
+                        return
+                    uuid, captcha_refreshed = _next_login_attempt(uuid, captcha_refreshed)
+
+                raise LoginException
+        finally:
+            self._login_finished(timings)
+
+    async def logout(self, purge_session: bool = True):
+        """
+        Log out JAccount.
+
+        :param purge_session: (optional) Whether to purge local session info. May causes inconsistency, so use with
+            caution.
+        """
+        cookie_bak = self._client.cookies
+        await self.get(consts.LOGOUT_URL, params=self._logout_params(), validate_session=False)
+        self._logged_out(purge_session, cookie_bak)
+
+    async def loads(self, d: dict):
+        """
+        Read a session from a given dict. A warning will be given if username or password field is missing.
+
+        :param d: a dict contains a session.
+        """
+        renew_required = True
+
+        if "cookies" in d.keys() and d["cookies"]:
+            cj = _to_cookie_jar(d["cookies"])
+            try:
+                await self.set_cookies(cj)
+                renew_required = False
+            except SessionException:
+                pass
+        else:
+            self._cookies = {}
+
+        if not self._read_credentials(d):
+            renew_required = False
+
+        if renew_required:
+            await self.login(self._username, self._password)
+
+    async def load(self, fp: FileTypes):
+        """
+        Read a session from a given file. A warning will be given if username or password field is missing.
+
+        :param fp: a binary file object / filepath contains a session.
+        """
+        await self.loads(_read_session_file(fp))
 
     @property
     def cookies(self) -> CookieTypes:
         """
-        Get or set the cookie to be used on each request. Session validation is performed on each set event.
-
-        :raises SessionException: when given cookie doesn't contain a valid session.
+        Get the cookie to be used on each request. To set cookies with session validation, use :meth:`set_cookies`.
         """
         return self._client.cookies
 
-    @cookies.setter
-    def cookies(self, new_cookie: CookieTypes):
+    async def set_cookies(self, new_cookie: CookieTypes):
+        """
+        Set the cookie to be used on each request. Session validation is performed,
+        unless the validation policy trusts new cookies.
+
+        :raises SessionException: when given cookie doesn't contain a valid session.
+        """
+        if self._validation.trust_cookies:
+            self._cookies = new_cookie
+            return
         bak_cookie = self._client.cookies
         # noinspection PyTypeHints
         self._client.cookies = new_cookie  # type: ignore
-        self._secure_req(partial(self.get, consts.LOGIN_URL, validate_session=False,
-                                 headers=consts.HEADERS))  # refresh JSESSION token
-        if self.get(consts.HOME_URL, validate_session=False).url.raw_path == b"/xtgl/login_slogin.html":  # type: ignore
+        await self._secure_req(partial(self.get, consts.LOGIN_URL, validate_session=False,
+                                       headers=consts.HEADERS))  # refresh JSESSION token
+        if _is_login_page(await self.get(consts.HOME_URL, validate_session=False)):
             self._client.cookies = bak_cookie
             raise SessionException("Invalid cookies. You may skip this validation by setting _cookies")
         self._cache_store = {}
-
-    @property
-    def timeout(self) -> httpx.Timeout:
-        """ Get or set the timeout to be used on each request. """
-        return self._client.timeout
-
-    @timeout.setter
-    def timeout(self, new_timeout: httpx.Timeout):
-        self._client.timeout = new_timeout
-
-    @property
-    def base_url(self) -> httpx.URL:
-        """ Base url of backend APIs. """
-        return self._client.base_url
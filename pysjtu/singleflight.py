@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key, so that only one of them is executed and its result is shared.
+
+    A call issued after the shared one finishes is executed again, i.e. results aren't cached.
+
+    :var shared: number of calls served by a call of another thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Call a function, or wait for the in-flight call with the same key and return its result.
+
+        :param key: the key identifying the call.
+        :param fn: the function to be called.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not is_owner:
+            return future.result()
+        try:
+            rtn = fn()
+            future.set_result(rtn)
+            return rtn
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce concurrent coroutine calls with the same key. See :class:`SingleFlight`.
+
+    :var shared: number of calls served by a call of another task.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await a coroutine function, or wait for the in-flight call with the same key and return its result.
+
+        :param key: the key identifying the call.
+        :param fn: the coroutine function to be called.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
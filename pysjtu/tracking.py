@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+
+from . import events
+from .events import Event
+from .exceptions import BudgetExceeded
+
+# Trackers whose scopes are entered in the current context.
+_active: ContextVar[Tuple["Tracker", ...]] = ContextVar("pysjtu_trackers", default=())
+
+
+class Tracker:
+    """
+    Accounting of HTTP requests sent by a session in a scope, usually created by :meth:`pysjtu.client.Client.track`.
+
+    Only requests sent to the network are counted. Responses served from the response cache are free. Requests are
+    counted only in the context (thread or task) the scope is entered in, and in tasks and page-prefetching threads
+    started from it, so that other users of a shared session are left out.
+
+    :param max_requests: (optional) Maximum number of requests.
+    :param max_bytes: (optional) Maximum number of bytes sent and received.
+    :param max_seconds: (optional) Maximum seconds elapsed since the scope is entered.
+    :var requests: number of requests sent.
+    :var bytes_sent: number of bytes sent in request bodies.
+    :var bytes_received: number of bytes received in response bodies.
+    :var network_seconds: total seconds spent in request round trips.
+    :var endpoints: numbers of requests, keyed by endpoints.
+    """
+
+    def __init__(self, max_requests: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_seconds: Optional[float] = None):
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.network_seconds = 0.0
+        self.endpoints: Counter = Counter()
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<Tracker requests={self.requests} bytes={self.bytes} seconds={self.seconds:.3f}>"
+
+    @property
+    def bytes(self) -> int:
+        """ Number of bytes sent and received. """
+        return self.bytes_sent + self.bytes_received
+
+    @property
+    def seconds(self) -> float:
+        """ Seconds elapsed in the scope. """
+        return (self._end if self._end is not None else time.perf_counter()) - self._start
+
+    def __call__(self, event: Event):
+        """ Record a `response` event. It's registered as an event hook of the tracked session. """
+        if self not in _active.get():
+            return
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += event.info.get("bytes_sent", 0)
+            self.bytes_received += event.info.get("bytes_received", 0)
+            self.network_seconds += event.seconds
+            self.endpoints[event.endpoint] += 1
+
+    def _check(self):
+        if self.max_requests is not None and self.requests > self.max_requests:
+            raise BudgetExceeded(f"{self.requests} requests sent, exceeding the budget of {self.max_requests}.")
+        if self.max_bytes is not None and self.bytes > self.max_bytes:
+            raise BudgetExceeded(f"{self.bytes} bytes transferred, exceeding the budget of {self.max_bytes}.")
+        if self.max_seconds is not None and self.seconds > self.max_seconds:
+            raise BudgetExceeded(f"{self.seconds:.3f} seconds elapsed, exceeding the budget of {self.max_seconds}.")
+
+    def stop(self):
+        """ Stop the clock. """
+        self._end = time.perf_counter()
+
+
+def _check_budgets(hooks: list):
+    """
+    Check budgets of trackers whose scopes are entered in the current context, among the hooks of a session.
+
+    Budgets are checked by the caller of a request after it returns, rather than by the hook, so that callers sharing
+    a coalesced request aren't charged for the tracker of the one sending it.
+
+    :raises: :exc:`pysjtu.exceptions.BudgetExceeded` when a budget is exceeded.
+    """
+    for tracker in _active.get():
+        if tracker in hooks:
+            tracker._check()
+
+
+@contextmanager
+def track(session, max_requests: Optional[int] = None, max_bytes: Optional[int] = None,
+          max_seconds: Optional[float] = None) -> Iterator[Tracker]:
+    """
+    Track HTTP requests sent by a session in a `with` block.
+
+    :param session: a :class:`pysjtu.session.Session` or :class:`pysjtu.session.AsyncSession`.
+    :param max_requests: (optional) Maximum number of requests.
+    :param max_bytes: (optional) Maximum number of bytes sent and received.
+    :param max_seconds: (optional) Maximum seconds elapsed.
+    :raises: :exc:`pysjtu.exceptions.BudgetExceeded` when a request in the block exceeds the budget.
+    """
+    tracker = Tracker(max_requests, max_bytes, max_seconds)
+    token = _active.set(_active.get() + (tracker,))
+    session.add_hook(events.RESPONSE, tracker)
+    try:
+        yield tracker
+    finally:
+        session.remove_hook(events.RESPONSE, tracker)
+        _active.reset(token)
+        tracker.stop()
@@ -0,0 +1,127 @@
+import warnings
+from typing import Optional
+
+import httpx
+
+from .exceptions import ProtocolWarning
+
+try:
+    import h2  # type: ignore # noqa: F401
+
+    has_h2 = True
+except ModuleNotFoundError:
+    has_h2 = False
+
+
+def _resolve_http2(http2: bool) -> bool:
+    """ Fall back to HTTP/1.1 with a warning if HTTP/2 is requested but unavailable. """
+    if http2 and not has_h2:
+        warnings.warn("HTTP/2 is unavailable because the h2 package isn't installed. Using HTTP/1.1 instead.",
+                      ProtocolWarning)
+        return False
+    return http2
+
+
+def protocol_counter(http_version: str) -> str:
+    """ Get the name of the metrics counter of responses in given HTTP version, e.g. `responses_http2`. """
+    return "responses_" + http_version.lower().replace("/", "")
+
+
+def _limits(max_connections: Optional[int], max_keepalive_connections: Optional[int],
+            keepalive_expiry: Optional[float], limits: Optional[httpx.Limits]) -> httpx.Limits:
+    if limits is not None:
+        return limits
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections,
+                        keepalive_expiry=keepalive_expiry)
+
+
+class SharedTransport(httpx.BaseTransport):
+    """
+    A connection pool to be shared by multiple :class:`pysjtu.session.Session` and :class:`pysjtu.ocr.JCSSRecognizer`,
+    so that they reuse TCP connections and TLS sessions to the same hosts.
+
+    Closing a session doesn't close a shared transport. Call :meth:`shutdown` or use it as a context manager to close
+    the pooled connections when all sessions are done.
+
+    Usage::
+
+        >>> with SharedTransport(max_connections=200, keepalive_expiry=30) as transport:
+        ...     ocr = JCSSRecognizer(transport=transport)
+        ...     sessions = [Session(username=username, password=password, ocr=ocr, transport=transport)
+        ...                 for username, password in accounts]
+
+    For additional keyword arguments, see :class:`httpx.HTTPTransport`.
+
+    :param max_connections: (optional) Maximum number of connections, including idle ones.
+    :param max_keepalive_connections: (optional) Maximum number of idle connections kept alive.
+    :param keepalive_expiry: (optional) Seconds after which an idle connection is closed.
+    :param http2: Whether to enable HTTP/2. Connections fall back to HTTP/1.1 if the server doesn't support it, or
+        the `h2` package isn't installed.
+    :param transport: (optional) A transport to be shared instead of creating a new connection pool.
+    """
+
+    def __init__(self, max_connections: Optional[int] = 100, max_keepalive_connections: Optional[int] = 20,
+                 keepalive_expiry: Optional[float] = 5.0, http2: bool = False,
+                 transport: Optional[httpx.BaseTransport] = None, **kwargs):
+        if transport is None:
+            limits = _limits(max_connections, max_keepalive_connections, keepalive_expiry, kwargs.pop("limits", None))
+            transport = httpx.HTTPTransport(limits=limits, http2=_resolve_http2(http2), **kwargs)
+        self._transport = transport
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        self.shutdown()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._transport.handle_request(request)
+
+    def close(self):
+        """ Called when a client using this transport is closed. Pooled connections are kept open. """
+
+    def shutdown(self):
+        """ Close all pooled connections. """
+        self._transport.close()
+
+
+class AsyncSharedTransport(httpx.AsyncBaseTransport):
+    """
+    A connection pool to be shared by multiple :class:`pysjtu.session.AsyncSession`.
+
+    It shares the same semantics with :class:`SharedTransport`. Call :meth:`shutdown` or use it as an async context
+    manager to close the pooled connections when all sessions are done.
+
+    For additional keyword arguments, see :class:`httpx.AsyncHTTPTransport`.
+
+    :param max_connections: (optional) Maximum number of connections, including idle ones.
+    :param max_keepalive_connections: (optional) Maximum number of idle connections kept alive.
+    :param keepalive_expiry: (optional) Seconds after which an idle connection is closed.
+    :param http2: Whether to enable HTTP/2. Connections fall back to HTTP/1.1 if the server doesn't support it, or
+        the `h2` package isn't installed.
+    :param transport: (optional) A transport to be shared instead of creating a new connection pool.
+    """
+
+    def __init__(self, max_connections: Optional[int] = 100, max_keepalive_connections: Optional[int] = 20,
+                 keepalive_expiry: Optional[float] = 5.0, http2: bool = False,
+                 transport: Optional[httpx.AsyncBaseTransport] = None, **kwargs):
+        if transport is None:
+            limits = _limits(max_connections, max_keepalive_connections, keepalive_expiry, kwargs.pop("limits", None))
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=_resolve_http2(http2), **kwargs)
+        self._transport = transport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None):
+        await self.shutdown()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        """ Called when a client using this transport is closed. Pooled connections are kept open. """
+
+    async def shutdown(self):
+        """ Close all pooled connections. """
+        await self._transport.aclose()
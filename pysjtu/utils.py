@@ -1,5 +1,7 @@
+import asyncio
 import base64
 import collections
+import functools
 import inspect
 from math import inf
 from pathlib import Path
@@ -63,10 +65,11 @@ def replace_keys(data, pairs):
 
 
 def schema_post_loader(schema_ref, data):
+    from pysjtu.compiled import get_loader  # pysjtu.schema depends on this module
     if isinstance(data, list):
-        return schema_ref(many=True).load(data)
+        return get_loader(schema_ref, many=True).load(data)
     if isinstance(data, dict):
-        return schema_ref().load(data)
+        return get_loader(schema_ref).load(data)
     raise TypeError
 
 
@@ -119,3 +122,33 @@ def forward_method_args(template):
         return target
 
     return apply_signature
+
+
+def async_lru_cache(maxsize: int = 128):
+    """
+    A :func:`functools.lru_cache` counterpart for coroutine functions.
+
+    Calls are cached as tasks, so a cached result can be awaited more than once, and concurrent callers with the same
+    arguments share one call. Failed or cancelled calls are not cached.
+    """
+
+    def decorator(func):
+        cache: collections.OrderedDict = collections.OrderedDict()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            task = cache.get(key)
+            if task is not None and not (task.done() and (task.cancelled() or task.exception() is not None)):
+                cache.move_to_end(key)
+                return task
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            cache[key] = task
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return task
+
+        wrapper.cache_clear = cache.clear  # type: ignore
+        return wrapper
+
+    return decorator
@@ -0,0 +1,42 @@
+class ValidationPolicy:
+    """
+    A policy deciding how a :class:`pysjtu.session.Session` validates new cookies.
+
+    Every response is checked for session expiry, i.e. a redirection to the login page, which costs a comparison of its
+    URL. What may be skipped is validating new cookies (set, or loaded from a session file), which takes two extra
+    requests.
+
+    - ``always``: new cookies are validated with extra requests when they are set.
+    - ``trusted``: new cookies are trusted until a response proves them invalid, and the session is renewed then.
+
+    Usage::
+
+        >>> sess = pysjtu.Session(session_file="session_file", validation=ValidationPolicy.trusted())
+
+    :param mode: one of ``always`` and ``trusted``.
+    """
+    ALWAYS = "always"
+    TRUSTED = "trusted"
+
+    def __init__(self, mode: str = ALWAYS):
+        if mode not in (self.ALWAYS, self.TRUSTED):
+            raise ValueError(f"Unknown validation mode: {mode}")
+        self.mode = mode
+
+    def __repr__(self):
+        return f"<ValidationPolicy {self.mode}>"
+
+    @classmethod
+    def always(cls) -> "ValidationPolicy":
+        """ Validate new cookies with extra requests. """
+        return cls(cls.ALWAYS)
+
+    @classmethod
+    def trusted(cls) -> "ValidationPolicy":
+        """ Trust new cookies until a response proves them invalid. """
+        return cls(cls.TRUSTED)
+
+    @property
+    def trust_cookies(self) -> bool:
+        """ Whether new cookies are accepted without validation requests. """
+        return self.mode == self.TRUSTED
@@ -1,4 +1,7 @@
 import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from functools import partial
 from tempfile import NamedTemporaryFile
@@ -7,6 +10,7 @@ import httpx
 import pytest
 import respx
 
+from pysjtu import consts
 from pysjtu.client import Client, create_client
 from pysjtu.exceptions import DumpWarning, GPACalculationException, LoadWarning, LoginException, ServiceUnavailable, \
     SessionException, SelectionNotAvailableException, TimeConflictException, FullCapacityException
@@ -118,6 +122,62 @@ class TestSession:
         with pytest.raises(httpx.HTTPError):
             logged_session.get("https://i.sjtu.edu.cn/404")
 
+    def test_concurrent_renew(self, mocker, logged_session, check_login):
+        assert logged_session.metrics["logins"] == 1
+        renew = logged_session._renew
+
+        def slow_renew():
+            time.sleep(0.1)
+            renew()
+
+        mocker.patch.object(logged_session, "_renew", side_effect=slow_renew)
+        logged_session.get("https://i.sjtu.edu.cn/expire_me")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            texts = list(executor.map(
+                lambda i: logged_session.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html", params={"i": i}).text,
+                range(4)))
+        assert all("519027910001" in text for text in texts)
+        assert logged_session.metrics["renewals"] == 1
+        assert logged_session.metrics["logins"] == 2
+
+    def test_keep_alive(self, mocker, transport):
+        mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+        with Session(transport=transport, retry=[0], keep_alive=0.05) as sess:
+            sess.login("FeiLin", "WHISPERS")
+            sess.get("https://i.sjtu.edu.cn/expire_me")
+            time.sleep(0.3)
+            assert sess.metrics["renewals"] == 1
+            assert sess.metrics["keep_alives"] >= 1
+            assert "519027910001" in sess.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html",
+                                              auto_renew=False).text
+        time.sleep(0.1)
+        assert not any(thread.name == "pysjtu-keep-alive" for thread in threading.enumerate())
+
+    def test_login_pipeline(self, mocker, transport):
+        mocker.patch.object(JCSSRecognizer, "recognize", side_effect=["lorem", "ipsum"])
+        sess = Session(transport=transport, retry=[10, 10])
+        spy = mocker.spy(sess._client, "request")
+        sess.login("FeiLin", "WHISPERS")
+
+        # a misrecognized captcha is refreshed at once, without fetching the login page again or sleeping
+        timings = sess.last_login_timings
+        assert timings["attempts"] == 2
+        assert timings["total"] < 10
+        assert set(timings) == {"attempts", "page", "captcha", "ocr", "submit", "total"}
+        assert [call.kwargs["url"] for call in spy.call_args_list].count(consts.LOGIN_URL) == 1
+        assert sess.metrics.summary("login_ocr_seconds")["count"] == 1
+
+        # failing again with a refreshed captcha starts over with a new login page at once, without sleeping
+        mocker.patch.object(JCSSRecognizer, "recognize", return_value="lorem")
+        sess = Session(transport=transport, retry=[10, 10, 10])
+        spy = mocker.spy(sess._client, "request")
+        with pytest.raises(LoginException):
+            sess.login("FeiLin", "WHISPERS")
+        assert sess.last_login_timings["attempts"] == 3
+        assert sess.last_login_timings["total"] < 10
+        urls = [call.kwargs["url"] for call in spy.call_args_list]
+        assert urls.count(consts.LOGIN_URL) == 2 and urls.count(consts.CAPTCHA_URL) == 3
+
     def test_req_methods(self, logged_session):
         assert logged_session.get("https://i.sjtu.edu.cn/ping").text == "pong"
         logged_session.head("https://i.sjtu.edu.cn/ping")
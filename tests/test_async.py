@@ -0,0 +1,263 @@
+import asyncio
+import pickle
+from datetime import date
+from tempfile import NamedTemporaryFile
+
+import httpx
+import pytest
+
+from pysjtu import consts
+from pysjtu.client import AsyncClient, Client
+from pysjtu.exceptions import LoadWarning, LoginException, ServiceUnavailable, SessionException, \
+    SelectionClassFetchException, SelectionNotAvailableException, TimeConflictException
+from pysjtu.models import AsyncQueryResult, Exams, GPA, GPAQueryParams, LogicEnum, LRUPageStore, Profile, Schedule, \
+    Scores
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.session import AsyncSession as _AsyncSession
+from .mock_server import app
+
+
+class AsyncWSGITransport(httpx.AsyncBaseTransport):
+    """ Serve the WSGI mock server to an async client. """
+
+    def __init__(self, wsgi_app):
+        self._transport = httpx.WSGITransport(app=wsgi_app)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        response = self._transport.handle_request(request)
+        return httpx.Response(response.status_code, headers=response.headers, content=response.read())
+
+
+# noinspection PyPep8Naming
+def AsyncSession(*args, **kwargs):
+    return _AsyncSession(*args, **kwargs, mounts={"all://": None})
+
+
+@pytest.fixture
+def async_transport():
+    return AsyncWSGITransport(app)
+
+
+@pytest.fixture
+def run():
+    return asyncio.run
+
+
+@pytest.fixture
+def logged_async_session(mocker, async_transport, run):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    sess = AsyncSession(transport=async_transport, retry=[0], timeout=1)
+    run(sess.login("FeiLin", "WHISPERS"))
+    return sess
+
+
+async def _is_logged_in(session):
+    return "519027910001" in (await session.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html")).text
+
+
+class TestAsyncSession:
+    def test_login(self, logged_async_session, run):
+        assert run(_is_logged_in(logged_async_session))
+
+        with pytest.raises(LoginException):
+            run(logged_async_session.login("Cookie☆", "1145141919810"))
+
+    def test_login_pipeline(self, mocker, async_transport, run):
+        mocker.patch.object(JCSSRecognizer, "recognize", side_effect=["lorem", "ipsum"])
+        sess = AsyncSession(transport=async_transport, retry=[10, 10])
+        run(sess.login("FeiLin", "WHISPERS"))
+        assert sess.last_login_timings["attempts"] == 2
+        assert sess.last_login_timings["total"] < 10
+        assert sess.metrics.summary("login_submit_seconds")["count"] == 1
+
+        mocker.patch.object(JCSSRecognizer, "recognize", return_value="lorem")
+        sess = AsyncSession(transport=async_transport, retry=[10, 10, 10])
+        spy = mocker.spy(sess._client, "request")
+        with pytest.raises(LoginException):
+            run(sess.login("FeiLin", "WHISPERS"))
+        assert sess.last_login_timings["attempts"] == 3
+        assert sess.last_login_timings["total"] < 10
+        urls = [call.kwargs["url"] for call in spy.call_args_list]
+        assert urls.count(consts.LOGIN_URL) == 2 and urls.count(consts.CAPTCHA_URL) == 3
+
+    def test_lazy_login(self, mocker, async_transport, run):
+        mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+        sess = AsyncSession(transport=async_transport, username="FeiLin", password="WHISPERS", retry=[0])
+        assert run(_is_logged_in(sess))
+
+    def test_req(self, logged_async_session, run):
+        async def _test():
+            with pytest.raises(ServiceUnavailable):
+                await logged_async_session.get("https://i.sjtu.edu.cn/503")
+            with pytest.raises(httpx.HTTPError):
+                await logged_async_session.get("https://i.sjtu.edu.cn/404")
+
+            await logged_async_session.get("https://i.sjtu.edu.cn/expire_me")
+            with pytest.raises(SessionException):
+                await logged_async_session.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html", auto_renew=False)
+            assert await _is_logged_in(logged_async_session)
+
+            await logged_async_session.get("https://i.sjtu.edu.cn/expire_me")
+            await asyncio.gather(*(logged_async_session.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html",
+                                                            params={"i": i}) for i in range(4)))
+            assert logged_async_session.metrics["renewals"] == 2
+            assert logged_async_session.metrics["logins"] == 3
+
+            await logged_async_session.logout()
+            with pytest.raises(SessionException):
+                await logged_async_session.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html")
+
+        run(_test())
+
+    def test_keep_alive(self, mocker, async_transport, run):
+        mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+
+        async def _test():
+            async with AsyncSession(transport=async_transport, retry=[0], keep_alive=0.05) as sess:
+                await sess.login("FeiLin", "WHISPERS")
+                await sess.get("https://i.sjtu.edu.cn/expire_me")
+                await asyncio.sleep(0.3)
+                assert sess.metrics["renewals"] == 1
+                assert sess.metrics["keep_alives"] >= 1
+                assert await _is_logged_in(sess)
+
+        run(_test())
+
+    def test_req_methods(self, logged_async_session, run):
+        async def _test():
+            sess = logged_async_session
+            assert (await sess.get("https://i.sjtu.edu.cn/ping")).text == "pong"
+            await sess.head("https://i.sjtu.edu.cn/ping")
+            assert (await sess.post("https://i.sjtu.edu.cn/ping", content="lorem ipsum")).text == "lorem ipsum"
+            assert (await sess.patch("https://i.sjtu.edu.cn/ping")).text == "pong"
+            assert (await sess.put("https://i.sjtu.edu.cn/ping")).text == "pong"
+            assert (await sess.delete("https://i.sjtu.edu.cn/ping")).text == "pong"
+            assert "GET" in (await sess.options("https://i.sjtu.edu.cn/ping")).headers["allow"]
+
+        run(_test())
+
+    def test_loads_dumps(self, async_transport, logged_async_session, run):
+        dumps = logged_async_session.dumps()
+
+        async def _test():
+            sess = AsyncSession(transport=async_transport)
+            await sess.loads(dumps)
+            assert await _is_logged_in(sess)
+
+            sess = AsyncSession(transport=async_transport)
+            with pytest.warns(LoadWarning):
+                await sess.loads({"cookies": dumps["cookies"]})
+            assert await _is_logged_in(sess)
+
+            sess = AsyncSession(transport=async_transport)
+            with pytest.raises(SessionException):
+                await sess.set_cookies({})
+
+        run(_test())
+
+    def test_context(self, mocker, async_transport, run):
+        tmpfile = NamedTemporaryFile()
+        pickle.dump({"username": "FeiLin", "password": "WHISPERS"}, tmpfile)
+        tmpfile.seek(0)
+        mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+
+        async def _test():
+            async with AsyncSession(transport=async_transport, session_file=tmpfile.file, retry=[0]) as sess:
+                assert await _is_logged_in(sess)
+
+        run(_test())
+        tmpfile.seek(0)
+        assert pickle.load(tmpfile)["cookies"]
+
+
+@pytest.fixture
+def logged_async_client(logged_async_session):
+    return AsyncClient(logged_async_session)
+
+
+class TestAsyncClient:
+    def test_init(self, logged_async_session):
+        with pytest.raises(TypeError):
+            AsyncClient(0)
+        with pytest.raises(TypeError):
+            Client(logged_async_session)
+
+    def test_properties(self, logged_async_client, run):
+        async def _test():
+            assert await logged_async_client.student_id == 519027910001
+            assert await logged_async_client.term_start_date == date(2019, 9, 9)
+            assert isinstance(await logged_async_client.default_gpa_query_params, GPAQueryParams)
+            assert isinstance(await logged_async_client.profile, Profile)
+
+        run(_test())
+
+    def test_queries(self, logged_async_client, run):
+        async def _test():
+            schedule, score, exam = await asyncio.gather(logged_async_client.schedule(2019, 0),
+                                                         logged_async_client.score(2019, 0),
+                                                         logged_async_client.exam(2019, 0))
+            assert isinstance(schedule, Schedule) and len(schedule) == 3
+            assert isinstance(score, Scores) and len(score) == 3
+            assert isinstance(exam, Exams) and len(exam) == 3
+            assert len(await score[0].detail) == 2
+            assert len(await score[0].detail) == 2
+
+        run(_test())
+
+    def test_course(self, logged_async_client, run):
+        async def _test():
+            courses = await logged_async_client.query_courses(2019, 0, name="高等数学", page_size=40)
+            assert isinstance(courses, AsyncQueryResult)
+            assert await courses.length() == 90
+            assert len([course async for course in courses]) == 90
+            assert (await courses[0]).name == (await courses[0:1])[0].name
+            with pytest.raises(IndexError):
+                await courses[90]
+
+            courses = await logged_async_client.query_courses(2019, 0, name="高等数学", page_size=40,
+                                                              max_in_flight=3, read_ahead=2)
+            assert len(await courses[:]) == 90
+            courses = await logged_async_client.query_courses(2019, 0, name="高等数学", page_size=40, read_ahead=2)
+            assert len([course async for course in courses]) == 90
+            courses = await logged_async_client.query_courses(2019, 0, name="高等数学", page_size=40,
+                                                              max_in_flight=3, page_store=LRUPageStore(max_pages=1))
+            assert [course.name for course in await courses[0:90]] == [course.name async for course in courses]
+
+        run(_test())
+
+    def test_gpa(self, logged_async_client, run):
+        async def _test():
+            params = await logged_async_client.default_gpa_query_params
+            params.condition_logic = LogicEnum.OR
+            assert isinstance(await logged_async_client.gpa(params), GPA)
+
+        run(_test())
+
+    def test_selection(self, logged_async_client, run):
+        async def _test():
+            client = logged_async_client
+            with pytest.raises(SelectionNotAvailableException):
+                await client.course_selection_sectors
+            await client._session.get("/test_selection")
+            sectors = await client.course_selection_sectors
+            assert len(sectors) == 6
+
+            classes = await sectors[0].classes
+            await sectors[0].classes
+            assert (await client._session.get("get_session?key=query_courses")).text == "1"
+
+            _class = classes[0]
+            with pytest.raises(SelectionClassFetchException):
+                _ = _class.register_id
+            with pytest.raises(TimeConflictException):
+                await _class.register()
+            await client._session.get("test_no_conflict")
+            await client._session.get("test_no_full")
+            await _class.register()
+            assert await _class.is_registered() is True
+            await _class.drop()
+            assert await _class.is_registered() is False
+            assert (await client._session.get("get_session?key=query_classes")).text == "1"
+
+        run(_test())
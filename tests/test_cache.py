@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from pysjtu import consts, session as session_module
+from pysjtu.cache import ResponseCache
+from pysjtu.client import AsyncClient, Client
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.session import AsyncSession, Session as _Session
+from .mock_server import app
+from .test_async import AsyncWSGITransport
+
+
+# noinspection PyPep8Naming
+def Session(*args, **kwargs):
+    return _Session(*args, **kwargs, mounts={"all://": None})
+
+
+@pytest.fixture
+def transport():
+    return httpx.WSGITransport(app=app)
+
+
+@pytest.fixture
+def cached_session(mocker, transport, tmp_path):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+
+    def _cached_session(**kwargs):
+        sess = Session(transport=transport, retry=[0], timeout=1,
+                       cache=ResponseCache(tmp_path / "cache.db", **kwargs))
+        sess.login("FeiLin", "WHISPERS")
+        return sess
+
+    return _cached_session
+
+
+def test_response_cache(cached_session, mocker):
+    sess = cached_session()
+    spy = mocker.spy(sess._client, "request")
+    client = Client(sess)
+
+    assert len(client.score(2019, 0)) == 3
+    calls = spy.call_count
+    assert len(client.score(2019, 0)) == 3
+    assert spy.call_count == calls
+    assert sess._response_cache.hits == 1
+    assert sess.metrics.cache_hit_ratio == 0.5
+
+    # the cache file can be shared by another session
+    sess_2 = cached_session()
+    spy_2 = mocker.spy(sess_2._client, "request")
+    assert len(Client(sess_2).score(2019, 0)) == 3
+    assert spy_2.call_count == 0
+
+    # coalescing and caching share one fingerprint of the request
+    fingerprint = mocker.spy(session_module, "request_fingerprint")
+    assert len(client.score(2019, 0)) == 3
+    assert fingerprint.call_count == 1
+
+    # non-cacheable endpoints always go to the network
+    sess.get(consts.HOME_URL)
+    sess.get(consts.HOME_URL)
+    assert spy.call_count == calls + 2
+
+
+def test_response_cache_ttl(cached_session, mocker):
+    sess = cached_session(ttls={consts.SCORE_URL: 0.1})
+    client = Client(sess)
+    client.score(2019, 0)
+    assert len(sess._response_cache) == 1
+    client.exam(2019, 0)
+    assert len(sess._response_cache) == 1
+
+    time.sleep(0.1)
+    spy = mocker.spy(sess._client, "request")
+    client.score(2019, 0)
+    assert spy.call_count == 1
+
+
+def test_response_cache_eviction(cached_session):
+    sess = cached_session(max_size=1)
+    client = Client(sess)
+    client.score(2019, 0)
+    assert len(sess._response_cache) == 0
+
+    sess._response_cache.max_size = 1024 * 1024
+    client.score(2019, 0)
+    client.exam(2019, 0)
+    assert len(sess._response_cache) == 2
+    sess._response_cache.clear()
+    assert len(sess._response_cache) == 0
+
+
+def test_async_response_cache(mocker, tmp_path):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    threads = set()
+
+    def in_thread(method):
+        def _method(*args, **kwargs):
+            threads.add(threading.get_ident())
+            return method(*args, **kwargs)
+        return _method
+
+    mocker.patch.object(ResponseCache, "get", in_thread(ResponseCache.get))
+    mocker.patch.object(ResponseCache, "set", in_thread(ResponseCache.set))
+
+    async def _test():
+        sess = AsyncSession(transport=AsyncWSGITransport(app), retry=[0], mounts={"all://": None},
+                            cache=ResponseCache(tmp_path / "cache.db"))
+        await sess.login("FeiLin", "WHISPERS")
+        client = AsyncClient(sess)
+        assert len(await client.score(2019, 0)) == 3
+        assert len(await client.score(2019, 0)) == 3
+        assert sess._response_cache.hits == 1
+        return threading.get_ident()
+
+    # the cache is never touched by the thread running the event loop
+    loop_thread = asyncio.run(_test())
+    assert threads and loop_thread not in threads
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from pysjtu.circuit import CircuitBreaker
+from pysjtu.exceptions import CircuitOpenException, ServiceUnavailable
+from pysjtu.session import AsyncSession, Session
+
+
+class Backend:
+    """ A mock backend which can be switched down. """
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+
+    def __call__(self, request):
+        self.calls += 1
+        return httpx.Response(503 if self.down else 200, text="pong")
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_rate=0.5, min_requests=4, reset_timeout=0.1)
+    for failed in (False, True, False):
+        generation = breaker.allow("host")
+        assert generation is not None
+        breaker.record("host", failed, generation)
+    assert breaker.state("host") == CircuitBreaker.CLOSED
+    breaker.record("host", True, generation)
+    assert breaker.state("host") == CircuitBreaker.OPEN
+    assert breaker.allow("host") is None
+    assert breaker.allow("another.host") is not None
+
+    time.sleep(0.1)
+    assert breaker.state("host") == CircuitBreaker.HALF_OPEN
+    probe = breaker.allow("host")
+    assert probe is not None
+    assert breaker.allow("host") is None  # only one probe at a time
+    breaker.record("host", True, probe)
+    assert breaker.state("host") == CircuitBreaker.OPEN
+
+    time.sleep(0.1)
+    probe = breaker.allow("host")
+    breaker.discard("host", probe)
+    probe = breaker.allow("host")
+    assert probe is not None
+    breaker.record("host", False, probe)
+    assert breaker.state("host") == CircuitBreaker.CLOSED
+
+    assert CircuitBreaker.shared() is CircuitBreaker.shared()
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_rate=0)
+
+
+def test_circuit_breaker_stale_outcomes():
+    breaker = CircuitBreaker(failure_rate=0.5, min_requests=1, reset_timeout=0.1)
+    slow = breaker.allow("host")  # a slow request sent while the circuit is closed
+    breaker.record("host", True, breaker.allow("host"))
+    assert breaker.state("host") == CircuitBreaker.OPEN
+
+    time.sleep(0.1)
+    probe = breaker.allow("host")
+    # outcomes of requests allowed before the circuit opened don't decide the probe
+    breaker.record("host", False, slow)
+    breaker.discard("host", slow)
+    assert breaker.state("host") == CircuitBreaker.HALF_OPEN
+    assert breaker.allow("host") is None
+    breaker.record("host", False, probe)
+    assert breaker.state("host") == CircuitBreaker.CLOSED
+
+    # nor do they count as failures once the circuit is closed again
+    breaker.record("host", True, slow)
+    breaker.record("host", True, probe)
+    assert breaker.state("host") == CircuitBreaker.CLOSED
+
+
+def test_session_circuit_breaker():
+    backend = Backend()
+    breaker = CircuitBreaker(min_requests=2, reset_timeout=0.1)
+    sess = Session(transport=httpx.MockTransport(backend), circuit_breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable):
+            sess.get("/ping", validate_session=False)
+
+    # the circuit is shared by sessions using the same breaker
+    sess_2 = Session(transport=httpx.MockTransport(backend), circuit_breaker=breaker)
+    with pytest.raises(CircuitOpenException):
+        sess_2.get("/ping", validate_session=False)
+    assert backend.calls == 2
+    assert sess_2.metrics["circuit_rejections"] == 1
+
+    backend.down = False
+    time.sleep(0.1)
+    assert sess.get("/ping", validate_session=False).text == "pong"
+    assert breaker.state("i.sjtu.edu.cn") == CircuitBreaker.CLOSED
+
+
+def test_async_session_circuit_breaker():
+    async def _test():
+        backend = Backend()
+        sess = AsyncSession(transport=httpx.MockTransport(backend),
+                            circuit_breaker=CircuitBreaker(min_requests=1))
+        with pytest.raises(ServiceUnavailable):
+            await sess.get("/ping", validate_session=False)
+        with pytest.raises(CircuitOpenException):
+            await sess.get("/ping", validate_session=False)
+        assert backend.calls == 1
+
+    asyncio.run(_test())
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from pysjtu import events
+from pysjtu.events import Event
+from pysjtu.metrics import Metrics
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.session import AsyncSession, Session
+from .mock_server import app
+from .test_async import AsyncWSGITransport
+
+
+class PingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "4")
+        self.end_headers()
+        self.wfile.write(b"pong")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ping_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_metrics_export():
+    metrics = Metrics(buckets=(0.1, 1))
+    metrics.incr("responses_http1.1")
+    metrics.incr("cache_hits", 3)
+    metrics.incr("cache_misses")
+    metrics.record(Event("response", 0.05, "/ping", {"bytes_sent": 10, "bytes_received": 100}))
+    metrics.record(Event("response", 0.5, "/ping"))
+    metrics.observe("login_seconds", 2)
+
+    summary = metrics.summary("response_seconds", endpoint="/ping")
+    assert summary["count"] == 2
+    assert summary["buckets"] == {0.1: 1, 1: 2, float("inf"): 2}
+    assert metrics.summary("response_seconds") == {}
+    assert metrics["bytes_received"] == 100
+    assert metrics.cache_hit_ratio == 0.75
+
+    text = metrics.to_prometheus()
+    assert "# TYPE pysjtu_responses_http1_1 counter\npysjtu_responses_http1_1 1\n" in text
+    assert "# TYPE pysjtu_response_seconds histogram\n" in text
+    assert 'pysjtu_response_seconds_bucket{endpoint="/ping",le="0.1"} 1\n' in text
+    assert 'pysjtu_response_seconds_bucket{endpoint="/ping",le="+Inf"} 2\n' in text
+    assert 'pysjtu_response_seconds_count{endpoint="/ping"} 2\n' in text
+    assert 'pysjtu_login_seconds_bucket{le="+Inf"} 1\n' in text
+    assert "pysjtu_cache_hit_ratio 0.75\n" in text
+
+    exported = json.loads(metrics.to_json())
+    assert exported["counters"]["bytes_sent"] == 10
+    assert exported["summaries"]["response_seconds"]["/ping"]["buckets"]["inf"] == 2
+    assert exported["cache_hit_ratio"] == 0.75
+
+
+def test_session_events(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    received = []
+    sess = Session(transport=httpx.WSGITransport(app=app), retry=[0], mounts={"all://": None},
+                   hooks={events.ALL: [received.append]})
+    sess.login("FeiLin", "WHISPERS")
+    names = [event.name for event in received]
+    assert names.count(events.LOGIN) == 1
+    assert names.count(events.OCR) == 1
+    assert events.RESPONSE in names
+
+    responses = []
+    sess.add_hook(events.RESPONSE, responses.append)
+    sess.get("https://i.sjtu.edu.cn/expire_me")
+    sess.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html")
+    assert events.RENEW in [event.name for event in received]
+    event = responses[-1]
+    assert event.endpoint == "/xtgl/index_initMenu.html"
+    assert event.info["status"] == 200
+    assert event.info["bytes_received"] > 0
+    assert sess.metrics.summary("response_seconds", endpoint="/xtgl/index_initMenu.html")["count"] >= 2
+    assert sess.metrics.summary("renew_seconds")["count"] == 1
+    assert sess.metrics["bytes_received"] > 0
+
+
+def test_trace_events(ping_server):
+    received = []
+    sess = Session(hooks={events.ALL: [received.append]})
+    sess.get(ping_server + "/ping", validate_session=False)
+    sess.get(ping_server + "/ping", validate_session=False)
+    names = [event.name for event in received]
+    # the connection is reused
+    assert names == [events.CONNECT, events.REQUEST, events.RESPONSE, events.REQUEST, events.RESPONSE]
+    assert all(event.endpoint == "/ping" for event in received)
+    assert sess.metrics.summary("connect_seconds", endpoint="/ping")["count"] == 1
+
+    async def _test():
+        received.clear()
+        async_sess = AsyncSession(hooks={events.ALL: [received.append]})
+        await async_sess.get(ping_server + "/ping", validate_session=False)
+        assert [event.name for event in received] == [events.CONNECT, events.REQUEST, events.RESPONSE]
+
+    asyncio.run(_test())
+
+
+def test_async_session_events(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+
+    async def _test():
+        received = []
+        sess = AsyncSession(transport=AsyncWSGITransport(app), retry=[0], mounts={"all://": None})
+        sess.add_hook(events.LOGIN, received.append)
+        await sess.login("FeiLin", "WHISPERS")
+        assert [event.info["attempts"] for event in received] == [1]
+        assert sess.metrics.summary("ocr_seconds")["count"] == 1
+
+    asyncio.run(_test())
@@ -0,0 +1,30 @@
+import httpx
+
+from pysjtu.fingerprint import canonical_request, request_fingerprint
+from pysjtu.session import Session
+
+
+def test_request_fingerprint():
+    def build(method="POST", url="https://i.sjtu.edu.cn/test?b=1&a=2", **kwargs):
+        return httpx.Request(method, url, **kwargs)
+
+    fp = request_fingerprint(build(data={"x": 1, "nd": 1}))
+    assert fp == request_fingerprint(build(data={"nd": 2, "x": 1}))
+    assert fp == request_fingerprint(build(url="https://i.sjtu.edu.cn/test?a=2&b=1", data={"x": 1}))
+    assert fp != request_fingerprint(build(url="https://i.sjtu.edu.cn/test?a=2&b=1&t=3", data={"x": 1}))
+    assert fp != request_fingerprint(build(data={"x": 1, "_": 4}))
+    assert fp != request_fingerprint(build(data={"x": 2, "nd": 1}))
+    assert fp != request_fingerprint(build(method="PUT", data={"x": 1, "nd": 1}))
+    assert fp != request_fingerprint(build(data={"x": 1, "nd": 1}), scope="FeiLin")
+
+    assert request_fingerprint(build(json={"a": 1, "b": 2})) == request_fingerprint(build(json={"b": 2, "a": 1}))
+    assert request_fingerprint(build(content=b"1")) != request_fingerprint(build(content=b"2"))
+    assert canonical_request(build("GET", "HTTPS://I.SJTU.EDU.CN/test?nd=1")) == \
+           canonical_request(build("GET", "https://i.sjtu.edu.cn:443/test"))
+
+
+def test_session_fingerprint():
+    sess = Session()
+    assert sess.fingerprint("GET", "/test", params={"a": 1, "nd": 1}) == \
+           sess.fingerprint("GET", "https://i.sjtu.edu.cn/test?a=1", timeout=5)
+    assert sess.fingerprint("GET", "/test") != Session(base_url="https://kbcx.sjtu.edu.cn").fingerprint("GET", "/test")
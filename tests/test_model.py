@@ -1,3 +1,5 @@
+import threading
+import time as _time
 from datetime import date, time
 from functools import partial
 from math import ceil
@@ -5,7 +7,8 @@ from math import ceil
 import pytest
 
 from pysjtu.models import QueryResult, GPAQueryParams, GPA, LibCourse, Exam, ScoreFactor, Score, ScheduleCourse, \
-    Exams, Scores, Schedule, LazyResult, _PARTIAL, SelectionClass, SelectionSector
+    Exams, Scores, Schedule, LazyResult, _PARTIAL, SelectionClass, SelectionSector, PageStore, \
+    LRUPageStore
 
 
 @pytest.fixture
@@ -68,6 +71,8 @@ def test_query_result(dummy_req):
     assert result[185:999] == result[185:]
     assert result[204:209] == {"post": []}
     assert result[-1:999] == {"post": [200]}
+    assert result[10:0:-3] == {"post": [11, 8, 5, 2]}
+    assert result[::50] == {"post": [1, 51, 101, 151]}
     assert list(result) == [{"post": item} for item in range(1, 201)]
     with pytest.raises(AttributeError):
         result[1.5:]
@@ -85,6 +90,150 @@ def test_query_result(dummy_req):
     assert dummy_obj.is_called
 
 
+# noinspection PyStatementEffect
+def test_query_result_concurrent(dummy_req):
+    lock = threading.Lock()
+    pages = []
+    in_flight = [0, 0]
+
+    def tracked_req(total, data):
+        with lock:
+            pages.append(data["queryModel.currentPage"])
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        _time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return dummy_req(total, data)
+
+    result = QueryResult(partial(tracked_req, 200), list, {"validate": "Lorem Ipsum"}, page_size=10,
+                         max_in_flight=4)
+    pages.clear()
+    assert result[:] == list(range(1, 201))
+    assert sorted(pages) == list(range(1, 21))
+    assert 1 < in_flight[1] <= 4
+
+    result = QueryResult(partial(tracked_req, 200), lambda x: x, {"validate": "Lorem Ipsum"}, page_size=10,
+                         max_in_flight=2, read_ahead=3)
+    pages.clear()
+    assert list(result) == list(range(1, 201))
+    assert sorted(pages) == list(range(1, 21))
+
+    with pytest.raises(ValueError):
+        QueryResult(partial(tracked_req, 200), list, {"validate": "Lorem Ipsum"}, max_in_flight=0)
+
+
+def test_query_result_bulk():
+    requests = []
+
+    def capped_req(total, cap, data):
+        count = data["queryModel.showCount"]
+        page = data["queryModel.currentPage"]
+        requests.append((page, count))
+        start = count * (page - 1)
+        items = list(range(start + 1, min(start + min(count, cap), total) + 1))
+        return DummyResp({"totalResult": total, "items": items})
+
+    class DummyResp:
+        def __init__(self, resp):
+            self._resp = resp
+
+        def json(self):
+            return self._resp
+
+    result = QueryResult(partial(capped_req, 200, 50), lambda x: x, {}, bulk=True)
+    assert requests == [(1, QueryResult.BULK_PAGE_SIZE)]
+    assert len(result) == 200
+    assert list(result) == list(range(1, 201))
+    assert requests[1:] == [(2, 50), (3, 50), (4, 50)]
+
+    requests.clear()
+    result = QueryResult(partial(capped_req, 120, 5000), lambda x: x, {}, bulk=True)
+    assert result[:] == list(range(1, 121))
+    assert len(requests) == 1
+
+    requests.clear()
+    result.flush_cache()
+    assert result[-1] == 120
+    assert len(requests) == 1
+
+
+def test_page_store():
+    store = PageStore()
+    assert store.missing(0, 30) == [(0, 30)]
+    store.put(10, list(range(10, 20)))
+    store.put(25, list(range(25, 30)))
+    assert len(store) == 2
+    assert store.missing(0, 30) == [(0, 10), (20, 25)]
+    assert store.missing(12, 18) == []
+    assert 15 in store and 20 not in store
+    assert store.get(19) == 19
+    with pytest.raises(KeyError):
+        store.get(20)
+    with pytest.raises(KeyError):
+        store.items(15, 26)
+
+    store.put(15, ["a"] * 12)
+    assert len(store) == 3
+    assert store.items(10, 30) == list(range(10, 15)) + ["a"] * 12 + list(range(27, 30))
+    assert store.missing(0, 40) == [(0, 10), (30, 40)]
+
+    store.clear()
+    assert len(store) == 0 and 15 not in store
+
+
+def test_lru_page_store(dummy_req):
+    store = LRUPageStore(max_pages=2)
+    store.put(0, [0, 1])
+    store.put(2, [2, 3])
+    assert store.get(0) == 0
+    store.put(4, [4, 5])
+    assert store.evictions == 1
+    assert 0 in store and 2 not in store and 4 in store
+    assert (store.hits, store.misses) == (1, 0)
+    assert store.run(2, 4) == []
+    assert store.misses == 1
+
+    store = LRUPageStore(max_bytes=1)
+    store.put(0, [{"key": "value"}])
+    assert store.size > 1 and len(store) == 1
+    store.put(1, [{"key": "value"}])
+    assert len(store) == 1 and 1 in store
+    with pytest.raises(ValueError):
+        LRUPageStore(max_pages=0)
+
+    store = LRUPageStore(max_pages=3)
+    result = QueryResult(partial(dummy_req, 200), lambda x: x, {"validate": "Lorem Ipsum"}, page_size=10,
+                         page_store=store)
+    assert result.page_store is store
+    assert list(result) == list(range(1, 201))
+    assert len(store) == 3 and store.evictions == 17
+    assert dummy_req.is_called
+    assert result[195:] == list(range(196, 201))
+    assert not dummy_req.is_called
+    assert result[:25] == list(range(1, 26))
+    assert dummy_req.is_called
+    assert len(store) == 3 and store.evictions == 20
+
+
+def test_lru_page_store_concurrent(dummy_req):
+    pages = []
+
+    def tracked_req(total, data):
+        pages.append(data["queryModel.currentPage"])
+        return dummy_req(total, data)
+
+    # a slice spanning more pages than the store holds
+    result = QueryResult(partial(tracked_req, 200), list, {"validate": "Lorem Ipsum"}, page_size=10,
+                         max_in_flight=4, page_store=LRUPageStore(max_pages=2))
+    assert len(result) == 200
+    pages.clear()
+    assert result[0:200] == list(range(1, 201))
+    # each page is fetched at most twice: once concurrently, and once more if evicted before being read
+    assert sorted(set(pages)) == list(range(1, 21))
+    assert len(pages) <= 40
+
+
 def test_lazy_model(mocker):
     class DummyModel(LazyResult):
         def __repr__(self):
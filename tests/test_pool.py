@@ -0,0 +1,82 @@
+import asyncio
+from tempfile import NamedTemporaryFile
+
+import httpx
+import pytest
+
+from pysjtu.exceptions import LoginException, SessionException
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.pool import AsyncSessionPool, SessionPool
+from .mock_server import app
+from .test_async import AsyncWSGITransport
+
+ACCOUNTS = {"FeiLin": "WHISPERS", "Cookie☆": "1145141919810"}
+
+
+async def _is_logged_in(session):
+    return "519027910001" in (await session.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html")).text
+
+
+@pytest.fixture(autouse=True)
+def ocr(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    mocker.patch.object(JCSSRecognizer, "arecognize", return_value="ipsum")
+
+
+def test_session_pool():
+    store = NamedTemporaryFile()
+    transport = httpx.WSGITransport(app=app)
+    pool = SessionPool(ACCOUNTS, max_concurrency=2, store=store.file, transport=transport, retry=[0],
+                       mounts={"all://": None})
+    with pytest.raises(SessionException):
+        with pool.lease():
+            pass
+
+    failures = pool.login()
+    assert list(failures) == ["Cookie☆"]
+    assert isinstance(failures["Cookie☆"], LoginException)
+    assert len(pool) == 1
+    assert pool["FeiLin"]._ocr is pool._ocr
+    assert pool.metrics["logins"] == 1
+    assert pool.metrics["pool_login_failures"] == 1
+
+    with pool.lease() as sess:
+        assert "519027910001" in sess.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html").text
+        with pytest.raises(TimeoutError):
+            with pool.lease(timeout=0.01):
+                pass
+    with pool.lease(timeout=0.01) as sess_2:
+        assert sess_2 is sess
+
+    # closing a session leaves the shared connection pool open
+    pool.save()
+    pool.close()
+    store.seek(0)
+
+    # valid cookies in store are reused without logging in
+    with SessionPool({"FeiLin": "WHISPERS"}, store=store.file, transport=transport,
+                     mounts={"all://": None}) as pool_2:
+        assert not pool_2.login()
+        assert pool_2.metrics["logins"] == 0
+        with pool_2.lease() as sess:
+            assert "519027910001" in sess.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html").text
+
+
+def test_async_session_pool():
+    async def _test():
+        async with AsyncSessionPool(ACCOUNTS, max_concurrency=2, transport=AsyncWSGITransport(app), retry=[0],
+                                    mounts={"all://": None}) as pool:
+            # captchas are recognized with the shared transport too
+            assert pool._ocr.async_client._transport is pool._transport
+            failures = await pool.login()
+            assert list(failures) == ["Cookie☆"]
+            assert pool.metrics["logins"] == 1
+            async with pool.lease() as sess:
+                assert await _is_logged_in(sess)
+                with pytest.raises(TimeoutError):
+                    async with pool.lease(timeout=0.01):
+                        pass
+            async with pool.lease(timeout=0.01) as sess_2:
+                assert sess_2 is sess
+
+    asyncio.run(_test())
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from pysjtu import consts
+from pysjtu.ratelimit import RateLimiter, TokenBucket
+from pysjtu.session import AsyncSession, Session
+
+
+@pytest.fixture
+def transport():
+    return httpx.MockTransport(lambda request: httpx.Response(200, text="pong"))
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+    time.sleep(0.3)
+    assert bucket.reserve() == pytest.approx(0, abs=0.01)
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        RateLimiter(rate=1, burst=0)
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=10, endpoints={consts.SCORE_URL: (1, 1)})
+    assert limiter.reserve(httpx.URL("https://i.sjtu.edu.cn/ping")) == 0
+    assert limiter.reserve(httpx.URL("https://jaccount.sjtu.edu.cn/ping")) == 0  # buckets are per host
+    assert limiter.reserve(httpx.URL("https://i.sjtu.edu.cn/ping")) > 0
+
+    limiter = RateLimiter(rate=10, burst=5, endpoints={consts.SCORE_URL: (1, 1)})
+    score_url = httpx.URL("https://i.sjtu.edu.cn").join(consts.SCORE_URL)
+    assert limiter.reserve(score_url) == 0
+    assert limiter.reserve(score_url) == pytest.approx(1, abs=0.01)
+    assert limiter.reserve(httpx.URL("https://i.sjtu.edu.cn/ping")) == 0
+
+
+def test_session_rate_limit(transport):
+    limiter = RateLimiter(rate=50, burst=2)
+    sessions = [Session(transport=transport, rate_limiter=limiter) for _ in range(2)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda i: sessions[i % 2].get("/ping", validate_session=False), range(6)))
+    # 2 requests in burst, 4 more at 50 requests per second
+    assert time.perf_counter() - start >= 0.07
+    summaries = [sess.metrics.summary("rate_limit_wait_seconds") for sess in sessions]
+    assert sum(summary["count"] for summary in summaries) == 6
+    assert max(summary["max"] for summary in summaries) >= 0.07
+
+
+def test_async_session_rate_limit(transport):
+    async def _test():
+        sess = AsyncSession(transport=transport, rate_limiter=RateLimiter(rate=50))
+        start = time.perf_counter()
+        await asyncio.gather(*(sess.get("/ping", validate_session=False, params={"i": i}) for i in range(4)))
+        assert time.perf_counter() - start >= 0.05
+        assert sess.metrics.summary("rate_limit_wait_seconds")["count"] == 4
+
+    asyncio.run(_test())
@@ -0,0 +1,88 @@
+import asyncio
+import gzip
+import time
+
+import httpx
+import pytest
+
+from pysjtu.client import AsyncClient, Client
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.replay import RecordingTransport, ReplayTransport
+from pysjtu.session import AsyncSession, Session
+from .mock_server import app
+from .test_async import AsyncWSGITransport
+
+
+@pytest.fixture
+def archive(mocker, tmp_path):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    path = tmp_path / "traffic.json.gz"
+    recorder = RecordingTransport(path, httpx.WSGITransport(app=app))
+    with Session(username="FeiLin", password="WHISPERS", transport=recorder, retry=[0], mounts={"all://": None}) as s:
+        client = Client(s)
+        client.score(2019, 0)
+        client.schedule(2019, 0)
+    assert len(recorder) > 0
+    return path
+
+
+def test_record(archive):
+    with gzip.open(archive, "rt") as f:
+        raw = f.read()
+    assert "WHISPERS" not in raw
+    assert "ipsum" not in raw  # captcha answer
+    assert "JSESSIONID" not in raw
+    assert "nd=" not in raw
+
+
+def test_replay(archive):
+    transport = ReplayTransport(archive)
+    sess = Session(username="someone", password="something_secret", transport=transport, retry=[0],
+                   mounts={"all://": None})
+    client = Client(sess)
+    assert client.student_id == 519027910001
+    assert len(client.score(2019, 0)) == 3
+    assert client.schedule(2019, 0)
+
+    with pytest.raises(LookupError):
+        client.exam(2019, 0)
+
+    transport.latency = 0.05
+    start = time.perf_counter()
+    client.score(2019, 0)
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_async_replay(archive):
+    async def _test():
+        sess = AsyncSession(username="someone", password="something_secret", transport=ReplayTransport(archive),
+                            retry=[0], mounts={"all://": None})
+        client = AsyncClient(sess)
+        assert len(await client.score(2019, 0)) == 3
+
+        recorder = RecordingTransport(archive.with_name("async.json.gz"), AsyncWSGITransport(app))
+        sess = AsyncSession(transport=recorder, mounts={"all://": None})
+        await sess.get("https://i.sjtu.edu.cn/ping", validate_session=False)
+        await sess.aclose()
+        replayed = AsyncSession(transport=ReplayTransport(archive.with_name("async.json.gz"), recorded_latency=True),
+                                mounts={"all://": None})
+        assert (await replayed.get("https://i.sjtu.edu.cn/ping", validate_session=False)).text == "pong"
+
+    asyncio.run(_test())
+
+
+def test_record_compressed(tmp_path):
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Encoding": "gzip", "Set-Cookie": "JSESSIONID=1"},
+                              content=gzip.compress(b"pong"))
+
+    path = tmp_path / "compressed.json.gz"
+    recorder = RecordingTransport(path, httpx.MockTransport(handler))
+    with Session(transport=recorder, mounts={"all://": None}) as s:
+        resp = s.get("https://i.sjtu.edu.cn/ping", validate_session=False)
+        assert resp.text == "pong"
+        assert "content-encoding" not in resp.headers
+        assert s._client.cookies["JSESSIONID"] == "1"
+
+    replayed = Session(transport=ReplayTransport(path), mounts={"all://": None})
+    assert replayed.get("https://i.sjtu.edu.cn/ping", validate_session=False).text == "pong"
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from pysjtu import consts
+from pysjtu.exceptions import ServiceUnavailable
+from pysjtu.retry import RetryPolicy
+from pysjtu.session import AsyncSession, Session
+
+REGISTER_URL = "https://i.sjtu.edu.cn" + consts.SELECTION_REGISTER
+
+
+def flaky_handler(statuses, headers=None):
+    """ Respond with given statuses in order, then 200 OK. """
+    statuses = list(statuses)
+
+    def handler(request):
+        if statuses:
+            status = statuses.pop(0)
+            if status is None:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(status, headers=headers)
+        return httpx.Response(200, text="pong")
+
+    return handler
+
+
+def test_policy():
+    policy = RetryPolicy(backoff=1, max_backoff=5, jitter=0)
+    assert [policy.delay(i) for i in range(5)] == [1, 2, 4, 5, 5]
+    policy = RetryPolicy(backoff=1, jitter=0.5)
+    assert all(1 <= policy.delay(1) <= 2 for _ in range(100))
+
+    req = httpx.Request("GET", "https://i.sjtu.edu.cn/ping")
+    assert policy.retryable(req)
+    assert policy.retryable(req, httpx.Response(503))
+    assert not policy.retryable(req, httpx.Response(404))
+    assert policy.retryable(httpx.Request("POST", "https://i.sjtu.edu.cn" + consts.SCORE_URL))
+    assert not policy.retryable(httpx.Request("POST", REGISTER_URL))
+    assert RetryPolicy(idempotent_urls=[REGISTER_URL]).retryable(
+        httpx.Request("POST", REGISTER_URL))
+
+    policy = RetryPolicy(max_backoff=60)
+    assert policy.delay(0, httpx.Response(503, headers={"Retry-After": "10"})) == 10
+    assert policy.delay(0, httpx.Response(503, headers={"Retry-After": "120"})) == 60
+    assert 10 < policy.delay(0, httpx.Response(503, headers={"Retry-After": formatdate(
+        time.time() + 30, usegmt=True)})) <= 30
+    assert policy.delay(0, httpx.Response(503, headers={"Retry-After": "soon"})) <= 0.5
+    assert RetryPolicy(respect_retry_after=False, jitter=0).delay(
+        0, httpx.Response(503, headers={"Retry-After": "10"})) == 0.5
+
+    with pytest.raises(ValueError):
+        RetryPolicy(max_retries=-1)
+    with pytest.raises(ValueError):
+        RetryPolicy(jitter=2)
+
+
+def test_session_retry():
+    policy = RetryPolicy(max_retries=3, backoff=0)
+    sess = Session(transport=httpx.MockTransport(flaky_handler([503, None, 502])), retry_policy=policy)
+    assert sess.get("https://i.sjtu.edu.cn/ping", validate_session=False).text == "pong"
+    assert sess.metrics["retries"] == 3
+
+    sess = Session(transport=httpx.MockTransport(flaky_handler([503] * 4)), retry_policy=policy)
+    with pytest.raises(ServiceUnavailable):
+        sess.get("https://i.sjtu.edu.cn/ping", validate_session=False)
+    assert sess.metrics["retries"] == 3
+    assert sess.metrics["retry_give_ups"] == 1
+
+    sess = Session(transport=httpx.MockTransport(flaky_handler([None] * 4)), retry_policy=policy)
+    with pytest.raises(httpx.ConnectError):
+        sess.get("https://i.sjtu.edu.cn/ping", validate_session=False)
+    assert sess.metrics["retry_give_ups"] == 1
+
+    # non-idempotent requests are never retried
+    sess = Session(transport=httpx.MockTransport(flaky_handler([503])), retry_policy=policy)
+    with pytest.raises(ServiceUnavailable):
+        sess.post(REGISTER_URL, validate_session=False)
+    assert sess.metrics["retries"] == 0
+    assert sess.metrics["retry_give_ups"] == 0
+
+    # no retries by default
+    sess = Session(transport=httpx.MockTransport(flaky_handler([503])))
+    with pytest.raises(ServiceUnavailable):
+        sess.get("https://i.sjtu.edu.cn/ping", validate_session=False)
+
+
+def test_async_session_retry():
+    async def _test():
+        sess = AsyncSession(transport=httpx.MockTransport(flaky_handler([429, None], headers={"Retry-After": "0"})),
+                            retry_policy=RetryPolicy(backoff=0))
+        assert (await sess.get("https://i.sjtu.edu.cn/ping", validate_session=False)).text == "pong"
+        assert sess.metrics["retries"] == 2
+
+    asyncio.run(_test())
@@ -3,8 +3,9 @@ import json
 from os import path
 
 import pytest
-from marshmallow import ValidationError
+from marshmallow import ValidationError, fields
 
+from pysjtu.compiled import CompiledLoader, get_loader, use_compiled_loaders
 from pysjtu.fields import StrBool
 from pysjtu.models import CourseRange, LogicEnum, Ranking, GPAQueryParams, GPA, LibCourse, Exam, ScoreFactor, Score, \
     _PARTIAL
@@ -13,6 +14,7 @@ from pysjtu.models.gpa import DedupMethod
 from pysjtu.models.schedule import _CreditHourDetail, ScheduleCourse
 from pysjtu.models.selection import LessonTime, SelectionClassLazySchema, SelectionClass, SelectionSector, \
     SelectionSharedInfo
+from pysjtu.schema import FinalizeHook, LoadDumpSchema, _rename_plan, _schemas, apply_rename_plan, get_schema, warm_up
 
 
 @pytest.fixture()
@@ -354,3 +356,115 @@ def test_lib_course_schema_2(resp_loader):
     assert lib_course.seats == 126
     assert lib_course.students_elected == 113
     assert lib_course.students_planned == 300
+
+
+def test_schema_registry(resp_loader):
+    schema = get_schema(LibCourse)
+    assert schema is get_schema(LibCourse.Schema)
+    assert get_schema(LibCourse, many=True) is not schema and get_schema(LibCourse, many=True).many
+    assert schema.load(resp_loader("lib_course_2")) == LibCourse.Schema().load(resp_loader("lib_course_2"))
+
+    warm_up()
+    assert (SelectionClassLazySchema, True) in _schemas
+    assert (GPAQueryParams.Schema, False) in _schemas
+
+
+def test_rename_plan(resp_loader):
+    assert _rename_plan((("a", "b"), ("c", "d"))) == ((("a", "b"), ("c", "d")), False)
+    assert _rename_plan((("a", "b"), ("a", "c")))[1]  # a shared source key
+    assert _rename_plan((("a", "b"), ("b", "c")))[1]  # a chained rename
+
+    assert apply_rename_plan({"a": 1, "c": 2}, _rename_plan((("a", "b"), ("c", "d"), ("e", "f")))) == \
+        {"b": 1, "d": 2}
+    assert apply_rename_plan({"a": 1}, _rename_plan((("a", "b"), ("a", "c")))) == {"b": 1, "c": 1}
+    assert apply_rename_plan({"a": 1, "b": 2}, _rename_plan((("a", "b"), ("b", "c")))) == {"c": 1}
+
+    # plans are computed once per schema class, and empty for schemas without renamed keys
+    key = (SelectionClass.Schema, tuple(SelectionClass.Schema().fields))
+    LoadDumpSchema._rename_plans.pop(key, None)
+    SelectionClass.Schema(many=True).load([resp_loader("selection_course")] * 3)
+    plans = LoadDumpSchema._rename_plans[key]
+    assert plans == (((), False), ((), False))
+    SelectionClass.Schema().load(resp_loader("selection_course"))
+    assert LoadDumpSchema._rename_plans[key] is plans
+
+    # schemas narrowed by only or exclude get plans of their own fields
+    class RenamedSchema(FinalizeHook(LoadDumpSchema)):
+        a = fields.Integer(metadata={"load_key": "x", "dump_key": "y"})
+        b = fields.Integer(metadata={"load_key": "z", "dump_key": "w"})
+
+    assert RenamedSchema(only=("a",)).load({"x": 1}) == {"a": 1}
+    assert RenamedSchema(only=("a",)).dump({"a": 1, "b": 2}) == {"y": 1}
+    assert RenamedSchema(exclude=("a",)).load({"z": 2}) == {"b": 2}
+    assert RenamedSchema(exclude=("a",)).dump({"a": 1, "b": 2}) == {"w": 2}
+    assert RenamedSchema().load({"x": 1, "z": 2}) == {"a": 1, "b": 2}
+    assert RenamedSchema().dump({"a": 1, "b": 2}) == {"y": 1, "w": 2}
+
+
+@pytest.mark.parametrize("schema_ref, resp", [
+    (Exam, "exam"), (GPA, "gpa"), (GPAQueryParams, "gpa_query_params"), (LibCourse, "lib_course_1"),
+    (LibCourse, "lib_course_2"), (ScheduleCourse, "schedule_course_1"), (ScheduleCourse, "schedule_course_2"),
+    (Score, "score"), (ScoreFactor, "score_factor"), (SelectionClass, "selection_course"),
+    (SelectionClassLazySchema, "selection_class"), (SelectionSector, "selection_sector"),
+    (SelectionSharedInfo, "selection_shared_info")
+])
+def test_compiled_loader(resp_loader, schema_ref, resp):
+    def normalize(result):
+        return result if isinstance(result, dict) else vars(result)
+
+    raw = resp_loader(resp)
+    rows = raw if schema_ref is ScoreFactor else [raw]  # score factors are recorded as a list of rows
+    expected = [normalize(get_schema(schema_ref).load(row)) for row in rows]
+    loader = CompiledLoader(schema_ref)
+    assert [normalize(loader.load(row)) for row in rows] == expected
+    assert [normalize(result) for result in CompiledLoader(schema_ref, many=True).load(rows * 2)] == expected * 2
+    assert loader.fallbacks == 0
+
+    # fall back to marshmallow on invalid data, with the same errors
+    with pytest.raises(ValidationError) as e:
+        get_schema(schema_ref).load([])
+    with pytest.raises(ValidationError) as e_compiled:
+        loader.load([])
+    assert e_compiled.value.messages == e.value.messages
+    assert loader.fallbacks == 1
+
+
+def test_compiled_loader_fallback(resp_loader):
+    loader = CompiledLoader(LibCourse, many=True)
+    raw = resp_loader("lib_course_1")
+    invalid = {**raw, "xf": "not a number"}
+    with pytest.raises(ValidationError) as e:
+        loader.load([raw, invalid])
+    assert e.value.messages == {1: {"xf": ["Not a valid number."]}}
+    assert loader.fallbacks == 1
+
+    # floats are converted inline, but NaN and infinity are rejected by marshmallow
+    assert "finite(float(v))" in loader.source
+    for value in ("nan", "inf"):
+        with pytest.raises(ValidationError) as e:
+            loader.load([{**raw, "xf": value}])
+        assert e.value.messages == get_schema(LibCourse, many=True).validate([{**raw, "xf": value}])
+    assert loader.fallbacks == 3
+
+    missing = {k: v for k, v in raw.items() if k != "kcmc"}
+    with pytest.raises(ValidationError) as e:
+        loader.load([missing])
+    assert e.value.messages == {0: {"kcmc": ["Missing data for required field."]}}
+
+    # renamed keys are renamed on a copy
+    raw = resp_loader("gpa_query_params")
+    CompiledLoader(GPAQueryParams).load(raw)
+    assert raw == resp_loader("gpa_query_params")
+
+
+def test_get_loader():
+    assert get_loader(LibCourse) is get_schema(LibCourse)
+    use_compiled_loaders()
+    try:
+        loader = get_loader(LibCourse, many=True)
+        assert isinstance(loader, CompiledLoader) and loader is get_loader(LibCourse, many=True)
+        assert "def load(data, many=False):" in loader.source
+        assert get_loader(LibCourse.Schema) is get_schema(LibCourse.Schema)  # unable to build models
+    finally:
+        use_compiled_loaders(False)
+    assert get_loader(LibCourse, many=True) is get_schema(LibCourse, many=True)
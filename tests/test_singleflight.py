@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from pysjtu import consts
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.session import Session as _Session
+from pysjtu.singleflight import AsyncSingleFlight, SingleFlight
+from .mock_server import app
+
+
+# noinspection PyPep8Naming
+def Session(*args, **kwargs):
+    return _Session(*args, **kwargs, mounts={"all://": None})
+
+
+def test_single_flight():
+    flights = SingleFlight()
+    calls = []
+    barrier = threading.Event()
+
+    def fn():
+        calls.append(1)
+        barrier.wait(1)
+        return len(calls)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flights.do, "key", fn) for _ in range(4)]
+        time.sleep(0.1)
+        barrier.set()
+        assert [future.result() for future in futures] == [1] * 4
+    assert flights.shared == 3
+    assert flights.do("key", fn) == 2
+
+    def fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        flights.do("key", fail)
+    assert flights.do("key", fn) == 3
+
+
+def test_async_single_flight():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def _test():
+        flights = AsyncSingleFlight()
+        assert await asyncio.gather(*(flights.do("key", fn) for _ in range(4))) == [1] * 4
+        assert flights.shared == 3
+        assert await flights.do("key", fn) == 2
+
+    asyncio.run(_test())
+
+
+def test_session_single_flight(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    sess = Session(transport=httpx.WSGITransport(app=app), retry=[0], timeout=1)
+    sess.login("FeiLin", "WHISPERS")
+
+    send = sess._client.request
+
+    def slow_request(*args, **kwargs):
+        time.sleep(0.1)
+        return send(*args, **kwargs)
+
+    spy = mocker.patch.object(sess._client, "request", side_effect=slow_request)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        texts = list(executor.map(lambda _: sess.get(consts.HOME_URL).text, range(4)))
+    assert len(set(texts)) == 1
+    assert spy.call_count == 1
+
+    # requests with side effects aren't coalesced
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda _: sess.post("https://i.sjtu.edu.cn/ping", content="lorem"), range(2)))
+    assert spy.call_count == 3
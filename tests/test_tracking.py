@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from pysjtu import consts, events
+from pysjtu.client import AsyncClient, Client
+from pysjtu.exceptions import BudgetExceeded
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.session import AsyncSession, Session
+from .mock_server import app
+from .test_async import AsyncWSGITransport
+
+
+@pytest.fixture
+def client(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    sess = Session(transport=httpx.WSGITransport(app=app), retry=[0], mounts={"all://": None})
+    sess.login("FeiLin", "WHISPERS")
+    client = Client(sess)
+    assert client.student_id
+    return client
+
+
+def test_track(client):
+    with client.track() as t:
+        client.score(2019, 0)
+    assert t.requests == 1
+    assert t.bytes_received > 0 and t.bytes == t.bytes_sent + t.bytes_received
+    assert t.seconds >= t.network_seconds > 0
+    assert sum(t.endpoints.values()) == 1
+    assert not client._session._hooks
+
+    with client.track() as t:
+        scores = client.score(2019, 0)
+        for score in scores:
+            score.detail
+    assert t.requests == 1 + len(scores)
+
+
+def test_track_budget(client):
+    with pytest.raises(BudgetExceeded):
+        with client.track(max_requests=1):
+            client.score(2019, 0)
+            client.exam(2019, 0)
+    with pytest.raises(BudgetExceeded):
+        with client.track(max_bytes=1):
+            client.score(2019, 0)
+    with pytest.raises(BudgetExceeded):
+        with client.track(max_seconds=0):
+            client.score(2019, 0)
+    assert not client._session._hooks
+
+    # hooks registered after the tracker still receive the event exceeding the budget
+    received = []
+    with pytest.raises(BudgetExceeded):
+        with client.track(max_requests=0):
+            client._session.add_hook(events.RESPONSE, received.append)
+            client.score(2019, 0)
+    assert len(received) == 1
+    client._session.remove_hook(events.RESPONSE, received.append)
+
+
+def test_track_scope(client, mocker):
+    spy = mocker.spy(client._session._client, "request")
+    with client.track() as t:
+        # requests of other threads sharing the session aren't counted
+        thread = threading.Thread(target=client.exam, args=(2019, 0))
+        thread.start()
+        thread.join()
+        assert t.requests == 0
+        # but those of threads prefetching pages for this one are
+        courses = client.query_courses(2019, 0, name="高等数学", page_size=40, max_in_flight=3)
+        assert len(courses[:]) == 90
+    assert t.requests == spy.call_count - 1
+
+    # counting responses doesn't need connection-level tracing
+    assert all("trace" not in call.kwargs.get("extensions", {}) for call in spy.call_args_list)
+
+
+def test_track_coalesced(client, mocker):
+    sess = client._session
+    send = sess._client.request
+
+    def slow_request(*args, **kwargs):
+        time.sleep(0.1)
+        return send(*args, **kwargs)
+
+    spy = mocker.patch.object(sess._client, "request", side_effect=slow_request)
+    errors = []
+
+    def tracked():
+        try:
+            with client.track(max_requests=0):
+                sess.get(consts.HOME_URL)
+        except BudgetExceeded as e:
+            errors.append(e)
+
+    # a caller sharing a request sent by a tracked one isn't charged for its budget
+    thread = threading.Thread(target=tracked)
+    thread.start()
+    time.sleep(0.05)
+    assert sess.get(consts.HOME_URL).status_code == 200
+    thread.join()
+    assert spy.call_count == 1
+    assert len(errors) == 1
+
+
+def test_async_track(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+
+    async def _test():
+        sess = AsyncSession(transport=AsyncWSGITransport(app), retry=[0], mounts={"all://": None})
+        await sess.login("FeiLin", "WHISPERS")
+        client = AsyncClient(sess)
+        await client.student_id
+        with client.track() as t:
+            await asyncio.gather(client.score(2019, 0), client.exam(2019, 0))
+        assert t.requests == 2
+
+        async def tracked():
+            with client.track() as t:
+                await client.score(2019, 0)
+                await asyncio.sleep(0.01)
+            return t
+
+        # requests of other tasks sharing the session aren't counted
+        t, _ = await asyncio.gather(tracked(), client.exam(2019, 0))
+        assert t.requests == 1
+
+    asyncio.run(_test())
@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+import pytest
+
+from pysjtu.exceptions import ProtocolWarning
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.session import AsyncSession, Session
+from pysjtu.transport import AsyncSharedTransport, SharedTransport
+from .mock_server import app
+from .test_async import AsyncWSGITransport
+
+
+def test_shared_transport(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    transport = SharedTransport(transport=httpx.WSGITransport(app=app))
+    spy = mocker.spy(transport._transport, "handle_request")
+    close = mocker.spy(transport._transport, "close")
+
+    with Session(username="FeiLin", password="WHISPERS", transport=transport, retry=[0], mounts={"all://": None}):
+        pass
+    calls = spy.call_count
+    assert calls > 0
+    assert not close.called
+
+    # the recognizer of a session shares its transport
+    sess = Session(transport=transport, mounts={"all://": None})
+    assert sess._ocr.client._transport is transport
+    assert sess.get("https://i.sjtu.edu.cn/ping").text == "pong"
+    assert spy.call_count == calls + 1
+
+    with transport:
+        pass
+    assert close.called
+
+
+def test_shared_transport_limits():
+    transport = SharedTransport(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30)
+    pool = transport._transport._pool
+    assert (pool._max_connections, pool._max_keepalive_connections, pool._keepalive_expiry) == (10, 5, 30)
+
+    transport = SharedTransport(limits=httpx.Limits(max_connections=1), http2=True)
+    assert transport._transport._pool._max_connections == 1
+    assert transport._transport._pool._http2
+    transport.shutdown()
+
+
+def test_async_shared_transport(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+
+    async def _test():
+        async with AsyncSharedTransport(transport=AsyncWSGITransport(app)) as transport:
+            sessions = [AsyncSession(transport=transport, retry=[0], mounts={"all://": None}) for _ in range(2)]
+            for sess in sessions:
+                await sess.login("FeiLin", "WHISPERS")
+                await sess.aclose()
+            # closing sessions leaves the shared transport usable
+            sess = AsyncSession(transport=transport, mounts={"all://": None})
+            assert (await sess.get("https://i.sjtu.edu.cn/ping")).text == "pong"
+
+    asyncio.run(_test())
+
+
+def test_http2(mocker):
+    sess = Session(http2=True)
+    assert sess._client._transport._pool._http2
+    assert sess._ocr.client._transport._pool._http2
+
+    mocker.patch("pysjtu.transport.has_h2", False)
+    with pytest.warns(ProtocolWarning):
+        sess = Session(http2=True)
+    assert not sess._client._transport._pool._http2
+    with pytest.warns(ProtocolWarning):
+        assert not SharedTransport(http2=True)._transport._pool._http2
+
+
+def test_async_recognizer_options():
+    # the recognizer of an async session gets client options, but not asynchronous transports
+    transport = AsyncWSGITransport(app)
+    sess = AsyncSession(transport=transport, mounts={"all://": transport}, timeout=3, http2=True)
+    assert sess._ocr.client.timeout == httpx.Timeout(3)
+    assert sess._ocr.client._transport._pool._http2
+    assert not sess._ocr.client._mounts
+
+
+def test_async_recognizer_transport():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"data": {"prediction": "ipsum"}})
+
+    transport = AsyncSharedTransport(transport=httpx.MockTransport(handler))
+    recognizer = JCSSRecognizer(async_transport=transport)
+    assert asyncio.run(recognizer.arecognize(b"captcha")) == "ipsum"
+    assert len(requests) == 1
+
+
+def test_protocol_metrics():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="pong",
+                                                                   extensions={"http_version": b"HTTP/2"}))
+    sess = Session(transport=transport)
+    assert sess.http_version is None
+    sess.get("https://i.sjtu.edu.cn/ping", validate_session=False)
+    assert sess.http_version == "HTTP/2"
+    assert sess.metrics["responses_http2"] == 1
+
+    sess = Session(transport=httpx.WSGITransport(app=app), mounts={"all://": None})
+    sess.get("https://i.sjtu.edu.cn/ping", validate_session=False)
+    assert sess.http_version == "HTTP/1.1"
+    assert sess.metrics["responses_http1.1"] == 1
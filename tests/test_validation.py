@@ -0,0 +1,48 @@
+import httpx
+import pytest
+
+from pysjtu.ocr import JCSSRecognizer
+from pysjtu.session import Session as _Session
+from pysjtu.validation import ValidationPolicy
+from .mock_server import app
+
+
+# noinspection PyPep8Naming
+def Session(*args, **kwargs):
+    return _Session(*args, **kwargs, mounts={"all://": None})
+
+
+def test_validation_policy():
+    policy = ValidationPolicy.always()
+    assert not policy.trust_cookies
+    assert ValidationPolicy.trusted().trust_cookies
+    assert ValidationPolicy().mode == ValidationPolicy.ALWAYS
+
+    with pytest.raises(ValueError):
+        ValidationPolicy("never")
+
+
+def test_trusted_session(mocker):
+    mocker.patch.object(JCSSRecognizer, "recognize", return_value="ipsum")
+    transport = httpx.WSGITransport(app=app)
+    logged_session = Session(transport=transport, retry=[0])
+    logged_session.login("FeiLin", "WHISPERS")
+    dumps = logged_session.dumps()
+
+    # validating loaded cookies takes two requests, which are skipped when they are trusted
+    sess = Session(transport=transport, retry=[0])
+    spy = mocker.spy(sess._client, "request")
+    sess.loads(dumps)
+    assert spy.call_count == 2
+
+    sess = Session(transport=transport, retry=[0], validation=ValidationPolicy.trusted())
+    spy = mocker.spy(sess._client, "request")
+    sess.loads(dumps)
+    assert spy.call_count == 0
+    assert "519027910001" in sess.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html").text
+    assert spy.call_count == 1
+
+    # expiry is still caught by the redirection to the login page
+    sess.get("https://i.sjtu.edu.cn/expire_me")
+    assert "519027910001" in sess.get("https://i.sjtu.edu.cn/xtgl/index_initMenu.html").text
+    assert sess.metrics["renewals"] == 1